@@ -0,0 +1,450 @@
+"""
+数值计算内核
+
+可选依赖 numba：安装后首次调用时 JIT 编译标量循环；
+未安装时调用方退回 NumPy 实现，结果一致。
+"""
+import numpy as np
+
+_kernels: dict = {}  # 函数名 -> 编译结果；False 表示 numba 不可用
+
+
+def _jit(func, name=None, **options):
+    """
+    首次调用时用 numba 编译 func，numba 不可用时返回 None
+
+    name: 缓存键，默认取函数名（同名闭包的不同特化版本需要显式区分）
+    """
+    name = name or func.__name__
+    kernel = _kernels.get(name)
+    if kernel is None:
+        try:
+            from numba import njit
+        except ImportError:
+            kernel = False
+        else:
+            kernel = njit(cache=True, **options)(func)
+        _kernels[name] = kernel
+    return kernel or None
+
+
+def _max_drawdown_loop(arr):
+    """单次扫描的最大回撤（running peak），供 numba 编译"""
+    peak = arr[0]
+    max_dd = 0.0
+    for i in range(arr.shape[0]):
+        equity = arr[i]
+        if equity > peak:
+            peak = equity
+        drawdown = (equity - peak) / peak
+        if drawdown < max_dd:
+            max_dd = drawdown
+    return max_dd
+
+
+def max_drawdown(equity) -> float:
+    """
+    最大回撤（返回负值，如 -0.2 表示 -20%）
+
+    空序列返回 0.0。
+
+    Args:
+        equity: 权益序列（list / ndarray）
+    """
+    arr = np.asarray(equity, dtype=np.float64)
+    if arr.shape[0] == 0:
+        return 0.0
+
+    kernel = _jit(_max_drawdown_loop, nogil=True)
+    if kernel is not None:
+        return float(kernel(arr))
+
+    peaks = np.maximum.accumulate(arr)
+    return float(((arr - peaks) / peaks).min())
+
+
+def _return_std_loop(arr):
+    """收益率样本标准差（ddof=1），Welford 单次扫描、不分配中间数组，供 numba 编译"""
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, arr.shape[0]):
+        r = (arr[i] - arr[i - 1]) / arr[i - 1]
+        delta = r - mean
+        mean += delta / i
+        m2 += delta * (r - mean)
+    return np.sqrt(m2 / (arr.shape[0] - 2))
+
+
+def return_std(equity) -> float:
+    """
+    权益序列日收益率的样本标准差（ddof=1）
+
+    收益率不足 2 个时返回 0.0。
+
+    Args:
+        equity: 权益序列（list / ndarray）
+    """
+    arr = np.asarray(equity, dtype=np.float64)
+    if arr.shape[0] < 3:
+        return 0.0
+
+    kernel = _jit(_return_std_loop, nogil=True)
+    if kernel is not None:
+        return float(kernel(arr))
+
+    return float(np.std(np.diff(arr) / arr[:-1], ddof=1))
+
+
+def _frictionless_backtest_loop(prices, codes, cash, position):
+    """
+    无成本、无滑点、无风控的逐 bar 状态机，供 numba 编译
+
+    codes: int8 信号编码（1=BUY, -1=EXIT, 0=HOLD）
+
+    Returns:
+        (equity, trade_bars, trade_sizes, trade_cash, cash, position)
+    """
+    n = prices.shape[0]
+    equity = np.empty(n)
+    trade_bars = np.empty(n, dtype=np.int64)
+    trade_sizes = np.empty(n)
+    trade_cash = np.empty(n)
+    n_trades = 0
+
+    for i in range(n):
+        price = prices[i]
+        code = codes[i]
+        if code == 1 and position == 0:
+            position = cash / price
+            cash = 0.0
+            trade_bars[n_trades] = i
+            trade_sizes[n_trades] = position
+            trade_cash[n_trades] = cash
+            n_trades += 1
+        elif code == -1 and position > 0:
+            cash = position * price
+            trade_bars[n_trades] = i
+            trade_sizes[n_trades] = -position
+            trade_cash[n_trades] = cash
+            n_trades += 1
+            position = 0.0
+        equity[i] = cash + position * price
+
+    return (
+        equity,
+        trade_bars[:n_trades],
+        trade_sizes[:n_trades],
+        trade_cash[:n_trades],
+        cash,
+        position,
+    )
+
+
+def frictionless_backtest_kernel():
+    """返回编译后的无摩擦回测内核，numba 不可用时返回 None"""
+    return _jit(_frictionless_backtest_loop)
+
+
+def _make_backtest_loop(check_drawdown: bool, check_exits: bool):
+    """
+    生成特化的回测循环
+
+    check_drawdown / check_exits 是闭包常量，numba 编译时按常量折叠，
+    未启用的风控分支不会出现在热循环里。
+    """
+    def _backtest_loop(
+        prices, codes, cash, position, has_entry, entry_price,
+        buy_factor, sell_factor, commission_rate, min_commission, stamp_duty_rate,
+        position_ratio, max_drawdown_limit, stop_loss_pct, take_profit_pct,
+    ):
+        """
+        带成本、固定滑点和风控的逐 bar 状态机，供 numba 编译
+
+        与 BacktestEngine._run_loop 逐项对应；未启用的止损/止盈阈值传 NaN（比较恒为 False）。
+        trade_types: 1=BUY, 2=EXIT, 3=STOP_LOSS, 4=TAKE_PROFIT, 5=RISK_EXIT
+
+        Returns:
+            (equity, trade_bars, trade_types, trade_prices, trade_sizes, trade_cash,
+             cash, position, risk_triggered)
+        """
+        n = prices.shape[0]
+        equity = np.empty(n)
+        trade_bars = np.empty(n, dtype=np.int64)
+        trade_types = np.empty(n, dtype=np.int8)
+        trade_prices = np.empty(n)
+        trade_sizes = np.empty(n)
+        trade_cash = np.empty(n)
+        n_trades = 0
+        peak = 0.0
+        risk_triggered = False
+
+        for i in range(n):
+            price = prices[i]
+            code = codes[i]
+
+            # 最大回撤检查基于 equity[:i]，peak 为其 running max
+            breached = False
+            if check_drawdown and i >= 2 and (equity[i - 1] - peak) / peak <= max_drawdown_limit:
+                breached = True
+                risk_triggered = True
+
+            if breached:
+                if position > 0:
+                    actual_price = price * sell_factor
+                    value = actual_price * position
+                    cost = max(value * commission_rate, min_commission) + value * stamp_duty_rate
+                    cash = position * actual_price - cost
+                    trade_bars[n_trades] = i
+                    trade_types[n_trades] = 5
+                    trade_prices[n_trades] = actual_price
+                    trade_sizes[n_trades] = -position
+                    trade_cash[n_trades] = cash
+                    n_trades += 1
+                    position = 0.0
+                    has_entry = False
+            elif code == 1 and position == 0:
+                actual_price = price * buy_factor
+                max_shares = cash * position_ratio / actual_price
+                cost = max(actual_price * max_shares * commission_rate, min_commission)
+                position = (cash - cost) / actual_price
+                cash = 0.0
+                has_entry = True
+                entry_price = actual_price
+                trade_bars[n_trades] = i
+                trade_types[n_trades] = 1
+                trade_prices[n_trades] = actual_price
+                trade_sizes[n_trades] = position
+                trade_cash[n_trades] = cash
+                n_trades += 1
+            elif position > 0:
+                exit_type = 0
+                if check_exits and has_entry:
+                    return_pct = (price - entry_price) / entry_price
+                    if return_pct <= stop_loss_pct:
+                        exit_type = 3
+                    elif return_pct >= take_profit_pct:
+                        exit_type = 4
+                if exit_type == 0 and code == -1:
+                    exit_type = 2
+                if exit_type != 0:
+                    actual_price = price * sell_factor
+                    value = actual_price * position
+                    cost = max(value * commission_rate, min_commission) + value * stamp_duty_rate
+                    cash = position * actual_price - cost
+                    trade_bars[n_trades] = i
+                    trade_types[n_trades] = exit_type
+                    trade_prices[n_trades] = actual_price
+                    trade_sizes[n_trades] = -position
+                    trade_cash[n_trades] = cash
+                    n_trades += 1
+                    position = 0.0
+                    has_entry = False
+
+            equity[i] = cash + position * price
+            if i == 0 or equity[i] > peak:
+                peak = equity[i]
+
+        return (
+            equity,
+            trade_bars[:n_trades],
+            trade_types[:n_trades],
+            trade_prices[:n_trades],
+            trade_sizes[:n_trades],
+            trade_cash[:n_trades],
+            cash,
+            position,
+            risk_triggered,
+        )
+
+    return _backtest_loop
+
+
+# 特化版本：无风控 / 仅回撤限制 / 回撤 + 止损止盈
+_BACKTEST_VARIANTS = {
+    "no_risk": (False, False),
+    "dd_only": (True, False),
+    "full": (True, True),
+}
+
+
+def backtest_kernel(variant: str = "full"):
+    """返回编译后的特化回测内核（见 _BACKTEST_VARIANTS），numba 不可用时返回 None"""
+    name = f"_backtest_loop_{variant}"
+    if name not in _kernels:
+        return _jit(_make_backtest_loop(*_BACKTEST_VARIANTS[variant]), name=name)
+    return _kernels[name] or None
+
+
+def _factor_portfolio_loop(returns, factors, initial_cash):
+    """
+    横截面因子组合：每期等权做多因子值前一半的股票，供 numba 编译
+
+    returns: S×(T-1) 收益率矩阵，returns[s, t] = prices[s, t+1] / prices[s, t] - 1
+    factors: T×S 因子矩阵，NaN 表示该期无因子值
+    因子值相同时按股票顺序（稳定排序），与 sorted(..., reverse=True) 一致。
+
+    Returns:
+        权益曲线（长度 T-1）
+    """
+    n_symbols = returns.shape[0]
+    n_bars = returns.shape[1] + 1
+    equity = initial_cash
+    curve = np.empty(max(n_bars - 1, 1))
+    curve[0] = equity
+    index = np.empty(n_symbols, dtype=np.int64)
+    values = np.empty(n_symbols)
+
+    for t in range(1, n_bars - 1):
+        n_valid = 0
+        for s in range(n_symbols):
+            value = factors[t, s]
+            if not np.isnan(value):
+                index[n_valid] = s
+                values[n_valid] = -value
+                n_valid += 1
+
+        if n_valid > 0:
+            order = np.argsort(values[:n_valid], kind="mergesort")
+            top_n = max(1, n_valid // 2)
+            total = 0.0
+            for k in range(top_n):
+                s = index[order[k]]
+                total += returns[s, t]
+            equity *= 1 + total / top_n
+
+        curve[t] = equity
+
+    return curve
+
+
+def factor_portfolio_kernel():
+    """返回编译后的因子组合内核，numba 不可用时返回 None"""
+    return _jit(_factor_portfolio_loop)
+
+
+def _spearman_no_ties_loop(x, y):
+    """无并列值时的 Spearman：秩差平方和用整数累加，供 numba 编译"""
+    n = x.shape[0]
+    rx = np.argsort(np.argsort(x))
+    ry = np.argsort(np.argsort(y))
+    d2 = 0
+    for i in range(n):
+        d = rx[i] - ry[i]
+        d2 += d * d
+    return 1.0 - 6.0 * d2 / (n * (n * n - 1))
+
+
+def spearman_no_ties(x, y) -> float:
+    """
+    Spearman 相关系数 1 - 6Σd²/(n(n²-1))
+
+    调用方保证 x、y 长度相同（>= 2）且各自没有并列值、没有 NaN。
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    kernel = _jit(_spearman_no_ties_loop, nogil=True)
+    if kernel is not None:
+        return float(kernel(x, y))
+
+    n = x.shape[0]
+    d = np.argsort(np.argsort(x)) - np.argsort(np.argsort(y))
+    return 1.0 - 6.0 * float(d @ d) / (n * (n * n - 1))
+
+
+def _decayed_mean_loop(values, alpha):
+    """
+    递推 s = alpha·s + x，再除以等比数列和归一化，供 numba 编译
+
+    alpha 舍入为 1.0（半衰期极大或为 inf）时各期等权，直接返回均值（否则是 0/0）。
+    """
+    s = 0.0
+    for i in range(values.shape[0]):
+        s = alpha * s + values[i]
+    if alpha == 1.0:
+        return s / values.shape[0]
+    return s * (1.0 - alpha) / (1.0 - alpha ** values.shape[0])
+
+
+def decayed_mean_kernel():
+    """返回编译后的指数衰减加权均值内核，numba 不可用时返回 None"""
+    return _jit(_decayed_mean_loop, nogil=True)
+
+
+def _average_ranks(values, out):
+    """values 的平均秩（并列取平均，从 1 开始）写入 out，供 numba 编译"""
+    n = values.shape[0]
+    order = np.argsort(values, kind="mergesort")
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        rank = 0.5 * (i + j) + 1.0
+        for k in range(i, j + 1):
+            out[order[k]] = rank
+        i = j + 1
+
+
+def _make_cross_sectional_ic_loop(average_ranks):
+    """
+    生成逐行横截面 Spearman IC 循环，average_ranks 为（编译后的）排名函数
+
+    行之间互不依赖，但不用 parallel=True / prange：
+    numba 的并行线程层初始化后再 fork 进程池（MultiBacktest）会卡死。
+    """
+
+    def loop(factor, returns):
+        """
+        factor / returns: T×S 矩阵（NaN 表示缺失）
+        有效样本不足 2 个时为 0.0，秩方差为 0 时为 NaN。
+        """
+        n_rows = factor.shape[0]
+        n_cols = factor.shape[1]
+        ics = np.empty(n_rows)
+        for t in range(n_rows):
+            a = np.empty(n_cols)
+            b = np.empty(n_cols)
+            n = 0
+            for s in range(n_cols):
+                if not (np.isnan(factor[t, s]) or np.isnan(returns[t, s])):
+                    a[n] = factor[t, s]
+                    b[n] = returns[t, s]
+                    n += 1
+            if n < 2:
+                ics[t] = 0.0
+                continue
+
+            ra = np.empty(n)
+            rb = np.empty(n)
+            average_ranks(a[:n], ra)
+            average_ranks(b[:n], rb)
+            mean = 0.5 * (n + 1)  # 平均秩的均值恒为 (n+1)/2
+            sab = 0.0
+            saa = 0.0
+            sbb = 0.0
+            for k in range(n):
+                da = ra[k] - mean
+                db = rb[k] - mean
+                sab += da * db
+                saa += da * da
+                sbb += db * db
+            denom = np.sqrt(saa * sbb)
+            if denom == 0.0:
+                ics[t] = np.nan
+            else:
+                ics[t] = min(1.0, max(-1.0, sab / denom))
+        return ics
+
+    return loop
+
+
+def cross_sectional_ic_kernel():
+    """返回编译后的横截面 IC 内核，numba 不可用时返回 None"""
+    average_ranks = _jit(_average_ranks, nogil=True)
+    if average_ranks is None:
+        return None
+    return _jit(
+        _make_cross_sectional_ic_loop(average_ranks),
+        name="_cross_sectional_ic_loop", nogil=True,
+    )
@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 from typing import Dict, List
 from quant_system.backtest.trade import Trade
 
@@ -15,16 +16,26 @@ def plot_multi_strategy_comparison(
     """
     plt.figure(figsize=(14, 7))
 
+    labels = []
+    curves = []
     for symbol, strat_results in backtest_results.items():
         for strat_name, bt in strat_results.items():
-            label = f"{symbol}-{strat_name}"
-            plt.plot(bt.equity_curve, label=label)
+            labels.append(f"{symbol}-{strat_name}")
+            curves.append(bt.equity_curve)
+
+    # 所有曲线拼成一个二维数组（短曲线用 NaN 补齐），一次 plot 调用画完
+    max_len = max((len(c) for c in curves), default=0)
+    matrix = np.full((len(curves), max_len), np.nan)
+    for i, curve in enumerate(curves):
+        matrix[i, :len(curve)] = curve
+
+    lines = plt.plot(matrix.T) if curves else []
 
     plt.title(title)
     plt.xlabel("Time Step")
     plt.ylabel("Equity")
     plt.grid(True)
-    plt.legend(loc="upper left")
+    plt.legend(lines, labels, loc="upper left")
     plt.tight_layout()
 
     if save_path:
@@ -1,22 +1,19 @@
 from typing import List
 
+import numpy as np
+
+from quant_system.analysis._numeric import max_drawdown as _max_drawdown
+from quant_system.backtest.result import BacktestResult
+
 
 def total_return(self) -> float:
     """
     领域属性
     """
-    return (self.final_equity / self.initial_equity) - 1
+    return BacktestResult.calc_return(self.final_equity, self.initial_equity)
 
 def calc_max_drawdown(self) -> float:
-    peak = self.equity_curve[0]
-    max_dd = 0.0
-
-    for equity in self.equity_curve:
-        peak = max(peak, equity)
-        drawdown = (equity - peak) / peak
-        max_dd = min(max_dd, drawdown)
-
-    return max_dd
+    return _max_drawdown(np.asarray(self.equity_curve, dtype=np.float64))
 
 @property
 def max_drawdown(self) -> float:
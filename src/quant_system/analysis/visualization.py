@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 from quant_system.backtest.trade import Trade
 from typing import List
 
@@ -29,21 +30,25 @@ def plot_advanced_backtest(prices: List[float],
     ax2.set_ylabel("Price", color="black")
     ax2.tick_params(axis='y', labelcolor="black")
 
-    # 持仓量曲线
-    positions = []
-    pos = 0
-    for trade in trades:
-        pos += trade.size
-        positions.append(pos)
-    # 如果 positions 长度不够，补最后一个值
-    while len(positions) < len(prices):
-        positions.append(positions[-1] if positions else 0)
+    # 持仓量曲线：按成交 bar 累加仓位变化
+    bar_indices = np.array(
+        [t.bar_index if t.bar_index is not None else i for i, t in enumerate(trades)],
+        dtype=np.intp,
+    )
+    deltas = np.zeros(len(prices))
+    np.add.at(
+        deltas,
+        np.minimum(bar_indices, len(prices) - 1),
+        np.array([t.size for t in trades], dtype=np.float64),
+    )
+    positions = np.cumsum(deltas)
 
     ax2.plot(positions, label="Position", color="orange", linestyle="--")
 
     # 标记交易点
-    for trade in trades:
-        idx = min(len(prices)-1, trades.index(trade))
+    for i, trade in enumerate(trades):
+        idx = trade.bar_index if trade.bar_index is not None else i
+        idx = min(len(prices)-1, idx)
         if trade.type == "BUY":
             ax2.scatter(idx, prices[idx], marker="^", color="green", s=100, label="BUY")
         elif trade.type in ["SELL", "SELL_STOP"]:
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class CostModel:
     """
     交易成本模型
@@ -76,6 +76,8 @@ class CostModel:
 # 预定义的成本模型
 class NoCostModel(CostModel):
     """无成本模型（用于对比）"""
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             commission_rate=0.0,
@@ -83,9 +85,17 @@ class NoCostModel(CostModel):
             stamp_duty_rate=0.0
         )
 
+    def calculate_buy_cost(self, price: float, size: float) -> float:
+        return 0.0
+
+    def calculate_sell_cost(self, price: float, size: float) -> float:
+        return 0.0
+
 
 class LowCostModel(CostModel):
     """低成本模型（万一）"""
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             commission_rate=0.0001,  # 万一
@@ -96,6 +106,8 @@ class LowCostModel(CostModel):
 
 class HighCostModel(CostModel):
     """高成本模型（万五）"""
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             commission_rate=0.0005,  # 万五
@@ -1,9 +1,17 @@
+from quant_system.analysis._numeric import backtest_kernel, frictionless_backtest_kernel
 from quant_system.backtest.result import BacktestResult
-from quant_system.backtest.trade import Trade
-from quant_system.backtest.cost_model import CostModel
-from quant_system.backtest.slippage import SlippageModel, NoSlippage
+from quant_system.backtest.signal import SIGNAL_BUY, SIGNAL_EXIT, SIGNAL_HOLD, encode_signals
+from quant_system.backtest.trade import BUY_CODE, TRADE_TYPE_CODES, TradeLog
+from quant_system.backtest.cost_model import CostModel, NoCostModel, LowCostModel, HighCostModel
+from quant_system.backtest.slippage import SlippageModel, FixedSlippage, NoSlippage
 from quant_system.backtest.risk_control import RiskControl, RiskMonitor, NoRiskControl
 from typing import Optional
+import numpy as np
+
+
+# 编译内核支持的模型（计算公式在内核中逐项复刻）
+_KERNEL_COST_MODELS = (CostModel, NoCostModel, LowCostModel, HighCostModel)
+_KERNEL_SLIPPAGE_MODELS = (NoSlippage, FixedSlippage)
 
 
 class BacktestEngine:
@@ -20,6 +28,8 @@ class BacktestEngine:
         self.prices = prices
         self.signals = signals
         self.symbol = symbol
+        # 信号在构造时一次性编码为 int8，各执行路径共用
+        self.signal_codes = encode_signals(signals)
 
         self.initial_cash = initial_cash
         self.cash = initial_cash
@@ -35,164 +45,478 @@ class BacktestEngine:
         self.risk_control = risk_control if risk_control is not None else NoRiskControl()
         self.risk_monitor = RiskMonitor(self.risk_control, initial_cash)
 
+    def reset(self, prices: list[float], signals: list, symbol: str):
+        """
+        换一组价格/信号重新回测，沿用成本、滑点和风控配置
+
+        参数扫描、Walk-Forward 在多个窗口间复用同一个引擎，不必每次重新构造。
+        """
+        self.prices = prices
+        self.signals = signals
+        self.symbol = symbol
+        self.signal_codes = encode_signals(signals)
+        self.cash = self.initial_cash
+        self.position = 0.0
+        self.risk_monitor = RiskMonitor(self.risk_control, self.initial_cash)
+
     def run(self) -> BacktestResult:
         """
         执行回测，返回标准结果对象
         """
-        equity_curve: list[float] = []
-        trades: list[Trade] = []
+        # 无成本、无滑点、风控至多只有回撤限制时走向量化快速路径
+        if self._is_frictionless():
+            return self.run_vectorized()
+
+        # 成本/滑点模型受支持且装了 numba 时，整个循环在编译内核中执行
+        kernel_params = self._kernel_params()
+        if kernel_params is not None:
+            kernel = backtest_kernel(self._kernel_variant())
+            if kernel is not None:
+                return self._run_compiled(kernel, kernel_params)
+
+        return self._run_loop()
+
+    def _kernel_variant(self) -> str:
+        """按风控配置选择特化内核，未启用的风控分支在编译期就被去掉"""
+        risk_control = self.risk_control
+        if not risk_control.enabled:
+            return "no_risk"
+        if risk_control.stop_loss_pct is None and risk_control.take_profit_pct is None:
+            return "dd_only"
+        return "full"
+
+    def _kernel_params(self) -> Optional[tuple]:
+        """
+        编译内核的标量参数（滑点系数、费率、风控阈值）
+
+        自定义的成本/滑点模型无法在内核中复刻，返回 None。
+        """
+        cost_model = self.cost_model
+        slippage_model = self.slippage_model
+        if type(cost_model) not in _KERNEL_COST_MODELS:
+            return None
+        if type(slippage_model) not in _KERNEL_SLIPPAGE_MODELS:
+            return None
+
+        if isinstance(slippage_model, FixedSlippage):
+            buy_factor, sell_factor = slippage_model.buy_factor, slippage_model.sell_factor
+        else:
+            buy_factor = sell_factor = 1.0
+
+        # 未启用的风控阈值用 NaN 表示，内核里的比较恒为 False
+        risk_control = self.risk_control
+        if risk_control.enabled:
+            position_ratio = min(1.0, risk_control.max_position_ratio)
+            max_drawdown_limit = risk_control.max_drawdown_limit
+            stop_loss_pct = risk_control.stop_loss_pct
+            take_profit_pct = risk_control.take_profit_pct
+        else:
+            position_ratio = 1.0
+            max_drawdown_limit = stop_loss_pct = take_profit_pct = None
+
+        return (
+            float(buy_factor),
+            float(sell_factor),
+            float(cost_model.commission_rate),
+            float(cost_model.min_commission),
+            float(cost_model.stamp_duty_rate),
+            float(position_ratio),
+            np.nan if max_drawdown_limit is None else float(max_drawdown_limit),
+            np.nan if stop_loss_pct is None else float(stop_loss_pct),
+            np.nan if take_profit_pct is None else float(take_profit_pct),
+        )
+
+    def _run_compiled(self, kernel, kernel_params: tuple) -> BacktestResult:
+        """用 numba 内核执行 _run_loop 的同一状态机，成交数组直接装入 TradeLog"""
+        prices = self.prices
+        n = len(prices)
+
+        codes = self._codes(n)
+        risk_monitor = self.risk_monitor
+        entry_price = risk_monitor.position_entry_price
+        (
+            equity_curve, bars, types, trade_prices, sizes, cash_after,
+            cash, position, risk_triggered,
+        ) = kernel(
+            np.asarray(prices, dtype=np.float64),
+            codes,
+            float(self.cash),
+            float(self.position),
+            entry_price is not None,
+            np.nan if entry_price is None else float(entry_price),
+            *kernel_params,
+        )
+
+        # 内核的成交类型编码与 TRADE_TYPES 一致
+        trades = TradeLog.from_arrays(
+            bars, types, trade_prices, sizes, cash_after,
+            np.where(types == BUY_CODE, sizes, 0.0),
+        )
+
+        self._sync_risk_monitor(trades, risk_triggered)
+
+        # 强制平仓
+        if position > 0:
+            actual_price = self.slippage_model.apply_to_sell(prices[-1])
+            cash = position * actual_price - self.cost_model.calculate_sell_cost(actual_price, position)
+            equity_curve[-1] = cash
+
+            trades.append(
+                price=actual_price,
+                size=-position,
+                cash_after=cash,
+                position_after=0.0,
+                bar_index=n - 1,
+                type="FORCE_EXIT"
+            )
+            position = 0.0
+
+        self.cash = cash
+        self.position = position
+
+        return BacktestResult(
+            symbol=self.symbol,
+            initial_cash=self.initial_cash,
+            final_equity=float(equity_curve[-1]),
+            equity_curve=equity_curve,
+            trades=trades,
+        )
+
+    def _sync_risk_monitor(self, trades: TradeLog, risk_triggered: bool):
+        """按成交记录同步风控状态：RISK_EXIT 不清除开仓价，与逐 bar 循环一致"""
+        risk_monitor = self.risk_monitor
+        if risk_triggered:
+            risk_monitor.force_exit_triggered = True
+        for trade in reversed(trades):
+            if trade.type == "BUY":
+                risk_monitor.set_entry_price(trade.price)
+                break
+            if trade.type != "RISK_EXIT":
+                risk_monitor.clear_position()
+                break
+
+    def _run_loop(self) -> BacktestResult:
+        """逐 bar 回测（支持成本、滑点和全部风控规则）"""
+        prices = self.prices
+        equity_curve = np.empty(len(prices), dtype=np.float64)
+        trades = TradeLog()
         entry_price: Optional[float] = None
+        # 逐元素迭代时 Python int 比 np.int8 标量比较更快
+        codes = self._codes(len(prices)).tolist()
 
-        for i, price in enumerate(self.prices):
-            signal = self.signals[i]
-            
-            # 检查是否触发最大回撤强平
-            if self.risk_monitor.check_max_drawdown(equity_curve):
-                if self.position > 0:
+        # 热循环内用到的状态和方法绑定为局部变量，循环结束后再写回 self
+        cash = self.cash
+        position = self.position
+        risk_monitor = self.risk_monitor
+        risk_monitor.reset_drawdown_monitor()
+        update_drawdown = risk_monitor.update_drawdown
+        check_stop_loss = risk_monitor.check_stop_loss
+        check_take_profit = risk_monitor.check_take_profit
+        apply_to_buy = self.slippage_model.apply_to_buy
+        apply_to_sell = self.slippage_model.apply_to_sell
+        calculate_buy_cost = self.cost_model.calculate_buy_cost
+        calculate_sell_cost = self.cost_model.calculate_sell_cost
+        add_trade = trades.append
+
+        equity = 0.0
+        for i, (price, code) in enumerate(zip(prices, codes)):
+            # 检查是否触发最大回撤强平（基于截至上一个 bar 的权益）
+            if i and update_drawdown(equity):
+                if position > 0:
                     # 强制平仓
-                    actual_price = self.slippage_model.apply_to_sell(price)
-                    cost = self.cost_model.calculate_sell_cost(actual_price, self.position)
+                    actual_price = apply_to_sell(price)
+                    cost = calculate_sell_cost(actual_price, position)
                     
-                    self.cash = self.position * actual_price - cost
-                    trades.append(Trade(
+                    cash = position * actual_price - cost
+                    add_trade(
                         price=actual_price,
-                        size=-self.position,
-                        cash_after=self.cash,
+                        size=-position,
+                        cash_after=cash,
                         position_after=0.0,
+                        bar_index=i,
                         type="RISK_EXIT"
-                    ))
-                    self.position = 0.0
+                    )
+                    position = 0.0
                     entry_price = None
                 
                 # 触发风控后不再交易
-                equity = self.cash + self.position * price
-                equity_curve.append(equity)
+                equity = cash + position * price
+                equity_curve[i] = equity
                 continue
 
             # 买入逻辑
-            if signal.name == "BUY" and self.position == 0:
+            if code == SIGNAL_BUY and position == 0:
                 # 应用滑点
-                actual_price = self.slippage_model.apply_to_buy(price)
+                actual_price = apply_to_buy(price)
                 
                 # 应用风控仓位限制
-                max_shares = self.risk_monitor.get_position_size(
-                    self.cash, actual_price, target_ratio=1.0
+                max_shares = risk_monitor.get_position_size(
+                    cash, actual_price, target_ratio=1.0
                 )
                 
                 # 计算买入成本
-                cost = self.cost_model.calculate_buy_cost(actual_price, max_shares)
+                cost = calculate_buy_cost(actual_price, max_shares)
                 
                 # 实际可买入股数
-                actual_shares = (self.cash - cost) / actual_price
-                self.position = actual_shares
-                self.cash = 0.0
+                actual_shares = (cash - cost) / actual_price
+                position = actual_shares
+                cash = 0.0
                 entry_price = actual_price
                 
-                self.risk_monitor.set_entry_price(actual_price)
+                risk_monitor.set_entry_price(actual_price)
                 
-                trades.append(Trade(
+                add_trade(
                     price=actual_price,
                     size=actual_shares,
-                    cash_after=self.cash,
-                    position_after=self.position,
+                    cash_after=cash,
+                    position_after=position,
+                    bar_index=i,
                     type="BUY"
-                ))
+                )
 
-            # 卖出逻辑
-            elif signal.name == "EXIT" and self.position > 0:
-                should_exit = True
-                exit_type = "EXIT"
+            # 持仓时：每个 bar 只判定一次平仓原因，再统一执行卖出
+            elif position > 0:
+                exit_type = None
                 
-                # 检查是否触发止损/止盈
+                # 止损/止盈优先于策略卖出信号
                 if entry_price is not None:
-                    if self.risk_monitor.check_stop_loss(entry_price, price):
+                    if check_stop_loss(entry_price, price):
                         exit_type = "STOP_LOSS"
-                    elif self.risk_monitor.check_take_profit(entry_price, price):
+                    elif check_take_profit(entry_price, price):
                         exit_type = "TAKE_PROFIT"
                 
-                if should_exit:
+                if exit_type is None and code == SIGNAL_EXIT:
+                    exit_type = "EXIT"
+                
+                if exit_type is not None:
                     # 应用滑点
-                    actual_price = self.slippage_model.apply_to_sell(price)
+                    actual_price = apply_to_sell(price)
                     
-                    proceeds = self.position * actual_price
-                    cost = self.cost_model.calculate_sell_cost(actual_price, self.position)
+                    proceeds = position * actual_price
+                    cost = calculate_sell_cost(actual_price, position)
                     
-                    self.cash = proceeds - cost
-                    trades.append(Trade(
+                    cash = proceeds - cost
+                    add_trade(
                         price=actual_price,
-                        size=-self.position,
-                        cash_after=self.cash,
+                        size=-position,
+                        cash_after=cash,
                         position_after=0.0,
+                        bar_index=i,
                         type=exit_type
-                    ))
-                    self.position = 0.0
-                    entry_price = None
-                    self.risk_monitor.clear_position()
-            
-            # 持仓时检查止损/止盈
-            elif self.position > 0 and entry_price is not None:
-                if self.risk_monitor.check_stop_loss(entry_price, price):
-                    # 触发止损
-                    actual_price = self.slippage_model.apply_to_sell(price)
-                    proceeds = self.position * actual_price
-                    cost = self.cost_model.calculate_sell_cost(actual_price, self.position)
-                    
-                    self.cash = proceeds - cost
-                    trades.append(Trade(
-                        price=actual_price,
-                        size=-self.position,
-                        cash_after=self.cash,
-                        position_after=0.0,
-                        type="STOP_LOSS"
-                    ))
-                    self.position = 0.0
-                    entry_price = None
-                    self.risk_monitor.clear_position()
-                
-                elif self.risk_monitor.check_take_profit(entry_price, price):
-                    # 触发止盈
-                    actual_price = self.slippage_model.apply_to_sell(price)
-                    proceeds = self.position * actual_price
-                    cost = self.cost_model.calculate_sell_cost(actual_price, self.position)
-                    
-                    self.cash = proceeds - cost
-                    trades.append(Trade(
-                        price=actual_price,
-                        size=-self.position,
-                        cash_after=self.cash,
-                        position_after=0.0,
-                        type="TAKE_PROFIT"
-                    ))
-                    self.position = 0.0
+                    )
+                    position = 0.0
                     entry_price = None
-                    self.risk_monitor.clear_position()
+                    risk_monitor.clear_position()
 
             # 当前总资产
-            equity = self.cash + self.position * price
-            equity_curve.append(equity)
+            equity = cash + position * price
+            equity_curve[i] = equity
 
-        # 强制平仓
-        if self.position > 0:
-            actual_price = self.slippage_model.apply_to_sell(self.prices[-1])
-            proceeds = self.position * actual_price
-            cost = self.cost_model.calculate_sell_cost(actual_price, self.position)
-            
-            self.cash = proceeds - cost
-            self.position = 0.0
-            equity_curve[-1] = self.cash
+        # 强制平仓：期末仍持仓时按最后价格卖出，只改写最后一个权益点
+        if position > 0:
+            actual_price = apply_to_sell(prices[-1])
+            cash = position * actual_price - calculate_sell_cost(actual_price, position)
+            equity_curve[-1] = cash
             
-            trades.append(Trade(
+            add_trade(
                 price=actual_price,
-                size=-self.position,
-                cash_after=self.cash,
+                size=-position,
+                cash_after=cash,
                 position_after=0.0,
+                bar_index=len(prices) - 1,
                 type="FORCE_EXIT"
-            ))
+            )
+            position = 0.0
+
+        self.cash = cash
+        self.position = position
 
         return BacktestResult(
             symbol=self.symbol,
             initial_cash=self.initial_cash,
-            final_equity=equity_curve[-1],
+            final_equity=float(equity_curve[-1]),
             equity_curve=equity_curve,
             trades=trades,
-        )
\ No newline at end of file
+        )
+
+    def _codes(self, n: int) -> np.ndarray:
+        """前 n 个 bar 的信号编码，信号不足时报错"""
+        if len(self.signal_codes) < n:
+            raise ValueError(f"信号数量不足: {len(self.signal_codes)} < {n}")
+        return self.signal_codes[:n]
+
+    def _is_frictionless(self) -> bool:
+        """
+        是否可以使用向量化快速路径
+
+        无成本、无滑点，且风控未启用或只有最大回撤限制（无止损/止盈）。
+        无成本时仓位上限不影响买入股数，因此不需要检查 max_position_ratio。
+        """
+        risk_control = self.risk_control
+        return (
+            isinstance(self.cost_model, NoCostModel)
+            and isinstance(self.slippage_model, NoSlippage)
+            and (
+                not risk_control.enabled
+                or (risk_control.stop_loss_pct is None and risk_control.take_profit_pct is None)
+            )
+        )
+
+    def run_vectorized(self) -> BacktestResult:
+        """
+        向量化回测（仅适用于 _is_frictionless() 的情形）
+
+        信号编码为 int8（SIGNAL_BUY / SIGNAL_EXIT / SIGNAL_HOLD）。
+        安装了 numba 时整个状态机在编译内核中执行；否则只在信号点逐个处理，
+        两个信号点之间的权益用一次 NumPy 运算批量填充。
+        启用回撤限制时，先按无风控跑完整段，再用 running peak 批量找出首个强平 bar：
+        在该 bar 平仓后，若仍处于回撤线下则之后权益不变，否则从下一个 bar 起
+        重新向量化扫描剩余区间。
+        结果与 _run_loop() 一致。
+        """
+        prices_arr = np.asarray(self.prices, dtype=np.float64)
+        n = len(prices_arr)
+        sig = self._codes(n)
+
+        equity_curve = np.empty(n, dtype=np.float64)
+        trades = TradeLog()
+        cash = self.cash
+        position = self.position
+        risk_monitor = self.risk_monitor
+        max_drawdown_limit = self.risk_control.max_drawdown_limit
+        risk_triggered = False
+        start = 0
+
+        while start < n:
+            seg_equity, seg_trades, seg_cash, seg_position = self._scan_transitions(
+                prices_arr[start:], sig[start:], cash, position
+            )
+            equity_curve[start:] = seg_equity
+
+            trigger = risk_monitor.first_drawdown_breach(equity_curve, start)
+            if trigger is None:
+                trades.extend(seg_trades, bar_offset=start)
+                cash, position = seg_cash, seg_position
+                break
+
+            # 触发 bar 之前的成交照常保留
+            kept = int(np.searchsorted(seg_trades.column("bar_index"), trigger - start))
+            trades.extend(seg_trades, stop=kept, bar_offset=start)
+            if kept:
+                cash = float(seg_trades.cash_after[kept - 1])
+                position = float(seg_trades.position_after[kept - 1])
+            risk_triggered = True
+
+            # 强平，且触发当 bar 不再交易
+            price = self.prices[trigger]
+            if position > 0:
+                cash = position * price
+                trades.append(
+                    price=price,
+                    size=-position,
+                    cash_after=cash,
+                    position_after=0.0,
+                    bar_index=trigger,
+                    type="RISK_EXIT"
+                )
+                position = 0.0
+            equity_curve[trigger] = cash
+
+            # 空仓后权益恒定：触发 bar 仍在回撤线下时，之后每个 bar 都会继续触发
+            peak = equity_curve[:trigger + 1].max()
+            if (cash - peak) / peak <= max_drawdown_limit:
+                equity_curve[trigger + 1:] = cash
+                break
+            start = trigger + 1
+
+        self._sync_risk_monitor(trades, risk_triggered)
+
+        # 强制平仓
+        if position > 0:
+            cash = position * self.prices[-1]
+            equity_curve[-1] = cash
+
+            trades.append(
+                price=self.prices[-1],
+                size=-position,
+                cash_after=cash,
+                position_after=0.0,
+                bar_index=len(self.prices) - 1,
+                type="FORCE_EXIT"
+            )
+            position = 0.0
+
+        self.cash = cash
+        self.position = position
+
+        return BacktestResult(
+            symbol=self.symbol,
+            initial_cash=self.initial_cash,
+            final_equity=float(equity_curve[-1]),
+            equity_curve=equity_curve,
+            trades=trades,
+        )
+
+    def _scan_transitions(self, prices_arr: np.ndarray, sig: np.ndarray, cash: float, position: float):
+        """
+        无风控的无摩擦状态机（bar 序号相对 prices_arr）
+
+        Returns:
+            (equity_curve, trades, cash, position)
+        """
+        kernel = frictionless_backtest_kernel()
+        if kernel is not None:
+            equity_curve, bars, sizes, cash_after, cash, position = kernel(
+                prices_arr, sig, float(cash), float(position)
+            )
+            is_buy = sizes > 0
+            trades = TradeLog.from_arrays(
+                bars,
+                np.where(is_buy, BUY_CODE, TRADE_TYPE_CODES["EXIT"]),
+                prices_arr[bars],
+                sizes,
+                cash_after,
+                np.where(is_buy, sizes, 0.0),
+            )
+            return equity_curve, trades, cash, position
+
+        # NumPy 路径：只遍历信号点
+        n = len(prices_arr)
+        equity_curve = np.empty(n, dtype=np.float64)
+        trades = TradeLog()
+        start = 0
+
+        for i in np.flatnonzero(sig).tolist():
+            # 两个信号点之间持仓不变
+            equity_curve[start:i] = cash + position * prices_arr[start:i]
+            price = float(prices_arr[i])
+
+            if sig[i] == SIGNAL_BUY and position == 0:
+                position = cash / price
+                cash = 0.0
+                trades.append(
+                    price=price,
+                    size=position,
+                    cash_after=cash,
+                    position_after=position,
+                    bar_index=i,
+                    type="BUY"
+                )
+            elif sig[i] == SIGNAL_EXIT and position > 0:
+                cash = position * price
+                trades.append(
+                    price=price,
+                    size=-position,
+                    cash_after=cash,
+                    position_after=0.0,
+                    bar_index=i,
+                    type="EXIT"
+                )
+                position = 0.0
+
+            equity_curve[i] = cash + position * price
+            start = i + 1
+
+        equity_curve[start:] = cash + position * prices_arr[start:]
+
+        return equity_curve, trades, cash, position
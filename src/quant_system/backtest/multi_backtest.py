@@ -1,19 +1,132 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+import numpy as np
 from quant_system.backtest.engine import BacktestEngine
+from quant_system.backtest.result import BacktestResult
+from quant_system.backtest.signal import encode_signals
+
+DEFAULT_CACHE_DIR = Path(".cache") / "backtest"
+# 缓存格式 / 回测逻辑版本：引擎、成本模型或 BacktestResult 的行为变化时递增，旧缓存自动失效
+CACHE_VERSION = 1
+
+
+def _run_one(task: tuple) -> BacktestResult:
+    """子进程入口：只接收基础类型的 (symbol, prices, signals)"""
+    symbol, prices, signals = task
+    bt = BacktestEngine(
+        prices=prices,
+        signals=signals,
+        symbol=symbol,
+    )
+    return bt.run()
+
+
+class ResultCache:
+    """
+    回测结果磁盘缓存（每个 key 一个 pickle 文件）
+
+    key = sha256(CACHE_VERSION + 价格字节 + 信号编码字节 + 参数 JSON)
+    """
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    @staticmethod
+    def make_key(prices, signals, params: dict) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}".encode())
+        digest.update(np.ascontiguousarray(prices, dtype=np.float64).tobytes())
+        digest.update(encode_signals(signals).tobytes())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[BacktestResult]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        with path.open("rb") as f:
+            return pickle.load(f)
+
+    def put(self, key: str, result: BacktestResult):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 每个写入者用独立的临时文件，写完再原子替换：
+        # 并发写同一个 key 不会互相覆盖临时文件，读者也不会读到半个文件
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            try:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except BaseException:
+                f.close()
+                os.unlink(tmp_path)
+                raise
+        os.replace(tmp_path, self._path(key))
+
 
 class MultiBacktest:
-    def __init__(self, data_list):
+    def __init__(
+        self,
+        data_list,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        use_cache: bool = False,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+    ):
+        """
+        Args:
+            data_list: [(symbol, prices, signals), ...]
+            parallel: 是否多进程并行（默认关闭：小任务启动进程池的开销大于收益，标的多时再开启）
+            max_workers: 进程数，默认 os.cpu_count()
+            use_cache: 是否启用磁盘结果缓存
+            cache_dir: 缓存目录
+        """
         self.data_list = data_list
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.cache = ResultCache(cache_dir) if use_cache else None
 
     def run(self) -> list:
-        results = []
+        tasks = [(symbol, prices, signals) for symbol, prices, signals in self.data_list]
+        results: list = [None] * len(tasks)
+
+        # 先查缓存，只对未命中的任务跑回测
+        keys = None
+        pending = list(range(len(tasks)))
+        if self.cache is not None:
+            keys = [
+                self.cache.make_key(prices, signals, {"symbol": symbol})
+                for symbol, prices, signals in tasks
+            ]
+            pending = []
+            for i, key in enumerate(keys):
+                results[i] = self.cache.get(key)
+                if results[i] is None:
+                    pending.append(i)
 
-        for symbol, prices, signals in self.data_list:
-            bt = BacktestEngine(
-                prices=prices,
-                signals=signals,
-                symbol=symbol,
-            )
-            result = bt.run()
-            results.append(result)
+        computed = self._run_tasks([tasks[i] for i in pending])
+
+        for i, result in zip(pending, computed):
+            results[i] = result
+            if keys is not None:
+                self.cache.put(keys[i], result)
 
         return results
+
+    def _run_tasks(self, tasks: list) -> list:
+        # 单个标的没有并行收益，直接串行
+        if not self.parallel or len(tasks) <= 1:
+            return [_run_one(task) for task in tasks]
+
+        workers = min(self.max_workers or os.cpu_count() or 1, len(tasks))
+        chunksize = max(1, len(tasks) // (4 * workers))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_run_one, tasks, chunksize=chunksize))
@@ -1,171 +1,194 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Optional, Sequence
 import numpy as np
 
+from quant_system.analysis._numeric import max_drawdown as _max_drawdown, return_std as _return_std
+from quant_system.backtest.trade import BUY_CODE, TRADE_TYPE_CODES, TradeLog
 
-@dataclass
+# 平仓成交类型（与 BUY 配对计算交易指标）
+_EXIT_TYPES = frozenset({"EXIT", "FORCE_EXIT"})
+_EXIT_CODES = np.array([TRADE_TYPE_CODES[t] for t in sorted(_EXIT_TYPES)], dtype=np.int8)
+
+# to_row / to_tuple 的固定列（params 的键依次追加在后面）
+_ROW_FIELDS = (
+    "symbol", "final_equity", "total_return", "annual_return",
+    "max_drawdown", "sharpe_ratio", "win_rate", "num_trades",
+)
+
+
+def _cached_metric(func):
+    """
+    slots 版 cached_property：首次访问计算，结果存入同名下划线字段
+
+    functools.cached_property 依赖实例 __dict__，与 slots=True 不兼容，
+    所以缓存仍落在 `_<name>` 字段上，但不再在每个指标里手写判空逻辑。
+    """
+    slot = "_" + func.__name__
+
+    @wraps(func)
+    def getter(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = func(self)
+            setattr(self, slot, value)
+        return value
+
+    return property(getter)
+
+
+def _cache_field():
+    """指标缓存字段：不进 __init__ / repr / 比较"""
+    return field(default=None, init=False, repr=False, compare=False)
+
+
+@dataclass(slots=True)
 class BacktestResult:
     symbol: str
     initial_cash: float
     final_equity: float
-    equity_curve: List[float]
-    trades: Optional[List] = None  # ✅ 新增：交易记录
+    equity_curve: np.ndarray  # 只读 float64 数组（传入 list / array('d') 时构造时转换一次）
+    trades: Optional[Sequence] = None  # ✅ 新增：交易记录（引擎输出为 TradeLog）
     params: Optional[dict] = None
 
-    # 内部缓存字段
-    _total_return: Optional[float] = None
-    _max_drawdown: Optional[float] = None
-    _sharpe_ratio: Optional[float] = None
-    _annual_return: Optional[float] = None
-    _annual_volatility: Optional[float] = None
-    _win_rate: Optional[float] = None
-    _num_trades: Optional[int] = None
-    _avg_trade_return: Optional[float] = None
-    _profit_factor: Optional[float] = None
+    # 内部缓存字段（由 _cached_metric 填充）
+    _total_return: Optional[float] = _cache_field()
+    _max_drawdown: Optional[float] = _cache_field()
+    _sharpe_ratio: Optional[float] = _cache_field()
+    _annual_return: Optional[float] = _cache_field()
+    _annual_volatility: Optional[float] = _cache_field()
+    _trade_stats: Optional[dict] = _cache_field()
+
+    def __post_init__(self):
+        # 只读视图：指标缓存依赖权益曲线不变，且不影响调用方持有的原数组
+        # 非 ndarray（list、Account 的 array('d')）复制一份：共享 array('d') 的缓冲区
+        # 会让调用方之后无法再 append（BufferError），且原数组仍可被改写
+        if isinstance(self.equity_curve, np.ndarray):
+            equity_curve = np.ascontiguousarray(self.equity_curve, dtype=np.float64).view()
+        else:
+            equity_curve = np.array(self.equity_curve, dtype=np.float64)
+        equity_curve.flags.writeable = False
+        self.equity_curve = equity_curve
+
+    @staticmethod
+    def calc_return(final_equity: float, initial_equity: float) -> float:
+        """
+        区间收益率（唯一实现，其他 total_return 都调用这里）
 
-    @property
+        用 (final - initial) / initial 而不是 final / initial - 1，
+        两者接近时相减是精确的，避免 1 附近的抵消误差。
+        """
+        return (final_equity - initial_equity) / initial_equity
+
+    @_cached_metric
     def total_return(self) -> float:
         """总收益率"""
-        if self._total_return is None:
-            self._total_return = (self.final_equity / self.initial_cash) - 1
-        return self._total_return
+        return self.calc_return(self.final_equity, self.initial_cash)
 
-    @property
+    @_cached_metric
     def max_drawdown(self) -> float:
         """最大回撤（返回负值，如 -0.2 表示 -20%）"""
-        if self._max_drawdown is None:
-            peak = self.equity_curve[0]
-            max_dd = 0.0
-
-            for equity in self.equity_curve:
-                peak = max(peak, equity)
-                drawdown = (equity - peak) / peak
-                max_dd = min(max_dd, drawdown)
-
-            self._max_drawdown = max_dd
-
-        return self._max_drawdown
+        return _max_drawdown(self.equity_curve)
 
-    @property
+    @_cached_metric
     def sharpe_ratio(self) -> float:
         """
         夏普比率
         公式：(年化收益 - 无风险利率) / 年化波动率
         """
-        if self._sharpe_ratio is None:
-            if len(self.equity_curve) < 2:
-                return 0.0
-
-            # 计算日收益率
-            equity_array = np.array(self.equity_curve)
-            daily_returns = np.diff(equity_array) / equity_array[:-1]
-
-            if len(daily_returns) == 0:
-                return 0.0
+        if len(self.equity_curve) < 2:
+            return 0.0
 
-            # 年化波动率
-            annual_vol = np.std(daily_returns, ddof=1) * np.sqrt(252)
+        # 年化波动率（与 annual_volatility 共用同一份缓存）
+        annual_vol = self.annual_volatility
 
-            if annual_vol == 0:
-                return 0.0
+        if annual_vol == 0:
+            return 0.0
 
-            # 无风险利率（假设 3%）
-            risk_free_rate = 0.03
+        # 无风险利率（假设 3%）
+        risk_free_rate = 0.03
 
-            # Sharpe = (年化收益 - 无风险利率) / 年化波动率
-            self._sharpe_ratio = (self.annual_return - risk_free_rate) / annual_vol
+        # Sharpe = (年化收益 - 无风险利率) / 年化波动率
+        return (self.annual_return - risk_free_rate) / annual_vol
 
-        return self._sharpe_ratio
-
-    @property
+    @_cached_metric
     def annual_return(self) -> float:
         """
         年化收益率
         假设 equity_curve 是日线数据
         """
-        if self._annual_return is None:
-            n_days = len(self.equity_curve)
-            if n_days == 0:
-                return 0.0
+        n_days = len(self.equity_curve)
+        if n_days == 0:
+            return 0.0
 
-            # 年化公式：(1 + 总收益率)^(252/天数) - 1
-            self._annual_return = (1 + self.total_return) ** (252 / n_days) - 1
+        # 年化公式：(1 + 总收益率)^(252/天数) - 1
+        return (1 + self.total_return) ** (252 / n_days) - 1
 
-        return self._annual_return
-
-    @property
+    @_cached_metric
     def annual_volatility(self) -> float:
         """年化波动率"""
-        if self._annual_volatility is None:
-            if len(self.equity_curve) < 2:
-                return 0.0
+        # 年化波动率 = 日波动率 * sqrt(252)；日波动率单次扫描，不生成收益率数组
+        return _return_std(self.equity_curve) * np.sqrt(252)
 
-            equity_array = np.array(self.equity_curve)
-            daily_returns = np.diff(equity_array) / equity_array[:-1]
-
-            # 年化波动率 = 日波动率 * sqrt(252)
-            self._annual_volatility = np.std(daily_returns, ddof=1) * np.sqrt(252)
+    @_cached_metric
+    def trade_stats(self) -> dict:
+        """
+        交易统计：基于 TradeLog 列数组，用掩码一次性计算全部交易指标
 
-        return self._annual_volatility
+        买卖按出现顺序两两配对（多出的一侧忽略）。
+        """
+        stats = {"num_trades": 0, "win_rate": 0.0, "avg_trade_return": 0.0, "profit_factor": 0.0}
+        if not self.trades:
+            return stats
+
+        log = TradeLog.from_trades(self.trades)
+        type_code = log.column("type_code")
+        price = log.column("price")
+        buy_mask = type_code == BUY_CODE
+        exit_mask = np.isin(type_code, _EXIT_CODES)
+
+        buy_px = price[buy_mask]
+        buy_sz = log.column("size")[buy_mask]
+        sell_px = price[exit_mask]
+
+        # 只统计开仓交易（BUY）
+        stats["num_trades"] = len(buy_px)
+
+        n_pairs = min(len(buy_px), len(sell_px))
+        if n_pairs == 0:
+            return stats
+
+        buy_px = buy_px[:n_pairs]
+        diff = sell_px[:n_pairs] - buy_px
+        pnl = diff * buy_sz[:n_pairs]
+
+        # ndarray.sum 为 pairwise 求和，误差 O(log N)，比逐笔 += 累加更稳
+        win = pnl > 0
+        total_profit = float(pnl[win].sum())
+        total_loss = float(-pnl[~win].sum())
+
+        stats["win_rate"] = int(win.sum()) / n_pairs
+        stats["avg_trade_return"] = float(np.mean(diff / buy_px))
+        if total_loss == 0:
+            stats["profit_factor"] = float('inf') if total_profit > 0 else 0.0
+        else:
+            stats["profit_factor"] = total_profit / total_loss
+        return stats
 
     @property
     def num_trades(self) -> int:
         """交易次数"""
-        if self._num_trades is None:
-            if self.trades is None:
-                return 0
-            # 只统计开仓交易（BUY）
-            self._num_trades = sum(1 for t in self.trades if t.type == "BUY")
-        return self._num_trades
+        return self.trade_stats["num_trades"]
 
     @property
     def win_rate(self) -> float:
-        """
-        胜率（盈利交易 / 总交易）
-        需要配对买卖计算
-        """
-        if self._win_rate is None:
-            if self.trades is None or len(self.trades) == 0:
-                return 0.0
-
-            # 简化实现：配对买入和卖出
-            buy_trades = [t for t in self.trades if t.type == "BUY"]
-            sell_trades = [t for t in self.trades if t.type in ["EXIT", "FORCE_EXIT"]]
-
-            if len(buy_trades) == 0 or len(sell_trades) == 0:
-                return 0.0
-
-            wins = 0
-            for i, (buy, sell) in enumerate(zip(buy_trades, sell_trades)):
-                profit = (sell.price - buy.price) * buy.size
-                if profit > 0:
-                    wins += 1
-
-            self._win_rate = wins / min(len(buy_trades), len(sell_trades))
-
-        return self._win_rate
+        """胜率（盈利交易 / 配对交易数）"""
+        return self.trade_stats["win_rate"]
 
     @property
     def avg_trade_return(self) -> float:
         """平均单笔收益率"""
-        if self._avg_trade_return is None:
-            if self.trades is None or len(self.trades) == 0:
-                return 0.0
-
-            buy_trades = [t for t in self.trades if t.type == "BUY"]
-            sell_trades = [t for t in self.trades if t.type in ["EXIT", "FORCE_EXIT"]]
-
-            if len(buy_trades) == 0 or len(sell_trades) == 0:
-                return 0.0
-
-            returns = []
-            for buy, sell in zip(buy_trades, sell_trades):
-                ret = (sell.price - buy.price) / buy.price
-                returns.append(ret)
-
-            self._avg_trade_return = np.mean(returns)
-
-        return self._avg_trade_return
+        return self.trade_stats["avg_trade_return"]
 
     @property
     def profit_factor(self) -> float:
@@ -173,32 +196,7 @@ class BacktestResult:
         盈亏比（总盈利 / 总亏损）
         > 1 表示盈利大于亏损
         """
-        if self._profit_factor is None:
-            if self.trades is None or len(self.trades) == 0:
-                return 0.0
-
-            buy_trades = [t for t in self.trades if t.type == "BUY"]
-            sell_trades = [t for t in self.trades if t.type in ["EXIT", "FORCE_EXIT"]]
-
-            if len(buy_trades) == 0 or len(sell_trades) == 0:
-                return 0.0
-
-            total_profit = 0.0
-            total_loss = 0.0
-
-            for buy, sell in zip(buy_trades, sell_trades):
-                pnl = (sell.price - buy.price) * buy.size
-                if pnl > 0:
-                    total_profit += pnl
-                else:
-                    total_loss += abs(pnl)
-
-            if total_loss == 0:
-                return float('inf') if total_profit > 0 else 0.0
-
-            self._profit_factor = total_profit / total_loss
-
-        return self._profit_factor
+        return self.trade_stats["profit_factor"]
 
     def summary(self) -> dict:
         """返回所有关键指标"""
@@ -216,21 +214,31 @@ class BacktestResult:
             "profit_factor": self.profit_factor,
         }
 
+    def row_fields(self) -> tuple:
+        """to_row / to_tuple 的列名"""
+        if self.params:
+            return _ROW_FIELDS + tuple(self.params)
+        return _ROW_FIELDS
+
+    def to_tuple(self) -> tuple:
+        """格式化输出的值元组，顺序同 row_fields()（批量写 CSV 时不构造 dict）"""
+        values = (
+            self.symbol,
+            f"{self.final_equity:,.2f}",
+            f"{self.total_return * 100:.2f}%",
+            f"{self.annual_return * 100:.2f}%",
+            f"{self.max_drawdown * 100:.2f}%",
+            f"{self.sharpe_ratio:.2f}",
+            f"{self.win_rate * 100:.1f}%",
+            self.num_trades,
+        )
+        if self.params:
+            return values + tuple(self.params.values())
+        return values
+
     def to_row(self) -> dict:
         """格式化输出（用于表格显示）"""
-        row = {
-            "symbol": self.symbol,
-            "final_equity": f"{self.final_equity:,.2f}",
-            "total_return": f"{self.total_return * 100:.2f}%",
-            "annual_return": f"{self.annual_return * 100:.2f}%",
-            "max_drawdown": f"{self.max_drawdown * 100:.2f}%",
-            "sharpe_ratio": f"{self.sharpe_ratio:.2f}",
-            "win_rate": f"{self.win_rate * 100:.1f}%",
-            "num_trades": self.num_trades,
-        }
-        if self.params:
-            row.update(self.params)
-        return row
+        return dict(zip(self.row_fields(), self.to_tuple()))
 
     def to_dict(self) -> dict:
         """返回原始数值（用于程序处理）"""
@@ -8,7 +8,7 @@
 - 单日最大亏损限制
 """
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Union
 import numpy as np
 
 
@@ -47,7 +47,11 @@ class RiskMonitor:
         self.position_entry_price: Optional[float] = None
         self.force_exit_triggered = False
         
-    def check_max_drawdown(self, equity_curve: List[float]) -> bool:
+        # 增量回撤监控状态（update_drawdown 使用）
+        self._running_peak: Optional[float] = None
+        self._num_equity_points = 0
+        
+    def check_max_drawdown(self, equity_curve: Union[np.ndarray, List[float]]) -> bool:
         """
         检查是否触发最大回撤限制
         
@@ -69,6 +73,65 @@ class RiskMonitor:
         
         return False
     
+    def update_drawdown(self, equity: float) -> bool:
+        """
+        增量版 check_max_drawdown：逐 bar 喂入最新权益，O(1) 维护 running peak
+
+        对已喂入的权益序列调用 check_max_drawdown 的结果与此一致。
+
+        Returns:
+            True: 触发强制平仓
+            False: 未触发
+        """
+        if not self.risk_control.enabled:
+            return False
+        
+        if self._running_peak is None or equity > self._running_peak:
+            self._running_peak = equity
+        self._num_equity_points += 1
+        
+        if self._num_equity_points < 2:
+            return False
+        
+        current_drawdown = (equity - self._running_peak) / self._running_peak
+        
+        if current_drawdown <= self.risk_control.max_drawdown_limit:
+            self.force_exit_triggered = True
+            return True
+        
+        return False
+    
+    def reset_drawdown_monitor(self):
+        """清空增量回撤监控状态（用于新的一次回测）"""
+        self._running_peak = None
+        self._num_equity_points = 0
+    
+    def first_drawdown_breach(self, equity_curve: np.ndarray, start: int = 0) -> Optional[int]:
+        """
+        批量版 check_max_drawdown：返回第一个会触发强平的 bar 序号
+
+        第 i 个 bar 的检查基于 equity_curve[:i]，因此返回值是首个越线点的下一个 bar。
+
+        Args:
+            equity_curve: 权益序列
+            start: 只查找 start 之后（不含）的 bar
+
+        Returns:
+            bar 序号；整段都不触发时返回 None
+        """
+        if not self.risk_control.enabled or len(equity_curve) < 3:
+            return None
+
+        # 最后一个点之后没有 bar 再做检查
+        equity_array = np.asarray(equity_curve[:-1], dtype=np.float64)
+        peak = np.maximum.accumulate(equity_array)
+        first = max(start, 1)
+        drawdown = (equity_array[first:] - peak[first:]) / peak[first:]
+        breaches = np.flatnonzero(drawdown <= self.risk_control.max_drawdown_limit)
+        if len(breaches) == 0:
+            return None
+        return int(breaches[0]) + first + 1
+
     def check_stop_loss(self, entry_price: float, current_price: float) -> bool:
         """
         检查是否触发止损
@@ -175,9 +238,9 @@ class RiskMonitor:
         
         return cash * actual_ratio / price
     
-    def _calculate_current_drawdown(self, equity_curve: List[float]) -> float:
-        """计算当前回撤"""
-        equity_array = np.array(equity_curve)
+    def _calculate_current_drawdown(self, equity_curve: Union[np.ndarray, List[float]]) -> float:
+        """计算当前回撤（ndarray 输入不再复制）"""
+        equity_array = np.asarray(equity_curve, dtype=np.float64)
         peak = np.maximum.accumulate(equity_array)
         drawdown = (equity_array - peak) / peak
         return float(drawdown[-1])
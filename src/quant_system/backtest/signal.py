@@ -1,10 +1,17 @@
-from enum import Enum
+from enum import IntEnum
+from itertools import islice
+from typing import Optional
+import numpy as np
 
-class SignalType(Enum):
-    BUY = "BUY"
-    EXIT = "EXIT"
-    SELL_STOP = "SELL_STOP"  # 预留给风控
-    HOLD = "HOLD"
+class SignalType(IntEnum):
+    """
+    交易信号（整数编码，可直接打包进 int8 数组）
+    """
+    HOLD = 0
+    BUY = 1
+    EXIT = -1
+    SELL = -1       # EXIT 的别名
+    SELL_STOP = -2  # 预留给风控
 
 class Signal:
     """
@@ -12,7 +19,34 @@ class Signal:
     """
     def __init__(self, type: SignalType):
         self.type = type
-        self.name = type.value  # ✅ 保持兼容性
+        self.name = type.name  # ✅ 保持兼容性
 
     def __repr__(self):
-        return f"Signal({self.type.value})"  # ✅ 修正
\ No newline at end of file
+        return f"Signal({self.type.name})"  # ✅ 修正
+
+
+# 信号整数编码（即 SignalType 的值）：热循环内按小整数分支，避免逐 bar 的枚举比较
+SIGNAL_BUY = int(SignalType.BUY)
+SIGNAL_EXIT = int(SignalType.EXIT)
+SIGNAL_HOLD = int(SignalType.HOLD)
+# 按名字查表，SignalType 和 Signal 包装对象都有 name
+_SIGNAL_CODES = {signal_type.name: int(signal_type) for signal_type in SignalType}
+
+
+def encode_signals(signals, n: Optional[int] = None) -> np.ndarray:
+    """
+    将信号序列编码为 int8 数组（SignalType 的整数值，未知信号记为 SIGNAL_HOLD）
+
+    Args:
+        signals: SignalType 或 Signal 对象序列；已编码的整数数组直接转为 int8
+        n: 只编码前 n 个信号（默认全部）
+    """
+    if isinstance(signals, np.ndarray):
+        return signals[:n].astype(np.int8)
+    if n is None:
+        n = len(signals)
+    return np.fromiter(
+        (_SIGNAL_CODES.get(s.name, SIGNAL_HOLD) for s in islice(signals, n)),
+        dtype=np.int8,
+        count=n,
+    )
@@ -6,9 +6,9 @@
 - 比例滑点
 - 基于成交量的滑点
 """
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from typing import Optional
-import numpy as np
 
 
 @dataclass
@@ -33,15 +33,22 @@ class FixedSlippage(SlippageModel):
     """
     slippage_bps: int = 5  # 5 个基点 = 0.05%
     
+    # 买卖价格系数，构造时算一次
+    buy_factor: float = field(init=False, repr=False)
+    sell_factor: float = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        slippage = self.slippage_bps / 10000
+        self.buy_factor = 1 + slippage
+        self.sell_factor = 1 - slippage
+    
     def apply_to_buy(self, price: float) -> float:
         """买入时价格上滑"""
-        slippage = self.slippage_bps / 10000
-        return price * (1 + slippage)
+        return price * self.buy_factor
     
     def apply_to_sell(self, price: float) -> float:
         """卖出时价格下滑"""
-        slippage = self.slippage_bps / 10000
-        return price * (1 - slippage)
+        return price * self.sell_factor
 
 
 @dataclass
@@ -54,6 +61,11 @@ class ProportionalSlippage(SlippageModel):
     base_slippage_bps: int = 5      # 基础滑点
     size_impact_factor: float = 0.01  # 规模影响系数
     
+    base_slip: float = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.base_slip = self.base_slippage_bps / 10000
+    
     def apply_to_buy(self, price: float, size: float = 1000) -> float:
         """
         买入时价格上滑
@@ -62,21 +74,17 @@ class ProportionalSlippage(SlippageModel):
             price: 原始价格
             size: 交易数量（用于计算市场冲击）
         """
-        # 基础滑点
-        base_slip = self.base_slippage_bps / 10000
-        
-        # 市场冲击（交易量越大，冲击越大）
-        market_impact = self.size_impact_factor * np.log(1 + size / 1000)
+        # 市场冲击（交易量越大，冲击越大）；标量用 math.log1p，免去 ufunc 开销
+        market_impact = self.size_impact_factor * math.log1p(size / 1000)
         
-        total_slippage = base_slip + market_impact
+        total_slippage = self.base_slip + market_impact
         return price * (1 + total_slippage)
     
     def apply_to_sell(self, price: float, size: float = 1000) -> float:
         """卖出时价格下滑"""
-        base_slip = self.base_slippage_bps / 10000
-        market_impact = self.size_impact_factor * np.log(1 + size / 1000)
+        market_impact = self.size_impact_factor * math.log1p(size / 1000)
         
-        total_slippage = base_slip + market_impact
+        total_slippage = self.base_slip + market_impact
         return price * (1 - total_slippage)
 
 
@@ -105,7 +113,7 @@ class VolumeBasedSlippage(SlippageModel):
         volume_ratio = size / vol
         
         # 市场冲击 = 系数 * sqrt(交易量占比)
-        impact = self.impact_coefficient * np.sqrt(volume_ratio)
+        impact = self.impact_coefficient * math.sqrt(volume_ratio)
         
         return price * (1 + impact)
     
@@ -113,7 +121,7 @@ class VolumeBasedSlippage(SlippageModel):
         """卖出时价格下滑"""
         vol = volume if volume is not None else self.daily_volume
         volume_ratio = size / vol
-        impact = self.impact_coefficient * np.sqrt(volume_ratio)
+        impact = self.impact_coefficient * math.sqrt(volume_ratio)
         
         return price * (1 - impact)
 
@@ -1,9 +1,150 @@
+from collections.abc import Sequence
 from dataclasses import dataclass
+from operator import attrgetter
+from typing import Iterable, Optional
+import numpy as np
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Trade:
     price: float       # 成交价格
     size: float        # 买入或卖出数量（正表示买，负表示卖）
     cash_after: float  # 成交后现金
     position_after: float  # 成交后持仓
     type: str          # 'BUY' 或 'SELL'
+    bar_index: Optional[int] = None  # 成交所在 bar 的序号
+
+
+# 成交类型整数编码（0 保留不用；1~5 与回测内核的编码一致，新类型只能追加在末尾）
+TRADE_TYPES = ("", "BUY", "EXIT", "STOP_LOSS", "TAKE_PROFIT", "RISK_EXIT", "FORCE_EXIT", "SELL", "SELL_STOP")
+TRADE_TYPE_CODES = {name: code for code, name in enumerate(TRADE_TYPES) if name}
+BUY_CODE = TRADE_TYPE_CODES["BUY"]
+
+
+def _type_code(type: str) -> int:
+    """成交类型 -> 整数编码，未知类型直接报错（不能静默存成空类型）"""
+    try:
+        return TRADE_TYPE_CODES[type]
+    except KeyError:
+        raise ValueError(f"未知的成交类型: {type!r}，可选: {list(TRADE_TYPE_CODES)}") from None
+
+# 一次 C 层调用取出 Trade 的全部字段
+_TRADE_FIELDS = attrgetter("bar_index", "type", "price", "size", "cash_after", "position_after")
+
+
+class TradeLog(Sequence):
+    """
+    成交记录（列式存储）
+
+    每个字段一个 ndarray，按行追加；容量不足时倍增。
+    下标访问 / 迭代时按需构造 Trade，指标计算直接用列数组做掩码。
+    """
+    __slots__ = ("price", "size", "cash_after", "position_after", "bar_index", "type_code", "count")
+
+    def __init__(self, capacity: int = 16):
+        capacity = max(capacity, 1)
+        self.price = np.empty(capacity)
+        self.size = np.empty(capacity)
+        self.cash_after = np.empty(capacity)
+        self.position_after = np.empty(capacity)
+        self.bar_index = np.empty(capacity, dtype=np.int64)  # -1 表示未知
+        self.type_code = np.empty(capacity, dtype=np.int8)
+        self.count = 0
+
+    @classmethod
+    def from_arrays(cls, bar_index, type_code, price, size, cash_after, position_after, extra: int = 1) -> "TradeLog":
+        """由回测内核输出的列数组构造（预留 extra 行给后续追加的成交）"""
+        n = len(price)
+        log = cls(n + extra)
+        log.bar_index[:n] = bar_index
+        log.type_code[:n] = type_code
+        log.price[:n] = price
+        log.size[:n] = size
+        log.cash_after[:n] = cash_after
+        log.position_after[:n] = position_after
+        log.count = n
+        return log
+
+    @classmethod
+    def from_trades(cls, trades: Iterable[Trade]) -> "TradeLog":
+        """由 Trade 对象序列构造"""
+        if isinstance(trades, TradeLog):
+            return trades
+        rows = list(map(_TRADE_FIELDS, trades))
+        if not rows:
+            return cls()
+        # 行转列后整列写入
+        bar_index, types, price, size, cash_after, position_after = zip(*rows)
+        return cls.from_arrays(
+            [-1 if i is None else i for i in bar_index],
+            [_type_code(t) for t in types],
+            price, size, cash_after, position_after,
+            extra=0,
+        )
+
+    def append(self, price: float, size: float, cash_after: float, position_after: float,
+               bar_index: Optional[int], type: str):
+        """追加一笔成交"""
+        i = self.count
+        if i == len(self.price):
+            self._grow()
+        self.price[i] = price
+        self.size[i] = size
+        self.cash_after[i] = cash_after
+        self.position_after[i] = position_after
+        self.bar_index[i] = -1 if bar_index is None else bar_index
+        self.type_code[i] = _type_code(type)
+        self.count = i + 1
+
+    def extend(self, other: "TradeLog", stop: Optional[int] = None, bar_offset: int = 0):
+        """追加 other 的前 stop 行（默认全部），bar 序号加上 bar_offset"""
+        n = other.count if stop is None else stop
+        i = self.count
+        while i + n > len(self.price):
+            self._grow()
+        self.price[i:i + n] = other.price[:n]
+        self.size[i:i + n] = other.size[:n]
+        self.cash_after[i:i + n] = other.cash_after[:n]
+        self.position_after[i:i + n] = other.position_after[:n]
+        self.bar_index[i:i + n] = other.bar_index[:n] + bar_offset
+        self.type_code[i:i + n] = other.type_code[:n]
+        self.count = i + n
+
+    def _grow(self):
+        capacity = 2 * len(self.price)
+        for name in ("price", "size", "cash_after", "position_after", "bar_index", "type_code"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def column(self, name: str) -> np.ndarray:
+        """有效行的某一列（视图，不复制）"""
+        return getattr(self, name)[:self.count]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("TradeLog index out of range")
+        bar_index = int(self.bar_index[index])
+        return Trade(
+            price=float(self.price[index]),
+            size=float(self.size[index]),
+            cash_after=float(self.cash_after[index]),
+            position_after=float(self.position_after[index]),
+            type=TRADE_TYPES[self.type_code[index]],
+            bar_index=None if bar_index < 0 else bar_index,
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, (TradeLog, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"TradeLog({list(self)!r})"
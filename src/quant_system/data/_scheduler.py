@@ -0,0 +1,106 @@
+"""
+数据源共享调度器
+
+轮询型数据源不再各开一个常驻线程：周期任务由一个定时线程按绝对截止时间触发，
+在共享线程池 POOL 中执行，异常在这里统一捕获输出。
+周期任务内部按股票并发发出的请求走 FETCH_POOL。
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+import heapq
+import itertools
+import threading
+import time
+
+# 周期任务：每个数据源同一时刻最多一轮在跑，8 个线程足够
+POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="quant-feed")
+# 单只股票的阻塞请求：线程按需创建、空闲复用，实际线程数 = min(32, 同时请求的股票数)；
+# 与 POOL 分开，周期任务等待这些请求时不会占满自身所在的线程池而死锁
+FETCH_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="quant-fetch")
+
+
+def next_deadline(deadline: float, interval: float) -> float:
+    """
+    下一个周期的截止时间
+
+    周期固定为 interval（不是 执行耗时 + interval）；
+    执行耗时超过一个周期时不补发积压的周期，从当前时刻重新计时。
+    """
+    return max(deadline + interval, time.monotonic())
+
+
+class PeriodicJob:
+    """周期任务句柄（同一任务不会并发执行：本轮结束后才排下一轮）"""
+
+    def __init__(self, func: Callable[[], None], interval: float, name: str = ""):
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self.cancelled = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._runner: Optional[threading.Thread] = None
+
+    def cancel(self, wait: bool = True, timeout: float = 5):
+        """取消任务；wait=True 时等待正在执行的一轮结束（在任务自身中调用时不等待）"""
+        self.cancelled = True
+        if wait and self._runner is not threading.current_thread():
+            self._idle.wait(timeout)
+
+
+class _Scheduler:
+    """按截止时间排序的任务堆 + 一个定时线程"""
+
+    def __init__(self):
+        self._heap: list = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def every(self, interval: float, func: Callable[[], None], name: str = "") -> PeriodicJob:
+        """每 interval 秒执行一次 func（立即执行第一轮）"""
+        job = PeriodicJob(func, interval, name)
+        self._push(time.monotonic(), job)
+        return job
+
+    def _push(self, deadline: float, job: PeriodicJob):
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._counter), job))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="quant-feed-timer")
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, job = self._heap[0]
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+
+            if job.cancelled:
+                continue
+            job._idle.clear()
+            POOL.submit(self._execute, job, deadline)
+
+    def _execute(self, job: PeriodicJob, deadline: float):
+        job._runner = threading.current_thread()
+        try:
+            job.func()
+        except Exception as e:
+            print(f"❌ {job.name or '数据'}获取失败: {e}")
+        finally:
+            job._runner = None
+            job._idle.set()
+
+        if not job.cancelled:
+            self._push(next_deadline(deadline, job.interval), job)
+
+
+SCHEDULER = _Scheduler()
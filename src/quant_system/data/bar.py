@@ -0,0 +1,25 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(slots=True, frozen=True)
+class BarData:
+    """K线数据（不可变；slots 去掉实例 __dict__，大量 bar 时省内存）"""
+    symbol: str
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+@dataclass(slots=True, frozen=True)
+class TickData:
+    """Tick级数据"""
+    symbol: str
+    timestamp: datetime
+    last_price: float
+    bid_price: float
+    ask_price: float
+    bid_volume: int
+    ask_volume: int
+    volume: int
@@ -1,32 +1,228 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional, Callable, List
+import hashlib
 import time
 import threading
 
-@dataclass
-class BarData:
-    """K线数据"""
-    symbol: str
-    timestamp: datetime
-    open: float
-    high: float
-    low: float
-    close: float
-    volume: float
-
-@dataclass  
-class TickData:
-    """Tick级数据"""
-    symbol: str
-    timestamp: datetime
-    last_price: float
-    bid_price: float
-    ask_price: float
-    bid_volume: int
-    ask_volume: int
-    volume: int
+import numpy as np
+import pandas as pd
+
+from quant_system.data._scheduler import FETCH_POOL, SCHEDULER, PeriodicJob
+from quant_system.data.bar import BarData, TickData
+
+
+def _index_spot_quotes(df):
+    """
+    全市场快照按 '代码' 建索引，供各订阅股票 O(1) 取行
+
+    重复代码只保留第一条（与逐只筛选后取 iloc[0] 一致）。
+    """
+    df = df.set_index('代码')
+    return df[~df.index.duplicated()]
+
+
+# 进程级行情缓存：多个数据源轮询同一接口时，TTL 内共享一次抓取结果
+# key -> (抓取时间, 结果, ttl)；写入新结果时顺带清掉已过期的条目及其锁，
+# 按股票 + 日期为键的条目（Tushare）不会在长时间运行的服务里无限累积
+_snapshot_cache: dict = {}
+_snapshot_locks: dict = {}
+_snapshot_lock = threading.Lock()
+
+
+def _evict_expired(now: float):
+    """删除已过期的缓存条目；对应的锁没有被持有时一并删除（调用方持有 _snapshot_lock）"""
+    expired = [key for key, (ts, _, ttl) in _snapshot_cache.items() if now - ts >= ttl]
+    for key in expired:
+        del _snapshot_cache[key]
+        lock = _snapshot_locks.get(key)
+        if lock is not None and not lock.locked():
+            del _snapshot_locks[key]
+
+
+def _cached_fetch(key, fetch: Callable, ttl: float):
+    """
+    TTL 缓存：key 的结果在 ttl 秒内直接复用，否则调用 fetch 重新获取
+
+    抓取时持有该 key 的锁：同一 key 的并发请求会等待并复用同一次结果，
+    不同 key 之间互不阻塞。
+    """
+    with _snapshot_lock:
+        key_lock = _snapshot_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        entry = _snapshot_cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        value = fetch()
+        now = time.monotonic()
+        with _snapshot_lock:
+            _evict_expired(now)
+            _snapshot_cache[key] = (now, value, ttl)
+            # 本 key 的锁可能在获取之前被其他线程的清理删掉，重新登记
+            _snapshot_locks.setdefault(key, key_lock)
+        return value
+
+
+def _cached_spot_quotes(ak, ttl: float):
+    """按代码建好索引的全市场快照（进程内共享）"""
+    return _cached_fetch(
+        'stock_zh_a_spot_em',
+        lambda: _index_spot_quotes(ak.stock_zh_a_spot_em()),
+        ttl,
+    )
+
+
+def _sleep_until(target: float):
+    """
+    睡到 monotonic 时刻 target（回放调度用）
+
+    落后时不 sleep 直接追赶；剩余不足 1ms 也不 sleep，高倍速回放不被系统调用拖慢。
+    """
+    delay = target - time.monotonic()
+    if delay > 1e-3:
+        time.sleep(delay)
+
+
+def _make_dispatch(callbacks: List[Callable], guard: bool = True) -> Callable[[BarData], None]:
+    """
+    按回调个数特化的分发函数（注册回调后重建）
+
+    只有一个回调时直接调用，省去逐 bar 遍历回调列表；
+    guard=True 时回调异常只打印，不影响其他回调和后续数据。
+    """
+    callbacks = tuple(callbacks)
+    if not callbacks:
+        return lambda bar: None
+
+    if not guard:
+        if len(callbacks) == 1:
+            return callbacks[0]
+
+        def dispatch(bar):
+            for callback in callbacks:
+                callback(bar)
+        return dispatch
+
+    if len(callbacks) == 1:
+        callback = callbacks[0]
+
+        def dispatch(bar):
+            try:
+                callback(bar)
+            except Exception as e:
+                print(f"❌ 回调函数错误: {e}")
+        return dispatch
+
+    def dispatch(bar):
+        for callback in callbacks:
+            try:
+                callback(bar)
+            except Exception as e:
+                print(f"❌ 回调函数错误: {e}")
+    return dispatch
+
+
+class _RingBuffer:
+    """
+    单生产者 / 单消费者环形缓冲区（容量为 2 的幂）
+
+    head 只由消费者写、tail 只由生产者写，依赖 GIL 下整数读写的原子性，不加锁；
+    Event 只用于唤醒消费者。写满时覆盖最旧的数据，生产者永不阻塞；
+    被覆盖的条数记在 dropped 中（只由生产者写），第一次溢出时输出警告。
+    """
+    __slots__ = ("_buffer", "_mask", "_head", "_tail", "_event", "dropped", "name")
+
+    def __init__(self, capacity: int = 1024, name: str = "缓冲区"):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"容量必须是 2 的幂: {capacity}")
+        self._buffer = [None] * capacity
+        self._mask = capacity - 1
+        self._head = 0
+        self._tail = 0
+        self._event = threading.Event()
+        self.dropped = 0
+        self.name = name
+
+    def put(self, item):
+        """写入一项（生产者线程）"""
+        tail = self._tail
+        # 消费者还没读走的最旧一项将被覆盖（head 由消费者写，这里读到旧值只会少计）
+        if tail - self._head > self._mask:
+            if self.dropped == 0:
+                print(f"⚠️ {self.name}已满，开始丢弃最旧的数据（消费者处理过慢）")
+            self.dropped += 1
+        self._buffer[tail & self._mask] = item
+        self._tail = tail + 1
+        self._event.set()
+
+    def drain(self, timeout: Optional[float] = None) -> list:
+        """取出全部未读数据（消费者线程）；为空时最多等待 timeout 秒"""
+        if self._head == self._tail:
+            self._event.wait(timeout)
+            self._event.clear()
+        tail = self._tail
+        # 已被覆盖的部分直接跳过
+        head = max(self._head, tail - len(self._buffer))
+        items = [self._buffer[i & self._mask] for i in range(head, tail)]
+        self._head = tail
+        return items
+
+    def wake(self):
+        """唤醒正在等待的消费者（用于停止）"""
+        self._event.set()
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+
+class _BarDispatcher:
+    """
+    回调分发线程：数据获取线程只写环形缓冲区，回调在独立线程中批量执行
+
+    慢回调不会拖慢数据获取。callbacks 为数据源的回调列表（共享引用，启动后注册的回调同样生效）。
+    """
+
+    def __init__(self, callbacks: List[Callable], capacity: int = 1024):
+        self._callbacks = callbacks
+        self._dispatch = _make_dispatch(callbacks)
+        self._ring = _RingBuffer(capacity, name="行情分发缓冲区")
+        self._is_running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def rebuild(self):
+        """回调列表变化后重建分发函数"""
+        self._dispatch = _make_dispatch(self._callbacks)
+
+    @property
+    def dropped(self) -> int:
+        """因回调处理过慢、缓冲区溢出而丢弃的 bar 数"""
+        return self._ring.dropped
+
+    def publish(self, bar: BarData):
+        self._ring.put(bar)
+
+    def start(self):
+        self._is_running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._is_running = False
+        self._ring.wake()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        # 停止后继续分发已入队的数据
+        while self._is_running or len(self._ring):
+            dispatch = self._dispatch
+            for bar in self._ring.drain(timeout=0.5):
+                dispatch(bar)
+
+
+# 全市场快照中构造 BarData 用到的字段（开 / 高 / 低 / 收 / 量）
+_SPOT_FIELDS = ['今开', '最高', '最低', '最新价', '成交量']
 
 
 class LiveDataFeed(ABC):
@@ -83,8 +279,9 @@ class AKShareDataFeed(LiveDataFeed):
         self.symbols: List[str] = []
         self._bar_callbacks: List[Callable] = []
         self._tick_callbacks: List[Callable] = []
+        self._dispatcher = _BarDispatcher(self._bar_callbacks)
         self._is_running = False
-        self._thread: Optional[threading.Thread] = None
+        self._job: Optional[PeriodicJob] = None
     
     def subscribe(self, symbols: list[str]):
         """订阅股票代码（6位数字，如 '000001', '600519'）"""
@@ -94,6 +291,7 @@ class AKShareDataFeed(LiveDataFeed):
     def on_bar(self, callback: Callable[[BarData], None]):
         """注册K线回调函数"""
         self._bar_callbacks.append(callback)
+        self._dispatcher.rebuild()
     
     def on_tick(self, callback: Callable[[TickData], None]):
         """注册Tick回调函数"""
@@ -106,27 +304,18 @@ class AKShareDataFeed(LiveDataFeed):
             return
         
         self._is_running = True
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
-        self._thread.start()
+        self._dispatcher.start()
+        self._job = SCHEDULER.every(self.interval, self._fetch_and_broadcast, name="AKShare数据")
         print("🚀 AKShare数据流已启动")
     
     def stop(self):
         """停止数据流"""
         self._is_running = False
-        if self._thread:
-            self._thread.join(timeout=5)
+        if self._job:
+            self._job.cancel()
+        self._dispatcher.stop()
         print("⏹️ AKShare数据流已停止")
     
-    def _run_loop(self):
-        """数据获取循环"""
-        while self._is_running:
-            try:
-                self._fetch_and_broadcast()
-            except Exception as e:
-                print(f"❌ 数据获取失败: {e}")
-            
-            time.sleep(self.interval)
-    
     def _fetch_and_broadcast(self):
         """获取并广播数据"""
         try:
@@ -136,19 +325,23 @@ class AKShareDataFeed(LiveDataFeed):
             self.stop()
             return
         
+        if not self.symbols:
+            return
+        
+        # 每轮只拉取一次全市场快照（半个轮询间隔内与其他数据源共享），各订阅股票按代码直接取行
+        try:
+            quotes = _cached_spot_quotes(ak, self.interval * 0.5)
+        except Exception as e:
+            print(f"❌ 获取实时行情失败: {e}")
+            return
+        
         for symbol in self.symbols:
             try:
-                # 获取实时行情
-                df = ak.stock_zh_a_spot_em()
-                
-                # 查找对应股票
-                stock_data = df[df['代码'] == symbol]
-                
-                if stock_data.empty:
+                if symbol not in quotes.index:
                     print(f"⚠️ 未找到股票 {symbol}")
                     continue
                 
-                row = stock_data.iloc[0]
+                row = quotes.loc[symbol]
                 
                 # 构造BarData
                 bar = BarData(
@@ -161,9 +354,8 @@ class AKShareDataFeed(LiveDataFeed):
                     volume=float(row['成交量'])
                 )
                 
-                # 广播给所有回调
-                for callback in self._bar_callbacks:
-                    callback(bar)
+                # 交给分发线程广播
+                self._dispatcher.publish(bar)
                 
             except Exception as e:
                 print(f"❌ 获取 {symbol} 行情失败: {e}")
@@ -188,6 +380,7 @@ class HistoricalSimulator(LiveDataFeed):
         self.speed = speed
         
         self._bar_callbacks: List[Callable] = []
+        self._dispatch = _make_dispatch(self._bar_callbacks, guard=False)
         self._is_running = False
         self._thread: Optional[threading.Thread] = None
     
@@ -197,6 +390,7 @@ class HistoricalSimulator(LiveDataFeed):
     
     def on_bar(self, callback: Callable[[BarData], None]):
         self._bar_callbacks.append(callback)
+        self._dispatch = _make_dispatch(self._bar_callbacks, guard=False)
     
     def on_tick(self, callback: Callable[[TickData], None]):
         pass
@@ -217,27 +411,36 @@ class HistoricalSimulator(LiveDataFeed):
     def _replay(self):
         """回放历史数据"""
         start_time = datetime.now()
+        t0 = time.monotonic()
+        dt = 1.0 / self.speed
         
-        for i, price in enumerate(self.prices):
+        # 模拟OHLC（简化处理）：整列向量化计算，循环里只取值构造 BarData
+        closes = np.asarray(self.prices, dtype=np.float64)
+        ohlc = zip(
+            (closes * 0.995).tolist(),
+            (closes * 1.01).tolist(),
+            (closes * 0.99).tolist(),
+            closes.tolist(),
+        )
+        
+        for i, (open_, high, low, close) in enumerate(ohlc):
             if not self._is_running:
                 break
             
-            # 模拟OHLC（简化处理）
             bar = BarData(
                 symbol=self.symbol,
                 timestamp=start_time + timedelta(days=i),
-                open=price * 0.995,
-                high=price * 1.01,
-                low=price * 0.99,
-                close=price,
+                open=open_,
+                high=high,
+                low=low,
+                close=close,
                 volume=1000000
             )
             
-            for callback in self._bar_callbacks:
-                callback(bar)
+            self._dispatch(bar)
             
-            # 控制速度
-            time.sleep(1.0 / self.speed)
+            # 控制速度（对齐到第 i+1 个 bar 的绝对时刻）
+            _sleep_until(t0 + (i + 1) * dt)
 
 
 class TushareDataFeed(LiveDataFeed):
@@ -253,8 +456,9 @@ class TushareDataFeed(LiveDataFeed):
         self.interval = interval
         self.symbols: List[str] = []
         self._bar_callbacks: List[Callable] = []
+        self._dispatcher = _BarDispatcher(self._bar_callbacks)
         self._is_running = False
-        self._thread: Optional[threading.Thread] = None
+        self._job: Optional[PeriodicJob] = None
     
     def subscribe(self, symbols: list[str]):
         """订阅股票代码（Tushare格式，如 '000001.SZ'）"""
@@ -262,37 +466,37 @@ class TushareDataFeed(LiveDataFeed):
     
     def on_bar(self, callback):
         self._bar_callbacks.append(callback)
+        self._dispatcher.rebuild()
     
     def on_tick(self, callback):
         pass
     
     def start(self):
         self._is_running = True
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
-        self._thread.start()
+        self._dispatcher.start()
+        self._job = SCHEDULER.every(self.interval, self._fetch_and_broadcast, name="Tushare数据")
         print("🚀 Tushare数据流已启动")
     
     def stop(self):
         self._is_running = False
-        if self._thread:
-            self._thread.join(timeout=5)
+        if self._job:
+            self._job.cancel()
+        self._dispatcher.stop()
         print("⏹️ Tushare数据流已停止")
     
-    def _run_loop(self):
-        while self._is_running:
-            try:
-                self._fetch_and_broadcast()
-            except Exception as e:
-                print(f"❌ 数据获取失败: {e}")
-            
-            time.sleep(self.interval)
-    
     def _fetch_and_broadcast(self):
-        for symbol in self.symbols:
+        symbols = list(self.symbols)
+        if not symbols:
+            return
+        
+        # 获取最新日线数据：各股票的请求并发发出，结果按订阅顺序广播
+        today = datetime.now().strftime('%Y%m%d')
+        results = self._fetch_all(symbols, today)
+        
+        for symbol, df in zip(symbols, results):
             try:
-                # 获取最新日线数据
-                today = datetime.now().strftime('%Y%m%d')
-                df = self.pro.daily(ts_code=symbol, start_date=today, end_date=today)
+                if isinstance(df, Exception):
+                    raise df
                 
                 if df.empty:
                     continue
@@ -308,12 +512,55 @@ class TushareDataFeed(LiveDataFeed):
                     volume=float(row['vol'])
                 )
                 
-                for callback in self._bar_callbacks:
-                    callback(bar)
+                self._dispatcher.publish(bar)
                 
             except Exception as e:
                 print(f"❌ 获取 {symbol} 行情失败: {e}")
+    
+    def _fetch_all(self, symbols: List[str], today: str) -> list:
+        """
+        并发获取多只股票的日线（tushare SDK 是阻塞调用，放到共享的 FETCH_POOL 里执行）
+
+        结果按 symbols 顺序返回，失败的股票位置上是异常对象。
+        """
+        futures = [FETCH_POOL.submit(self._fetch_daily, symbol, today) for symbol in symbols]
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append(error if error is not None else future.result())
+        return results
+    
+    def _fetch_daily(self, symbol: str, today: str):
+        """单只股票当日日线（半个轮询间隔内与其他数据源共享）"""
+        return _cached_fetch(
+            ('tushare_daily', symbol, today),
+            lambda: self.pro.daily(ts_code=symbol, start_date=today, end_date=today),
+            self.interval * 0.5,
+        )
                 
+# CSVReplayFeed 解析结果缓存（.npz，按列存储）
+_CSV_CACHE_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+# CSV 列名候选（按顺序取第一个存在的列）
+_CSV_COLUMN_MAPPING = {
+    'date': ['date', 'Date', 'datetime', 'timestamp'],
+    'open': ['open', 'Open', 'price'],
+    'high': ['high', 'High', 'price'],
+    'low': ['low', 'Low', 'price'],
+    'close': ['close', 'Close', 'price'],
+    'volume': ['volume', 'Volume', 'vol'],
+}
+_CSV_REQUIRED_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+def _read_csv(csv_path: Path) -> pd.DataFrame:
+    """优先用 pyarrow 引擎（多线程解析），未安装 pyarrow 时退回默认的 C 引擎"""
+    try:
+        return pd.read_csv(csv_path, engine='pyarrow')
+    except ImportError:
+        return pd.read_csv(csv_path)
+
+
 class CSVReplayFeed(LiveDataFeed):
     """
     CSV文件回放数据源（最稳定，推荐用于开发测试）
@@ -334,33 +581,48 @@ class CSVReplayFeed(LiveDataFeed):
         feed.start()
     """
     
-    def __init__(self, csv_path: str, symbol: str, speed: float = 1.0, loop: bool = False):
+    def __init__(
+        self,
+        csv_path: str,
+        symbol: str,
+        speed: float = 1.0,
+        loop: bool = False,
+        cache_dir: Optional[str] = None,
+    ):
         """
         Args:
             csv_path: CSV文件路径
             symbol: 股票代码
             speed: 回放速度倍数（1.0=实时，10.0=10倍速）
             loop: 是否循环播放
+            cache_dir: 解析结果缓存目录（默认 None：不写磁盘缓存）
         """
         self.csv_path = csv_path
         self.symbol = symbol
         self.speed = speed
         self.loop = loop
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         
         self._bar_callbacks: List[Callable] = []
+        self._dispatch = _make_dispatch(self._bar_callbacks)
+        self._batch_callbacks: List[Callable] = []
         self._is_running = False
         self._thread: Optional[threading.Thread] = None
-        self._bars: List[BarData] = []
+        
+        # 列式存储（每列一个数组），回放时才按需构造 BarData
+        self._timestamps = np.empty(0, dtype='datetime64[ns]')
+        self._opens = np.empty(0)
+        self._highs = np.empty(0)
+        self._lows = np.empty(0)
+        self._closes = np.empty(0)
+        self._volumes = np.empty(0)
         
         # 加载数据
         self._load_data()
     
     def _load_data(self):
-        """加载CSV数据"""
+        """加载CSV数据（CSV 未变化时直接读取上次的解析结果）"""
         try:
-            import pandas as pd
-            from pathlib import Path
-            
             # 支持相对路径
             if not Path(self.csv_path).is_absolute():
                 base_path = Path(__file__).parent
@@ -371,31 +633,25 @@ class CSVReplayFeed(LiveDataFeed):
             if not csv_path.exists():
                 raise FileNotFoundError(f"CSV文件不存在: {csv_path}")
             
-            df = pd.read_csv(csv_path)
+            cache_path = self._cache_path(csv_path) if self.cache_dir is not None else None
+            if cache_path is not None and self._load_cache(cache_path):
+                print(f"✅ 从缓存加载了 {len(self)} 条历史数据 from {csv_path}")
+                return
             
-            # 尝试不同的列名组合
-            column_mapping = {
-                'date': ['date', 'Date', 'datetime', 'timestamp'],
-                'open': ['open', 'Open', 'price'],
-                'high': ['high', 'High', 'price'],
-                'low': ['low', 'Low', 'price'],
-                'close': ['close', 'Close', 'price'],
-                'volume': ['volume', 'Volume', 'vol']
-            }
+            df = _read_csv(csv_path)
             
-            # 找到实际列名
-            actual_columns = {}
-            for key, possible_names in column_mapping.items():
-                for name in possible_names:
-                    if name in df.columns:
-                        actual_columns[key] = name
-                        break
-                if key not in actual_columns and key != 'date':
-                    # 如果没有找到且不是date，使用默认值
-                    actual_columns[key] = possible_names[0]
+            # 找到实际列名（未找到记为 None）
+            columns = set(df.columns)
+            actual_columns = {
+                key: next((name for name in possible_names if name in columns), None)
+                for key, possible_names in _CSV_COLUMN_MAPPING.items()
+            }
+            missing = [key for key in _CSV_REQUIRED_COLUMNS if actual_columns[key] is None]
+            if missing:
+                raise ValueError(f"CSV 缺少列: {missing}，实际列: {list(df.columns)}")
             
             # 解析日期
-            if 'date' in actual_columns:
+            if actual_columns['date'] is not None:
                 df['parsed_date'] = pd.to_datetime(df[actual_columns['date']])
             else:
                 # 如果没有日期列，生成日期
@@ -405,74 +661,151 @@ class CSVReplayFeed(LiveDataFeed):
                     freq='D'
                 )
             
-            # 构造BarData列表
-            for _, row in df.iterrows():
-                try:
-                    bar = BarData(
-                        symbol=self.symbol,
-                        timestamp=row['parsed_date'],
-                        open=float(row.get(actual_columns.get('open', 'open'), 0)),
-                        high=float(row.get(actual_columns.get('high', 'high'), 0)),
-                        low=float(row.get(actual_columns.get('low', 'low'), 0)),
-                        close=float(row.get(actual_columns.get('close', 'close'), 0)),
-                        volume=float(row.get(actual_columns.get('volume', 'volume'), 1000000))
-                    )
-                    self._bars.append(bar)
-                except Exception as e:
-                    print(f"⚠️ 跳过无效数据行: {e}")
-                    continue
+            # 整列转为 float64（非数值记为 NaN）
+            def column(key):
+                return pd.to_numeric(df[actual_columns[key]], errors='coerce').to_numpy(dtype=np.float64)
             
-            print(f"✅ 加载了 {len(self._bars)} 条历史数据 from {csv_path}")
+            opens = column('open')
+            highs = column('high')
+            lows = column('low')
+            closes = column('close')
+            # 成交量可缺省
+            if actual_columns['volume'] is None:
+                volumes = np.full(len(df), 1000000.0)
+            else:
+                volumes = column('volume')
+            
+            # 一次性剔除含非法值的行
+            valid = np.isfinite(opens) & np.isfinite(highs) & np.isfinite(lows) \
+                & np.isfinite(closes) & np.isfinite(volumes)
+            num_invalid = len(df) - int(valid.sum())
+            if num_invalid:
+                print(f"⚠️ 跳过 {num_invalid} 条无效数据行")
+            
+            self._set_columns(
+                df['parsed_date'].to_numpy(dtype='datetime64[ns]')[valid],
+                opens[valid], highs[valid], lows[valid], closes[valid], volumes[valid],
+            )
             
-            if len(self._bars) == 0:
+            print(f"✅ 加载了 {len(self)} 条历史数据 from {csv_path}")
+            
+            if len(self) == 0:
                 raise ValueError("没有有效的数据")
             
+            # 没有日期列时日期按当前时间生成，不缓存
+            if cache_path is not None and actual_columns['date'] is not None:
+                self._save_cache(cache_path)
+            
         except Exception as e:
             print(f"❌ 加载CSV失败: {e}")
             # 降级：使用简单的price_feed
             try:
                 from .price_feed import load_prices_from_csv
-                prices = load_prices_from_csv(Path(self.csv_path).name)
+                prices = np.asarray(load_prices_from_csv(Path(self.csv_path).name), dtype=np.float64)
                 
-                self._bars = []
-                base_time = datetime.now() - timedelta(days=len(prices))
-                for i, price in enumerate(prices):
-                    bar = BarData(
-                        symbol=self.symbol,
-                        timestamp=base_time + timedelta(days=i),
-                        open=price * 0.995,
-                        high=price * 1.01,
-                        low=price * 0.99,
-                        close=price,
-                        volume=1000000
-                    )
-                    self._bars.append(bar)
+                base_time = np.datetime64(datetime.now() - timedelta(days=len(prices)), 'ns')
+                self._set_columns(
+                    base_time + np.arange(len(prices)) * np.timedelta64(1, 'D'),
+                    prices * 0.995, prices * 1.01, prices * 0.99, prices,
+                    np.full(len(prices), 1000000.0),
+                )
                 
-                print(f"✅ 使用降级方案加载了 {len(self._bars)} 条数据")
+                print(f"✅ 使用降级方案加载了 {len(self)} 条数据")
             except Exception as e2:
                 print(f"❌ 降级方案也失败: {e2}")
                 raise
     
+    def _cache_path(self, csv_path: Path) -> Path:
+        """缓存文件路径：以 CSV 的绝对路径、修改时间和大小为键"""
+        stat = csv_path.stat()
+        key = f"{csv_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.npz"
+    
+    def _load_cache(self, cache_path: Path) -> bool:
+        """读取缓存的列数据；缓存不存在或损坏时返回 False"""
+        if not cache_path.exists():
+            return False
+        try:
+            with np.load(cache_path) as cached:
+                self._set_columns(*(cached[name] for name in _CSV_CACHE_COLUMNS))
+        except Exception:
+            return False
+        return len(self) > 0
+    
+    def _save_cache(self, cache_path: Path):
+        """写入列数据缓存（失败不影响回放）"""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(cache_path, **dict(zip(_CSV_CACHE_COLUMNS, (
+                self._timestamps, self._opens, self._highs,
+                self._lows, self._closes, self._volumes,
+            ))))
+        except OSError as e:
+            print(f"⚠️ 写入缓存失败: {e}")
+    
+    def _set_columns(self, timestamps, opens, highs, lows, closes, volumes):
+        """写入列数据（只读，batch 回调拿到的是同一份数组）"""
+        columns = (timestamps, opens, highs, lows, closes, volumes)
+        for array in columns:
+            array.flags.writeable = False
+        (self._timestamps, self._opens, self._highs,
+         self._lows, self._closes, self._volumes) = columns
+    
+    def __len__(self) -> int:
+        return len(self._closes)
+    
+    def columns(self) -> dict:
+        """全部数据的列视图（timestamp / open / high / low / close / volume）"""
+        return {
+            'timestamp': self._timestamps,
+            'open': self._opens,
+            'high': self._highs,
+            'low': self._lows,
+            'close': self._closes,
+            'volume': self._volumes,
+        }
+    
+    def _bar(self, i: int) -> BarData:
+        """构造第 i 条 BarData"""
+        return BarData(
+            symbol=self.symbol,
+            timestamp=pd.Timestamp(self._timestamps[i]),
+            open=float(self._opens[i]),
+            high=float(self._highs[i]),
+            low=float(self._lows[i]),
+            close=float(self._closes[i]),
+            volume=float(self._volumes[i])
+        )
+    
     def subscribe(self, symbols: list[str]):
         """CSV回放器忽略订阅"""
         pass
     
     def on_bar(self, callback: Callable[[BarData], None]):
         self._bar_callbacks.append(callback)
+        self._dispatch = _make_dispatch(self._bar_callbacks)
+    
+    def on_bars_batch(self, callback: Callable[[dict], None]):
+        """
+        注册批量回调：每轮回放开始时一次性收到 columns()，不逐条构造 BarData
+
+        适用于向量化策略。
+        """
+        self._batch_callbacks.append(callback)
     
     def on_tick(self, callback):
         pass
     
     def start(self):
         """启动回放"""
-        if not self._bars:
+        if len(self) == 0:
             print("❌ 没有数据可以回放")
             return
         
         self._is_running = True
         self._thread = threading.Thread(target=self._replay, daemon=True)
         self._thread.start()
-        print(f"🎬 CSV回放已启动: {len(self._bars)} 条数据, {self.speed}x 速度")
+        print(f"🎬 CSV回放已启动: {len(self)} 条数据, {self.speed}x 速度")
     
     def stop(self):
         """停止回放"""
@@ -483,25 +816,36 @@ class CSVReplayFeed(LiveDataFeed):
     
     def _replay(self):
         """回放数据"""
+        num_bars = len(self)
+        dt = 1.0 / self.speed
         while True:
-            for i, bar in enumerate(self._bars):
+            t0 = time.monotonic()
+            last_report = None
+            
+            # 批量回调整段交付
+            for callback in self._batch_callbacks:
+                try:
+                    callback(self.columns())
+                except Exception as e:
+                    print(f"❌ 回调函数错误: {e}")
+            
+            for i in range(num_bars):
                 if not self._is_running:
                     return
                 
-                # 显示进度
-                if i % 10 == 0:
-                    progress = (i + 1) / len(self._bars) * 100
-                    print(f"📊 回放进度: {i+1}/{len(self._bars)} ({progress:.1f}%)")
+                # 显示进度（按墙钟时间限频，每 0.5 秒最多一次）
+                now = time.monotonic()
+                if last_report is None or now - last_report >= 0.5:
+                    last_report = now
+                    progress = (i + 1) / num_bars * 100
+                    print(f"📊 回放进度: {i+1}/{num_bars} ({progress:.1f}%)")
                 
-                # 广播数据
-                for callback in self._bar_callbacks:
-                    try:
-                        callback(bar)
-                    except Exception as e:
-                        print(f"❌ 回调函数错误: {e}")
+                # 广播数据（只有注册了逐条回调时才构造 BarData）
+                if self._bar_callbacks:
+                    self._dispatch(self._bar(i))
                 
-                # 控制速度
-                time.sleep(1.0 / self.speed)
+                # 控制速度（对齐到第 i+1 个 bar 的绝对时刻）
+                _sleep_until(t0 + (i + 1) * dt)
             
             # 是否循环
             if not self.loop:
@@ -534,8 +878,9 @@ class ImprovedAKShareFeed(LiveDataFeed):
         self.symbols: List[str] = []
         self._bar_callbacks: List[Callable] = []
         self._tick_callbacks: List[Callable] = []
+        self._dispatcher = _BarDispatcher(self._bar_callbacks)
         self._is_running = False
-        self._thread: Optional[threading.Thread] = None
+        self._job: Optional[PeriodicJob] = None
         
         # 统计
         self.success_count = 0
@@ -547,6 +892,7 @@ class ImprovedAKShareFeed(LiveDataFeed):
     
     def on_bar(self, callback: Callable[[BarData], None]):
         self._bar_callbacks.append(callback)
+        self._dispatcher.rebuild()
     
     def on_tick(self, callback: Callable[[TickData], None]):
         self._tick_callbacks.append(callback)
@@ -557,25 +903,24 @@ class ImprovedAKShareFeed(LiveDataFeed):
             return
         
         self._is_running = True
-        self._thread = threading.Thread(target=self._run_loop, daemon=True)
-        self._thread.start()
+        self._dispatcher.start()
+        self._job = SCHEDULER.every(self.interval, self._poll, name="AKShare数据")
         print("🚀 改进版AKShare数据流已启动")
     
     def stop(self):
         self._is_running = False
-        if self._thread:
-            self._thread.join(timeout=5)
+        if self._job:
+            self._job.cancel()
+        self._dispatcher.stop()
         print(f"⏹️ AKShare数据流已停止 (成功: {self.success_count}, 失败: {self.fail_count})")
     
-    def _run_loop(self):
-        while self._is_running:
-            try:
-                self._fetch_and_broadcast()
-            except Exception as e:
-                print(f"❌ 数据获取失败: {e}")
-                self.fail_count += 1
-            
-            time.sleep(self.interval)
+    def _poll(self):
+        """一轮获取（异常计入失败次数后交给调度器输出）"""
+        try:
+            self._fetch_and_broadcast()
+        except Exception:
+            self.fail_count += 1
+            raise
     
     def _fetch_and_broadcast(self):
         """获取并广播数据（带重试）"""
@@ -593,62 +938,212 @@ class ImprovedAKShareFeed(LiveDataFeed):
             self.stop()
             return
         
+        if not self.symbols:
+            return
+        
+        # 每轮只拉取一次全市场快照（失败时整体重试；半个轮询间隔内与其他数据源共享），
+        # 各订阅股票按代码直接取行
+        retry_count = 0
+        while True:
+            try:
+                quotes = _cached_spot_quotes(ak, self.interval * 0.5)
+                break
+            except Exception as e:
+                retry_count += 1
+                if retry_count >= self.max_retries:
+                    print(f"❌ 获取实时行情失败 (已重试{self.max_retries}次): {str(e)[:100]}")
+                    self.fail_count += len(self.symbols)
+                    return
+                print(f"⚠️ 重试 {retry_count}/{self.max_retries}...")
+                time.sleep(2)
+        
+        found = []
         for symbol in self.symbols:
-            retry_count = 0
-            success = False
+            if symbol in quotes.index:
+                found.append(symbol)
+            else:
+                print(f"⚠️ 未找到股票 {symbol}")
+        if not found:
+            return
+        
+        # 数据验证：订阅股票的行情整块转为数值（'-' 等非法值记为 NaN），不再逐字段 try/except
+        try:
+            values = (
+                quotes.reindex(index=found, columns=_SPOT_FIELDS)
+                .apply(pd.to_numeric, errors='coerce')
+                .to_numpy(dtype=np.float64)
+            )
+        except Exception as e:
+            print(f"❌ 解析行情失败: {str(e)[:100]}")
+            self.fail_count += len(found)
+            return
+        
+        close = np.nan_to_num(values[:, 3], nan=0.0)
+        volume = np.nan_to_num(values[:, 4], nan=0.0)
+        # 开/高/低缺失或为 0 时用最新价代替
+        ohl = values[:, :3]
+        ohl = np.where(np.isnan(ohl) | (ohl == 0), close[:, None], ohl)
+        
+        now = datetime.now()
+        for symbol, (open_, high, low), close_, volume_ in zip(
+            found, ohl.tolist(), close.tolist(), volume.tolist()
+        ):
+            # 验证数据合理性
+            if close_ <= 0:
+                print(f"⚠️ 无效价格数据: {symbol}")
+                continue
             
-            while retry_count < self.max_retries and not success:
+            # 构造BarData，交给分发线程广播
+            self._dispatcher.publish(BarData(symbol, now, open_, high, low, close_, volume_))
+            self.success_count += 1
+
+
+class WebSocketDataFeed(LiveDataFeed):
+    """
+    WebSocket推送数据源
+    
+    特点：
+    - 服务端推送，没有轮询间隔带来的延迟
+    - 收包线程只写环形缓冲区，解析和回调在广播线程中执行
+    - 连接失败或断开时自动切换到备用（轮询）数据源
+    
+    需要安装 websocket-client: pip install websocket-client
+    
+    使用示例：
+        feed = WebSocketDataFeed(
+            url="wss://...",
+            parse_message=my_parser,  # 原始消息 -> BarData 列表
+            subscribe_message=lambda symbols: json.dumps({"codes": symbols}),
+            fallback_feed=ImprovedAKShareFeed(interval=60),
+        )
+        feed.subscribe(['000001', '600519'])
+        feed.on_bar(my_callback)
+        feed.start()
+    """
+    
+    def __init__(
+        self,
+        url: str,
+        parse_message: Callable[[str], List[BarData]],
+        subscribe_message: Optional[Callable[[List[str]], str]] = None,
+        fallback_feed: Optional[LiveDataFeed] = None
+    ):
+        """
+        Args:
+            url: WebSocket 地址
+            parse_message: 把一条推送消息解析为 BarData 列表（无行情时返回空列表）
+            subscribe_message: 连接建立后发送的订阅消息（参数为订阅代码列表）
+            fallback_feed: 备用数据源（连接异常时启用）
+        """
+        self.url = url
+        self.parse_message = parse_message
+        self.subscribe_message = subscribe_message
+        self.fallback_feed = fallback_feed
+        
+        self.symbols: List[str] = []
+        self._bar_callbacks: List[Callable] = []
+        self._dispatch = _make_dispatch(self._bar_callbacks)
+        self._messages = _RingBuffer(name="WebSocket消息缓冲区")
+        self._is_running = False
+        self._ws = None
+        self._ws_thread: Optional[threading.Thread] = None
+        self._thread: Optional[threading.Thread] = None
+        self._fallback_active = False
+    
+    def subscribe(self, symbols: list[str]):
+        self.symbols = symbols
+        print(f"📡 订阅股票: {', '.join(symbols)}")
+    
+    def on_bar(self, callback: Callable[[BarData], None]):
+        self._bar_callbacks.append(callback)
+        self._dispatch = _make_dispatch(self._bar_callbacks)
+    
+    def on_tick(self, callback: Callable[[TickData], None]):
+        pass
+    
+    def start(self):
+        if self._is_running:
+            print("⚠️ 数据流已在运行")
+            return
+        
+        try:
+            import websocket
+        except ImportError:
+            print("❌ 请安装 websocket-client: pip install websocket-client")
+            self._start_fallback()
+            return
+        
+        self._is_running = True
+        self._ws = websocket.WebSocketApp(
+            self.url,
+            on_open=self._on_open,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_close=self._on_close,
+        )
+        self._ws_thread = threading.Thread(target=self._ws.run_forever, daemon=True)
+        self._thread = threading.Thread(target=self._broadcast_loop, daemon=True)
+        self._ws_thread.start()
+        self._thread.start()
+        print("🚀 WebSocket数据流已启动")
+    
+    def stop(self):
+        self._is_running = False
+        if self._ws is not None:
+            self._ws.close()
+        # 可能在广播线程的回调中被调用（如 MultiSourceDataFeed 切换数据源），不能 join 自己
+        current = threading.current_thread()
+        for thread in (self._ws_thread, self._thread):
+            if thread and thread is not current:
+                thread.join(timeout=5)
+        if self._fallback_active:
+            self.fallback_feed.stop()
+            self._fallback_active = False
+        print("⏹️ WebSocket数据流已停止")
+    
+    def _on_open(self, ws):
+        if self.subscribe_message is not None:
+            ws.send(self.subscribe_message(self.symbols))
+    
+    def _on_message(self, ws, message):
+        # 收包线程只写缓冲区，不做解析
+        self._messages.put(message)
+    
+    def _on_error(self, ws, error):
+        print(f"❌ WebSocket错误: {error}")
+    
+    def _on_close(self, ws, close_status_code, close_msg):
+        if self._is_running:
+            print("⚠️ WebSocket连接已断开")
+            self._is_running = False
+            self._start_fallback()
+    
+    def _broadcast_loop(self):
+        """批量取出推送消息，解析后广播"""
+        while self._is_running:
+            for message in self._messages.drain(timeout=0.5):
                 try:
-                    # 获取实时行情
-                    df = ak.stock_zh_a_spot_em()
-                    
-                    # 查找对应股票
-                    stock_data = df[df['代码'] == symbol]
-                    
-                    if stock_data.empty:
-                        print(f"⚠️ 未找到股票 {symbol}")
-                        break
-                    
-                    row = stock_data.iloc[0]
-                    
-                    # 数据验证
-                    def safe_float(value, default=0.0):
-                        try:
-                            return float(value) if value and str(value).strip() != '-' else default
-                        except:
-                            return default
-                    
-                    # 构造BarData
-                    bar = BarData(
-                        symbol=symbol,
-                        timestamp=datetime.now(),
-                        open=safe_float(row.get('今开'), row.get('最新价', 0)),
-                        high=safe_float(row.get('最高'), row.get('最新价', 0)),
-                        low=safe_float(row.get('最低'), row.get('最新价', 0)),
-                        close=safe_float(row.get('最新价'), 0),
-                        volume=safe_float(row.get('成交量'), 0)
-                    )
-                    
-                    # 验证数据合理性
-                    if bar.close <= 0:
-                        print(f"⚠️ 无效价格数据: {symbol}")
-                        break
-                    
-                    # 广播给所有回调
-                    for callback in self._bar_callbacks:
-                        callback(bar)
-                    
-                    success = True
-                    self.success_count += 1
-                    
+                    bars = self.parse_message(message)
                 except Exception as e:
-                    retry_count += 1
-                    if retry_count >= self.max_retries:
-                        print(f"❌ 获取 {symbol} 失败 (已重试{self.max_retries}次): {str(e)[:100]}")
-                        self.fail_count += 1
-                    else:
-                        print(f"⚠️ 重试 {retry_count}/{self.max_retries}... ({symbol})")
-                        time.sleep(2)
+                    print(f"⚠️ 消息解析失败: {e}")
+                    continue
+                
+                dispatch = self._dispatch
+                for bar in bars:
+                    dispatch(bar)
+    
+    def _start_fallback(self):
+        """切换到备用数据源"""
+        if self.fallback_feed is None or self._fallback_active:
+            return
+        
+        print(f"🔄 切换到备用数据源: {type(self.fallback_feed).__name__}")
+        self._fallback_active = True
+        if self.symbols:
+            self.fallback_feed.subscribe(self.symbols)
+        for callback in self._bar_callbacks:
+            self.fallback_feed.on_bar(callback)
+        self.fallback_feed.start()
 
 
 class MultiSourceDataFeed(LiveDataFeed):
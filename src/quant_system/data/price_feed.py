@@ -1,79 +1,88 @@
-import csv
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 
 
-def load_prices_from_csv(filename: str) -> List[float]:
-    prices: List[float] = []
-
-    current_dir = Path(__file__).parent
-    filepath = current_dir / filename
-
-    with filepath.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        if "price" not in reader.fieldnames:
-            raise ValueError(f"CSV 文件缺少 price 列，实际列: {reader.fieldnames}")
-
-        for row in reader:
-            raw_price = row["price"]
+def _read_fieldnames(filepath: Path) -> List[str]:
+    """只读表头"""
+    return list(pd.read_csv(filepath, nrows=0, encoding="utf-8").columns)
+
+
+def _read_float_columns(filepath: Path, columns: List[str]) -> pd.DataFrame:
+    """
+    用 read_csv 的 C 解析器把指定列整列读成 float64
+
+    na_filter=False：空单元格与 csv + float() 时一样视为非法值。
+    解析失败时再按字符串读一遍：定位第一个非法值，或逐列用 to_numeric 转换。
+    """
+    try:
+        return pd.read_csv(
+            filepath,
+            usecols=columns,
+            dtype=dict.fromkeys(columns, np.float64),
+            na_filter=False,
+            encoding="utf-8",
+        )
+    except ValueError:
+        pass
+
+    raw = pd.read_csv(filepath, usecols=columns, dtype=str, na_filter=False, encoding="utf-8")
+    for col in columns:
+        values = pd.to_numeric(raw[col], errors="coerce")
+        bad = values.isna().to_numpy() & (raw[col].str.strip().str.lower() != "nan").to_numpy()
+        if bad.any():
+            raise ValueError(f"非法 {col} 值: {raw[col].iloc[int(bad.argmax())]}")
+        raw[col] = values.astype(np.float64)
+    return raw
+
+
+@lru_cache(maxsize=32)
+def _cached_column(path: str, column: str, mtime_ns: int) -> np.ndarray:
+    """
+    按 (绝对路径, 列名, 修改时间) 缓存解析结果
+
+    文件被改写后 mtime 变化，自然失效；返回只读数组，防止调用方改坏缓存。
+    """
+    filepath = Path(path)
+    fieldnames = _read_fieldnames(filepath)
+    if column not in fieldnames:
+        raise ValueError(
+            f"CSV 文件缺少 {column} 列，实际列: {fieldnames}"
+        )
+
+    values = _read_float_columns(filepath, [column])[column].to_numpy(dtype=np.float64)
+    values.flags.writeable = False
+    return values
 
-            try:
-                prices.append(float(raw_price))
-            except ValueError:
-                raise ValueError(f"非法 price 值: {raw_price}")
 
-    return prices
+def load_prices_from_csv(filename: str) -> List[float]:
+    return load_series_from_csv(filename, "price")
 
 def load_series_from_csv(
     filename: str,
     column: str = "price",
 ) -> List[float]:
-    values: List[float] = []
-
     current_dir = Path(__file__).parent
-    filepath = current_dir / filename
-
-    with filepath.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        if column not in reader.fieldnames:
-            raise ValueError(
-                f"CSV 文件缺少 {column} 列，实际列: {reader.fieldnames}"
-            )
+    filepath = (current_dir / filename).resolve()
 
-        for row in reader:
-            raw = row[column]
-            try:
-                values.append(float(raw))
-            except ValueError:
-                raise ValueError(f"非法 {column} 值: {raw}")
-
-    return values
+    # 重复加载同一文件时直接取缓存，只做一次 tolist
+    return _cached_column(str(filepath), column, filepath.stat().st_mtime_ns).tolist()
 
 def load_columns_from_csv(
     filename: str,
     columns: List[str],
 ) -> dict[str, pd.Series]:  # ✅ 改为返回 pd.Series
-    data = {col: [] for col in columns}
-
     current_dir = Path(__file__).parent
     filepath = current_dir / filename
 
-    with filepath.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        missing = [c for c in columns if c not in reader.fieldnames]
-        if missing:
-            raise ValueError(f"CSV 缺少列: {missing}")
+    fieldnames = _read_fieldnames(filepath)
+    missing = [c for c in columns if c not in fieldnames]
+    if missing:
+        raise ValueError(f"CSV 缺少列: {missing}")
 
-        for row in reader:
-            for col in columns:
-                try:
-                    data[col].append(float(row[col]))
-                except ValueError:
-                    raise ValueError(f"非法 {col} 值: {row[col]}")
+    df = _read_float_columns(filepath, columns)
 
-    # ✅ 转换为 pd.Series
-    return {col: pd.Series(values) for col, values in data.items()}
\ No newline at end of file
+    # ✅ 直接取 DataFrame 的列（已是 pd.Series）
+    return {col: df[col] for col in columns}
@@ -1,9 +1,27 @@
+import numpy as np
+
 from quant_system.backtest.signal import SignalType
 
+
+def sentiments_to_signals(
+    sentiments,
+    long_threshold: float = 0.3,
+    short_threshold: float = -0.3,
+) -> np.ndarray:
+    """
+    批量把情绪值映射为 int8 信号编码（SIGNAL_BUY / SIGNAL_EXIT / SIGNAL_HOLD）
+
+    两次布尔比较相减，无分支；NaN 两边都不成立，记为 SIGNAL_HOLD。
+    """
+    sentiments = np.asarray(sentiments, dtype=np.float64)
+    return (sentiments > long_threshold).astype(np.int8) - (sentiments < short_threshold).astype(np.int8)
+
+
 def sentiment_to_signal(sentiment: float) -> SignalType:
+    """单个情绪值的信号（逐 bar 调用，直接比较，不经过 numpy）；批量请用 sentiments_to_signals"""
     if sentiment > 0.3:
         return SignalType.BUY
     elif sentiment < -0.3:
         return SignalType.EXIT
     else:
-        return SignalType.HOLD
\ No newline at end of file
+        return SignalType.HOLD
@@ -1,14 +1,39 @@
 # examples/paper_trading_demo.py
 
+import signal
+import threading
+from contextlib import contextmanager
+
+import numpy as np
 from quant_system.data.live_feed import AKShareDataFeed, HistoricalSimulator
 from quant_system.data.price_feed import load_prices_from_csv
 from quant_system.trading.paper_trading_engine import PaperTradingEngine
-from quant_system.trading.order import OrderType, OrderSide
+from quant_system.trading.order import OrderManager, OrderType, OrderSide
 from quant_system.trading.account import Account
-from quant_system.data.live_feed import BarData
+from quant_system.data.bar import BarData
 from typing import Optional
 from quant_system.trading.order import Order
 
+@contextmanager
+def _stop_on_sigint():
+    """
+    Ctrl+C 只置位事件，主线程阻塞在 Event.wait 上，不再轮询 sleep
+
+    只有主线程能安装信号处理函数；在其他线程中运行时不安装，只按超时等待。
+    退出时恢复原来的 SIGINT 处理函数。
+    """
+    stop_event = threading.Event()
+    if threading.current_thread() is not threading.main_thread():
+        yield stop_event
+        return
+
+    previous = signal.signal(signal.SIGINT, lambda *a: stop_event.set())
+    try:
+        yield stop_event
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
 # ============================================
 # 示例1: 简单的双均线策略
 # ============================================
@@ -16,29 +41,60 @@ from quant_system.trading.order import Order
 class SimpleMAStrategy:
     """简单双均线策略"""
     
-    def __init__(self, fast_window=5, slow_window=20):
+    def __init__(self, fast_window=5, slow_window=20, verbose=True):
         self.fast_window = fast_window
         self.slow_window = slow_window
-        self.price_history = {}
+        # 关闭后不格式化、不输出信号提示（高倍速回放时省去 stdout 开销）
+        self.verbose = verbose
+        # 每个股票一个定长 float64 环形缓冲区（快慢均线共用），均线用滑动累加和 O(1) 更新
+        self._ring_size = max(fast_window, slow_window)
+        self._ring: dict[str, np.ndarray] = {}
+        self._idx: dict[str, int] = {}
+        self._fast_sum: dict[str, float] = {}
+        self._slow_sum: dict[str, float] = {}
+        self._om = OrderManager()
     
     def __call__(self, bar: BarData, account: Account) -> Optional[Order]:
         """策略逻辑"""
         symbol = bar.symbol
+        close = bar.close
+        
+        # 记录价格窗口
+        if symbol not in self._ring:
+            self._ring[symbol] = np.empty(self._ring_size, dtype=np.float64)
+            self._idx[symbol] = 0
+            self._fast_sum[symbol] = 0.0
+            self._slow_sum[symbol] = 0.0
+        
+        ring = self._ring[symbol]
+        idx = self._idx[symbol]
+        size = self._ring_size
         
-        # 记录价格历史
-        if symbol not in self.price_history:
-            self.price_history[symbol] = []
-        self.price_history[symbol].append(bar.close)
+        # 窗口已满时先从累加和中减去滑出窗口的价格（在覆盖写入之前读取）
+        if idx >= self.fast_window:
+            self._fast_sum[symbol] -= float(ring[(idx - self.fast_window) % size])
+        if idx >= self.slow_window:
+            self._slow_sum[symbol] -= float(ring[(idx - self.slow_window) % size])
         
-        prices = self.price_history[symbol]
+        ring[idx % size] = close
+        self._fast_sum[symbol] += close
+        self._slow_sum[symbol] += close
+        idx += 1
+        self._idx[symbol] = idx
+        
+        # 写指针绕回起点时按缓冲区重新求和，消除长时间加减累积的舍入误差
+        # （此时 ring 按时间顺序排列，末尾即最近的价格）
+        if idx % size == 0:
+            self._fast_sum[symbol] = float(ring[size - self.fast_window:].sum())
+            self._slow_sum[symbol] = float(ring[size - self.slow_window:].sum())
         
         # 数据不足
-        if len(prices) < self.slow_window:
+        if idx < self.slow_window:
             return None
         
         # 计算均线
-        fast_ma = sum(prices[-self.fast_window:]) / self.fast_window
-        slow_ma = sum(prices[-self.slow_window:]) / self.slow_window
+        fast_ma = self._fast_sum[symbol] / self.fast_window
+        slow_ma = self._slow_sum[symbol] / self.slow_window
         
         # 交易逻辑
         has_position = account.has_position(symbol)
@@ -48,30 +104,28 @@ class SimpleMAStrategy:
             # 全仓买入
             shares = int(account.cash / bar.close * 0.95)  # 95%仓位
             if shares > 0:
-                from quant_system.trading.order import OrderManager, OrderType, OrderSide
-                order_manager = OrderManager()
-                order = order_manager.create_order(
+                order = self._om.create_order(
                     symbol=symbol,
                     order_type=OrderType.MARKET,
                     side=OrderSide.BUY,
                     quantity=shares
                 )
-                print(f"📈 策略信号: 买入 {symbol} {shares}股 (金叉)")
+                if self.verbose:
+                    print(f"📈 策略信号: 买入 {symbol} {shares}股 (金叉)")
                 return order
         
         # 死叉卖出
         elif fast_ma < slow_ma and has_position:
             pos = account.get_position(symbol)
             if pos:
-                from quant_system.trading.order import OrderManager, OrderType, OrderSide
-                order_manager = OrderManager()
-                order = order_manager.create_order(
+                order = self._om.create_order(
                     symbol=symbol,
                     order_type=OrderType.MARKET,
                     side=OrderSide.SELL,
                     quantity=pos.quantity
                 )
-                print(f"📉 策略信号: 卖出 {symbol} {pos.quantity}股 (死叉)")
+                if self.verbose:
+                    print(f"📉 策略信号: 卖出 {symbol} {pos.quantity}股 (死叉)")
                 return order
         
         return None
@@ -100,13 +154,13 @@ def demo_historical_simulation():
     engine.set_strategy_callback(strategy)
     
     # 5. 启动
-    engine.start(['AAPL'])
-    
-    # 等待回放完成（或手动停止）
-    import time
-    time.sleep(30)  # 运行30秒
-    
-    engine.stop()
+    with _stop_on_sigint() as stop_event:
+        engine.start(['AAPL'])
+        try:
+            # 等待回放完成（或 Ctrl+C 提前停止）
+            stop_event.wait(timeout=30)  # 最多运行30秒
+        finally:
+            engine.stop()
 
 
 def demo_live_akshare():
@@ -129,16 +183,13 @@ def demo_live_akshare():
     engine.set_strategy_callback(strategy)
     
     # 4. 启动（订阅平安银行、贵州茅台）
-    try:
+    with _stop_on_sigint() as stop_event:
         engine.start(['000001', '600519'])
-        
-        # 持续运行（Ctrl+C停止）
-        while True:
-            import time
-            time.sleep(1)
-            
-    except KeyboardInterrupt:
-        engine.stop()
+        try:
+            # 持续运行（Ctrl+C停止）
+            stop_event.wait()
+        finally:
+            engine.stop()
 
 
 def demo_manual_trading():
@@ -159,24 +210,23 @@ def demo_manual_trading():
     )
     
     # 不设置自动策略，手动下单
-    engine.start(['AAPL'])
-    
-    import time
-    time.sleep(2)
-    
-    # 手动买入
-    print("\n🖱️ 手动下单: 买入100股")
-    engine.submit_order('AAPL', OrderSide.BUY, 100, OrderType.MARKET)
-    
-    time.sleep(10)
-    
-    # 手动卖出
-    print("\n🖱️ 手动下单: 卖出50股")
-    engine.submit_order('AAPL', OrderSide.SELL, 50, OrderType.MARKET)
-    
-    time.sleep(10)
-    
-    engine.stop()
+    with _stop_on_sigint() as stop_event:
+        engine.start(['AAPL'])
+        try:
+            # Ctrl+C 后跳过剩余步骤直接停止
+            if not stop_event.wait(timeout=2):
+                # 手动买入
+                print("\n🖱️ 手动下单: 买入100股")
+                engine.submit_order('AAPL', OrderSide.BUY, 100, OrderType.MARKET)
+                
+                if not stop_event.wait(timeout=10):
+                    # 手动卖出
+                    print("\n🖱️ 手动下单: 卖出50股")
+                    engine.submit_order('AAPL', OrderSide.SELL, 50, OrderType.MARKET)
+                    
+                    stop_event.wait(timeout=10)
+        finally:
+            engine.stop()
 
 
 def main():
@@ -1,29 +1,45 @@
-from typing import List
+from typing import List, Tuple
+
+import numpy as np
+
+from quant_system.analysis._numeric import max_drawdown as _max_drawdown
+from quant_system.backtest.result import BacktestResult
 
 
 def total_return(equity_curve: List[float]) -> float:
     """
     总收益率
     """
-    if not equity_curve:
+    if len(equity_curve) == 0:
         return 0.0
 
-    return (equity_curve[-1] / equity_curve[0]) - 1
+    return BacktestResult.calc_return(equity_curve[-1], equity_curve[0])
 
 
 def max_drawdown(equity_curve: List[float]) -> float:
     """
     最大回撤（返回负值，例如 -0.2 表示 -20%）
+
+    与 BacktestResult.max_drawdown 共用 analysis._numeric 的单次扫描实现
+    （numba 可用时编译，否则为 np.maximum.accumulate）；空曲线返回 0.0。
     """
-    max_equity = equity_curve[0]
-    max_dd = 0.0
+    return _max_drawdown(equity_curve)
 
-    for equity in equity_curve:
-        if equity > max_equity:
-            max_equity = equity
 
-        drawdown = (equity / max_equity) - 1
-        if drawdown < max_dd:
-            max_dd = drawdown
+def metrics_bundle(equity_curve: List[float]) -> Tuple[float, float, float]:
+    """
+    (总收益率, 最大回撤, 期末权益) 一次算出
 
-    return max_dd
+    权益曲线只转换成 float64 数组一次；总收益率和期末权益只读首尾两点，
+    整条曲线只在回撤扫描中遍历一遍。空曲线返回 (0.0, 0.0, 0.0)。
+    """
+    arr = np.asarray(equity_curve, dtype=np.float64)
+    if arr.shape[0] == 0:
+        return 0.0, 0.0, 0.0
+
+    final_equity = float(arr[-1])
+    return (
+        BacktestResult.calc_return(final_equity, float(arr[0])),
+        _max_drawdown(arr),
+        final_equity,
+    )
@@ -1,11 +1,35 @@
+from typing import Sequence
+import numpy as np
 import matplotlib.pyplot as plt
 from quant_system.backtest.result import BacktestResult
 
 def plot_equity_curve(result: BacktestResult):
-    plt.figure()
-    plt.plot(result.equity_curve)
-    plt.title(f"Equity Curve - {result.symbol}")
-    plt.xlabel("Time")
-    plt.ylabel("Equity")
-    plt.grid(True)
+    plot_equity_multi([result])
+
+def plot_equity_multi(results: Sequence[BacktestResult]):
+    """
+    多条权益曲线画在同一个坐标轴上
+
+    复用名为 "equity" 的 figure（clear=True），不再每次新建窗口；
+    曲线等长时堆成矩阵一次 ax.plot。
+    """
+    fig = plt.figure(num="equity", clear=True)
+    ax = fig.add_subplot()
+
+    curves = [np.asarray(r.equity_curve, dtype=np.float64) for r in results]
+    labels = [f"{r.symbol} {r.params}" if r.params else r.symbol for r in results]
+    if len({len(c) for c in curves}) == 1:
+        ax.plot(np.vstack(curves).T, label=labels)
+    else:
+        for curve, label in zip(curves, labels):
+            ax.plot(curve, label=label)
+
+    if len(results) == 1:
+        ax.set_title(f"Equity Curve - {results[0].symbol}")
+    else:
+        ax.set_title("Equity Curves")
+        ax.legend()
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Equity")
+    ax.grid(True)
     plt.show()
@@ -1,4 +1,7 @@
 import csv
+import io
+import sys
+from operator import attrgetter
 from typing import List
 from quant_system.backtest.result import BacktestResult
 
@@ -23,7 +26,7 @@ class ResultTable:
   ) -> "ResultTable":
     sorted_results = sorted(
       self.results,
-      key=lambda r: getattr(r, key),
+      key=attrgetter(key),
       reverse=descending,
     )
     return ResultTable(sorted_results)
@@ -38,40 +41,36 @@ class ResultTable:
       return
 
     rows = [r.to_row() for r in self.results]
-    headers = rows[0].keys()
+    headers = list(rows[0])
 
-    # 计算列宽
-    col_widths = {
-      h: max(len(str(row[h])) for row in rows)
-      for h in headers
-    }
-
-    # header
-    header_line = " | ".join(
-      f"{h:<{col_widths[h]}}" for h in headers
-    )
-    sep_line = "-+-".join(
-      "-" * col_widths[h] for h in headers
-    )
+    # 单次遍历：每个单元格只转一次字符串，同时更新列宽（列宽只看数据行，不含表头）
+    widths = [0] * len(headers)
+    cells = []
+    for row in rows:
+      line = [str(row[h]) for h in headers]
+      for i, cell in enumerate(line):
+        if len(cell) > widths[i]:
+          widths[i] = len(cell)
+      cells.append(line)
 
-    print(header_line)
-    print(sep_line)
+    fmt = " | ".join(f"{{:<{w}}}" for w in widths)
+    buf = io.StringIO()
+    buf.write(fmt.format(*headers) + "\n")
+    buf.write("-+-".join("-" * w for w in widths) + "\n")
+    for line in cells:
+      buf.write(fmt.format(*line) + "\n")
 
-    # rows
-    for row in rows:
-      print(
-        " | ".join(
-          f"{str(row[h]):<{col_widths[h]}}"
-          for h in headers
-        )
-      )
+    sys.stdout.write(buf.getvalue())
   
   def best(self, metric: str = "total_return"):
-    return max(self.results, key=lambda r: getattr(r, metric))
+    return max(self.results, key=attrgetter(metric))
 
   def to_csv(self, path: str):
-    rows = [r.to_row() for r in self.results]
+    if not self.results:
+      return
+
+    # 各行列相同：表头取一次，逐行流式写入值元组
     with open(path, "w", newline="", encoding="utf-8") as f:
-      writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-      writer.writeheader()
-      writer.writerows(rows)
\ No newline at end of file
+      writer = csv.writer(f)
+      writer.writerow(self.results[0].row_fields())
+      writer.writerows(r.to_tuple() for r in self.results)
\ No newline at end of file
@@ -1,13 +1,17 @@
-from typing import List
+from dataclasses import dataclass
 
+import numpy as np
 
+
+@dataclass(slots=True)
 class BacktestResult:
-    def __init__(
-        self,
-        equity_curve: List[float],
-        total_return: float,
-        max_drawdown: float,
-    ):
-        self.equity_curve = equity_curve
-        self.total_return = total_return
-        self.max_drawdown = max_drawdown
+    equity_curve: np.ndarray  # float64 数组（传入 list / array('d') 时构造时转换一次）
+    total_return: float
+    max_drawdown: float
+
+    def __post_init__(self):
+        if isinstance(self.equity_curve, np.ndarray):
+            self.equity_curve = self.equity_curve.astype(np.float64, copy=False)
+        else:
+            # 复制一份，不持有调用方 array('d') 的缓冲区（否则对方无法再 append）
+            self.equity_curve = np.array(self.equity_curve, dtype=np.float64)
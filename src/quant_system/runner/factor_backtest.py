@@ -1,4 +1,6 @@
 from typing import Dict, List
+import numpy as np
+from quant_system.analysis._numeric import factor_portfolio_kernel
 from quant_system.sentiment.factor.base import Factor
 from quant_system.backtest.result import BacktestResult
 
@@ -14,38 +16,38 @@ class FactorBacktestRunner:
     self.factor = factor
     self.initial_cash = initial_cash
 
-  def run(self) -> BacktestResult:
-    equity = self.initial_cash
-    equity_curve = [equity]
+  def _factor_matrix(self, symbols: List[str], price_matrix: np.ndarray) -> np.ndarray:
+    """
+    T×S 因子矩阵（NaN 表示无因子值）
 
-    symbols = list(self.prices.keys())
-    T = len(next(iter(self.prices.values())))
+    因子实现了 compute_matrix(price_matrix) 时整体向量化计算，
+    否则逐期调用 compute(prices, t)。
+    """
+    compute_matrix = getattr(self.factor, "compute_matrix", None)
+    if compute_matrix is not None:
+      return np.asarray(compute_matrix(price_matrix), dtype=np.float64)
 
+    T = price_matrix.shape[1]
+    factors = np.full((T, len(symbols)), np.nan)
+    column = {s: i for i, s in enumerate(symbols)}
     for t in range(1, T - 1):
-      factor_values = self.factor.compute(self.prices, t)
-      if not factor_values:
-        equity_curve.append(equity)
-        continue
-
-      ranked = sorted(
-        factor_values.items(),
-        key=lambda x: x[1],
-        reverse=True
-      )
+      for s, value in self.factor.compute(self.prices, t).items():
+        factors[t, column[s]] = value
+    return factors
 
-      top_n = max(1, len(ranked) // 2)
-      longs = [s for s, _ in ranked[:top_n]]
-
-      returns = []
-      for s in longs:
-        p0 = self.prices[s][t]
-        p1 = self.prices[s][t + 1]
-        returns.append(p1 / p0 - 1)
-
-      if returns:
-        equity *= (1 + sum(returns) / len(returns))
+  def run(self) -> BacktestResult:
+    symbols = list(self.prices.keys())
+    # S×T 价格矩阵，只构造一次
+    price_matrix = np.stack([np.asarray(self.prices[s], dtype=np.float64) for s in symbols])
+    factors = self._factor_matrix(symbols, price_matrix)
+    # 收益率矩阵一次算出，各期直接按列取
+    returns = price_matrix[:, 1:] / price_matrix[:, :-1] - 1
 
-      equity_curve.append(equity)
+    kernel = factor_portfolio_kernel()
+    if kernel is not None:
+      equity_curve = kernel(returns, factors, float(self.initial_cash))
+    else:
+      equity_curve = self._run_numpy(returns, factors)
 
     return BacktestResult(
       symbol="FACTOR_PORTFOLIO",
@@ -56,3 +58,21 @@ class FactorBacktestRunner:
         "factor": self.factor.__class__.__name__,
       },
     )
+
+  def _run_numpy(self, returns: np.ndarray, factors: np.ndarray) -> np.ndarray:
+    """numba 不可用时的 NumPy 实现，与编译内核结果一致"""
+    T = returns.shape[1] + 1
+    equity = self.initial_cash
+    equity_curve = np.empty(max(T - 1, 1))
+    equity_curve[0] = equity
+
+    for t in range(1, T - 1):
+      row = factors[t]
+      valid = np.flatnonzero(~np.isnan(row))
+      if valid.size:
+        order = np.argsort(-row[valid], kind="stable")
+        longs = valid[order[:max(1, valid.size // 2)]]
+        equity *= 1 + sum(returns[longs, t].tolist()) / len(longs)
+      equity_curve[t] = equity
+
+    return equity_curve
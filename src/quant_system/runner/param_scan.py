@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 from itertools import product
 from quant_system.backtest.engine import BacktestEngine
 from quant_system.backtest.result import BacktestResult
@@ -6,11 +6,49 @@ from quant_system.strategy.base import Strategy
 from quant_system.report.result_table import ResultTable
 
 
+def iter_param_signals(
+    prices: List[float],
+    strategy_cls: type[Strategy],
+    param_grid: dict,
+) -> Iterator[Tuple[dict, list]]:
+    """按 product(*param_grid.values()) 的顺序逐个产出 (参数组合, 信号)"""
+    param_names = list(param_grid.keys())
+    param_values = list(param_grid.values())
+
+    # 只扫 window 且策略支持批量信号时，所有窗口共用一份价格数组一次算出信号
+    batch_codes = None
+    batch_signal_codes = getattr(strategy_cls, "batch_signal_codes", None)
+    if batch_signal_codes is not None and param_names == ["window"]:
+        batch_codes = batch_signal_codes(prices, set(param_grid["window"]))
+
+    # 网格里重复的参数组合（如 "window": [5, 5, 10]）只生成一次信号
+    signals_cache: dict = {}
+
+    for values in product(*param_values):
+        params = dict(zip(param_names, values))
+
+        if batch_codes is not None:
+            yield params, batch_codes[params["window"]]
+            continue
+
+        key = values
+        try:
+            signals = signals_cache.get(key)
+        except TypeError:  # 参数值不可哈希时不缓存
+            key = signals = None
+        if signals is None:
+            signals = strategy_cls(**params).generate_signals(prices)
+            if key is not None:
+                signals_cache[key] = signals
+        yield params, signals
+
+
 def run_param_scan(
     symbol: str,
     prices: List[float],
     strategy_cls: type[Strategy],
     param_grid: dict,
+    engine: Optional[BacktestEngine] = None,
 ) -> ResultTable:
     """
     param_grid example:
@@ -18,26 +56,23 @@ def run_param_scan(
         "window": [5, 10, 20],
         "threshold": [0.0, 0.01]
     }
+
+    engine: 复用的回测引擎（每个参数组合 reset 一次）；不传时在本次扫描内复用一个
     """
     results: List[BacktestResult] = []
 
-    param_names = list(param_grid.keys())
-    param_values = list(param_grid.values())
-
-    for values in product(*param_values):
-        params = dict(zip(param_names, values))
-
-        # 1️⃣ 构造策略
-        strategy = strategy_cls(**params)
-        signals = strategy.generate_signals(prices)
-
+    # 1️⃣ 构造策略
+    for params, signals in iter_param_signals(prices, strategy_cls, param_grid):
         # 2️⃣ 跑回测
-        bt = BacktestEngine(
-            symbol=symbol,
-            prices=prices,
-            signals=signals,
-        )
-        result = bt.run()  # ✅ 现在直接返回 BacktestResult
+        if engine is None:
+            engine = BacktestEngine(
+                symbol=symbol,
+                prices=prices,
+                signals=signals,
+            )
+        else:
+            engine.reset(prices, signals, symbol)
+        result = engine.run()  # ✅ 现在直接返回 BacktestResult
 
         # 3️⃣ 记录参数组合
         result.params = params
@@ -6,12 +6,16 @@ Walk-Forward 分析
 - 在测试窗口验证表现
 - 滚动执行
 """
+import sys
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import numpy as np
 from quant_system.backtest.engine import BacktestEngine
+from quant_system.backtest.multi_backtest import MultiBacktest
 from quant_system.backtest.result import BacktestResult
 from quant_system.strategy.base import Strategy
-from quant_system.runner.param_scan import run_param_scan
+from quant_system.report.result_table import ResultTable
+from quant_system.runner.param_scan import iter_param_signals, run_param_scan
 
 
 @dataclass
@@ -28,14 +32,14 @@ class WalkForwardResult:
     train_results: List[BacktestResult]  # 训练期结果
     test_results: List[BacktestResult]   # 测试期结果
     best_params_history: List[Dict]      # 每个周期的最优参数
-    combined_equity_curve: List[float]   # 拼接的权益曲线
+    combined_equity_curve: np.ndarray    # 拼接的权益曲线
     
     @property
     def total_return(self) -> float:
         """总收益率"""
-        if not self.combined_equity_curve:
+        if len(self.combined_equity_curve) == 0:
             return 0.0
-        return (self.combined_equity_curve[-1] / self.combined_equity_curve[0]) - 1
+        return BacktestResult.calc_return(self.combined_equity_curve[-1], self.combined_equity_curve[0])
     
     @property
     def avg_train_performance(self) -> float:
@@ -57,12 +61,51 @@ class WalkForwardResult:
         return self.avg_test_performance - self.avg_train_performance
 
 
+def _flush(lines: List[str]):
+    """把缓冲的进度行一次写入 stdout 并清空"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    lines.clear()
+
+
+def _run_train_scans_parallel(
+    prices: List[float],
+    strategy_cls: type[Strategy],
+    param_grid: Dict[str, List[Any]],
+    config: WalkForwardConfig,
+    n_iters: int,
+    max_workers: Optional[int],
+) -> List[ResultTable]:
+    """
+    所有训练窗口 × 参数组合合并为一批，交给 MultiBacktest 多进程执行
+
+    返回每个窗口的扫描结果，与逐窗口调用 run_param_scan 一致。
+    """
+    tasks = []
+    task_params = []
+    for i in range(n_iters):
+        train_start = i * config.step_size
+        train_prices = prices[train_start:train_start + config.train_window]
+        for params, signals in iter_param_signals(train_prices, strategy_cls, param_grid):
+            tasks.append((f"Train_{i + 1}", train_prices, signals))
+            task_params.append(params)
+
+    results = MultiBacktest(tasks, parallel=True, max_workers=max_workers).run()
+    for result, params in zip(results, task_params):
+        result.params = params
+
+    n_params = len(results) // n_iters if n_iters else 0
+    return [ResultTable(results[i * n_params:(i + 1) * n_params]) for i in range(n_iters)]
+
+
 def run_walk_forward_analysis(
     prices: List[float],
     strategy_cls: type[Strategy],
     param_grid: Dict[str, List[Any]],
     config: WalkForwardConfig,
-    optimization_metric: str = "sharpe_ratio"
+    optimization_metric: str = "sharpe_ratio",
+    verbose: bool = True,
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
 ) -> WalkForwardResult:
     """
     运行 Walk-Forward 分析
@@ -73,6 +116,9 @@ def run_walk_forward_analysis(
         param_grid: 参数搜索空间
         config: Walk-Forward 配置
         optimization_metric: 优化目标指标
+        verbose: 是否打印每轮进度（批量调用时关闭，省去格式化和 stdout 开销）
+        parallel: 是否把所有训练窗口 × 参数组合合并成一批多进程回测
+        max_workers: 并行时的进程数，默认 os.cpu_count()
     
     Returns:
         Walk-Forward 结果
@@ -93,18 +139,36 @@ def run_walk_forward_analysis(
     train_results = []
     test_results = []
     best_params_history = []
-    combined_equity_curve = []
     
     current_position = 0
     total_length = len(prices)
     
-    print(f"🔄 开始 Walk-Forward 分析...")
-    print(f"   训练窗口: {config.train_window} 天")
-    print(f"   测试窗口: {config.test_window} 天")
-    print(f"   滑动步长: {config.step_size} 天")
-    print()
+    # 拼接曲线长度可由配置算出：每轮 test_window 个点，衔接处去掉重复的首点
+    n_iters = max(0, (total_length - config.train_window - config.test_window) // config.step_size + 1)
+    combined_equity_curve = np.empty(n_iters * (config.test_window - 1) + 1 if n_iters else 0)
+    pos = 0
+    
+    # 进度信息按轮缓冲，每轮一次写入 stdout
+    lines: List[str] = []
+    
+    if verbose:
+        lines.append(f"🔄 开始 Walk-Forward 分析...")
+        lines.append(f"   训练窗口: {config.train_window} 天")
+        lines.append(f"   测试窗口: {config.test_window} 天")
+        lines.append(f"   滑动步长: {config.step_size} 天")
+        lines.append("")
+        _flush(lines)
     
     iteration = 0
+    # 训练期扫描和测试期回测共用一个引擎，每个窗口 reset
+    bt = BacktestEngine(prices=[], signals=[], symbol="")
+    
+    # 各训练窗口的扫描互不依赖：并行时一次性提交全部 (窗口, 参数组合)
+    train_scans = None
+    if parallel:
+        train_scans = _run_train_scans_parallel(
+            prices, strategy_cls, param_grid, config, n_iters, max_workers
+        )
     
     while current_position + config.train_window + config.test_window <= total_length:
         iteration += 1
@@ -114,16 +178,21 @@ def run_walk_forward_analysis(
         train_end = current_position + config.train_window
         train_prices = prices[train_start:train_end]
         
-        print(f"📊 第 {iteration} 轮:")
-        print(f"   训练期: [{train_start}:{train_end}] ({len(train_prices)} 天)")
+        if verbose:
+            lines.append(f"📊 第 {iteration} 轮:")
+            lines.append(f"   训练期: [{train_start}:{train_end}] ({len(train_prices)} 天)")
         
         # 在训练期优化参数
-        train_scan = run_param_scan(
-            symbol=f"Train_{iteration}",
-            prices=train_prices,
-            strategy_cls=strategy_cls,
-            param_grid=param_grid
-        )
+        if train_scans is not None:
+            train_scan = train_scans[iteration - 1]
+        else:
+            train_scan = run_param_scan(
+                symbol=f"Train_{iteration}",
+                prices=train_prices,
+                strategy_cls=strategy_cls,
+                param_grid=param_grid,
+                engine=bt,
+            )
         
         # 找到最优参数
         best_train_result = train_scan.sort_by(optimization_metric, descending=True).best(optimization_metric)
@@ -132,51 +201,55 @@ def run_walk_forward_analysis(
         train_results.append(best_train_result)
         best_params_history.append(best_params)
         
-        print(f"   最优参数: {best_params}")
-        print(f"   训练期 {optimization_metric}: {getattr(best_train_result, optimization_metric):.3f}")
+        if verbose:
+            lines.append(f"   最优参数: {best_params}")
+            lines.append(f"   训练期 {optimization_metric}: {getattr(best_train_result, optimization_metric):.3f}")
         
         # 2️⃣ 测试期
         test_start = train_end
         test_end = test_start + config.test_window
         test_prices = prices[test_start:test_end]
         
-        print(f"   测试期: [{test_start}:{test_end}] ({len(test_prices)} 天)")
+        if verbose:
+            lines.append(f"   测试期: [{test_start}:{test_end}] ({len(test_prices)} 天)")
         
         # 用最优参数在测试期回测
         strategy = strategy_cls(**best_params)
         signals = strategy.generate_signals(test_prices)
         
-        bt = BacktestEngine(
-            symbol=f"Test_{iteration}",
-            prices=test_prices,
-            signals=signals,
-        )
+        bt.reset(test_prices, signals, f"Test_{iteration}")
         test_result = bt.run()
         test_result.params = best_params
         
         test_results.append(test_result)
         
-        print(f"   测试期 {optimization_metric}: {getattr(test_result, optimization_metric):.3f}")
-        print(f"   性能衰减: {(getattr(test_result, optimization_metric) - getattr(best_train_result, optimization_metric)):.3f}")
-        print()
+        if verbose:
+            lines.append(f"   测试期 {optimization_metric}: {getattr(test_result, optimization_metric):.3f}")
+            lines.append(f"   性能衰减: {(getattr(test_result, optimization_metric) - getattr(best_train_result, optimization_metric)):.3f}")
+            lines.append("")
+            _flush(lines)
         
         # 拼接权益曲线
-        if not combined_equity_curve:
-            combined_equity_curve.extend(test_result.equity_curve)
+        test_curve = np.asarray(test_result.equity_curve, dtype=np.float64)
+        if pos == 0:
+            combined_equity_curve[:len(test_curve)] = test_curve
+            pos = len(test_curve)
         else:
-            # 归一化衔接
-            scale_factor = combined_equity_curve[-1] / test_result.equity_curve[0]
-            scaled_curve = [v * scale_factor for v in test_result.equity_curve]
-            combined_equity_curve.extend(scaled_curve[1:])  # 跳过第一个点避免重复
+            # 归一化衔接，跳过第一个点避免重复
+            scale_factor = combined_equity_curve[pos - 1] / test_curve[0]
+            combined_equity_curve[pos:pos + len(test_curve) - 1] = test_curve[1:] * scale_factor
+            pos += len(test_curve) - 1
         
         # 滑动窗口
         current_position += config.step_size
     
-    print(f"✅ Walk-Forward 分析完成，共 {iteration} 轮")
+    if verbose:
+        lines.append(f"✅ Walk-Forward 分析完成，共 {iteration} 轮")
+        _flush(lines)
     
     return WalkForwardResult(
         train_results=train_results,
         test_results=test_results,
         best_params_history=best_params_history,
-        combined_equity_curve=combined_equity_curve
+        combined_equity_curve=combined_equity_curve[:pos]
     )
\ No newline at end of file
@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Dict
 
+import numpy as np
+
 
 @dataclass
 class SentimentResult:
@@ -17,10 +19,22 @@ class BaseSentimentModel(ABC):
         pass
 
 
+_LEVELS = ("fear", "neutral", "greed")
+# score <= -0.3 为 fear，score >= 0.3 为 greed；
+# searchsorted(side="left") 把等于阈值的分数归到左边，上阈值取 0.3 的前一个浮点数使 0.3 归为 greed
+_LEVEL_THRESHOLDS = np.array([-0.3, np.nextafter(0.3, -np.inf)])
+
+
 def score_to_level(score: float) -> str:
-    if score <= -0.3:
-        return "fear"
-    elif score >= 0.3:
-        return "greed"
-    else:
-        return "neutral"
+    # 比较结果直接作下标，NaN 两个比较都为 False，归为 neutral
+    return _LEVELS[1 - int(score <= -0.3) + int(score >= 0.3)]
+
+
+def score_to_levels(scores) -> np.ndarray:
+    """
+    批量版 score_to_level：一次 searchsorted 得到所有分数的等级（NaN 为 neutral）
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    index = np.searchsorted(_LEVEL_THRESHOLDS, scores, side="left")
+    index[np.isnan(scores)] = 1
+    return np.array(_LEVELS)[index]
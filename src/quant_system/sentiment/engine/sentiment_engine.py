@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 from quant_system.sentiment.factors.ma import MASentimentFactor
 from quant_system.sentiment.evaluation.ic import ICEvaluator
 from quant_system.sentiment.evaluation.ic_weight import ic_to_weight
@@ -8,15 +10,28 @@ class SentimentEngine:
     self.factor_window = factor_window
     self.ic_window = ic_window
     self.evaluator = ICEvaluator()  # ✅ 无参构造，和你现有实现一致
+    self._factor = MASentimentFactor(window=self.factor_window)
+    # 上一次的情绪输入及其因子值：只更新价格时情绪序列不变，直接复用
+    self._last_sentiment = None
+    self._last_factor_values = None
+
+  def _factor_values(self, sentiment_series: pd.Series) -> pd.Series:
+    """计算情绪因子；与上一次输入相同（值和索引都相同）时直接返回缓存"""
+    if self._last_sentiment is None or not self._last_sentiment.equals(sentiment_series):
+      self._last_factor_values = self._factor.compute(sentiment_series)
+      self._last_sentiment = sentiment_series
+    return self._last_factor_values
 
   def compute_signal(self, price_series, sentiment_series):
     """
     返回一个可以直接用于主线策略的情绪 signal
     """
+    # 输入统一转成 float64 Series 一次（list / ndarray 也可直接传入）
+    price_series = pd.Series(price_series, dtype=np.float64)
+    sentiment_series = pd.Series(sentiment_series, dtype=np.float64)
 
     # 1️⃣ 计算情绪因子
-    factor = MASentimentFactor(window=self.factor_window)
-    factor_values = factor.compute(sentiment_series)
+    factor_values = self._factor_values(sentiment_series)
     latest_factor_value = factor_values.iloc[-1]
 
     # 2️⃣ 计算衰减 IC（E11-3 的成果）
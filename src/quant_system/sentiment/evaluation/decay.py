@@ -1,7 +1,24 @@
 # quant_system/sentiment/evaluation/decay.py
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
+from quant_system.analysis._numeric import decayed_mean_kernel
+
+
+@lru_cache(maxsize=32)
+def _decay_weights(n: int, half_life: float) -> np.ndarray:
+  """
+  归一化的指数衰减权重（最新一期权重最大），按 (n, half_life) 缓存
+
+  返回只读数组，防止调用方改坏缓存。
+  """
+  weights = np.exp2(-np.arange(n - 1, -1, -1, dtype=np.float64) / half_life)
+  weights /= weights.sum()
+  weights.flags.writeable = False
+  return weights
+
 
 class ICDecayEvaluator:
   """
@@ -20,7 +37,11 @@ class ICDecayEvaluator:
     if n == 0:
       return 0.0
 
-    weights = np.exp(-np.log(2) * np.arange(n)[::-1] / half_life)
-    weights /= weights.sum()
+    values = ic_series.to_numpy(dtype=np.float64)
+
+    # 有 numba 时单次递推（alpha = 2^(-1/half_life)），不构造权重数组
+    kernel = decayed_mean_kernel()
+    if kernel is not None:
+      return float(kernel(values, 2.0 ** (-1.0 / half_life)))
 
-    return float((ic_series.values * weights).sum())
+    return float(values @ _decay_weights(n, half_life))
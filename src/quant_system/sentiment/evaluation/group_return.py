@@ -7,23 +7,60 @@ class GroupReturnEvaluator(FactorEvaluator):
     self.groups = groups
 
   def evaluate(self, factor_values, forward_returns):
-    group_returns = [[] for _ in range(self.groups)]
+    """
+    按因子值从小到大分 groups 组，统计各组平均收益的时间均值
 
-    for fv, fr in zip(factor_values, forward_returns):
-      ranked = sorted(fv.items(), key=lambda x: x[1])
-      n = len(ranked)
-      if n < self.groups:
-        continue
+    字典先按股票对齐成 T×N 矩阵，再按每期有效股票数 n 分批：
+    同一批内整体排序（并列时按字典中的先后顺序，与 sorted 一致），
+    每组取 n // groups 只，余数部分（因子值最大的几只）不参与分组。
+    """
+    sums = np.zeros(self.groups)
+    counts = np.zeros(self.groups, dtype=np.int64)
 
-      size = n // self.groups
+    pairs = list(zip(factor_values, forward_returns))
+    symbols = list(dict.fromkeys(s for fv, _ in pairs for s in fv))
+    if pairs and symbols:
+      column = {s: j for j, s in enumerate(symbols)}
+      shape = (len(pairs), len(symbols))
+      factors = np.full(shape, np.nan)
+      position = np.full(shape, len(symbols), dtype=np.int64)
+      returns = np.zeros(shape)
+      present = np.zeros(shape, dtype=bool)
+      has_factor = np.zeros(shape, dtype=bool)
+      for t, (fv, fr) in enumerate(pairs):
+        for k, (s, value) in enumerate(fv.items()):
+          j = column[s]
+          factors[t, j] = value
+          position[t, j] = k
+          has_factor[t, j] = True
+          if s in fr:
+            returns[t, j] = fr[s]
+            present[t, j] = True
 
-      for i in range(self.groups):
-        bucket = ranked[i * size:(i + 1) * size]
-        rets = [fr[s] for s, _ in bucket if s in fr]
-        if rets:
-          group_returns[i].append(sum(rets) / len(rets))
+      n_valid = has_factor.sum(axis=1)
+      for n in np.unique(n_valid):
+        if n < self.groups:
+          continue
+        rows = np.flatnonzero(n_valid == n)
+        size = n // self.groups
 
+        # 没有因子值的位置排到最后
+        keys = np.where(has_factor[rows], factors[rows], np.inf)
+        order = np.lexsort((position[rows], keys), axis=1)[:, :size * self.groups]
+        bucket_shape = (len(rows), self.groups, size)
+        rets = np.take_along_axis(returns[rows], order, axis=1).reshape(bucket_shape)
+        mask = np.take_along_axis(present[rows], order, axis=1).reshape(bucket_shape)
+
+        n_rets = mask.sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+          means = np.where(mask, rets, 0.0).sum(axis=2) / n_rets
+        # 组内没有收益数据的期不计入
+        sums += np.where(n_rets > 0, means, 0.0).sum(axis=0)
+        counts += (n_rets > 0).sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+      means = np.where(counts > 0, sums / counts, np.nan)
     return {
-      f"group_{i}_mean": float(np.mean(group_returns[i]))
+      f"group_{i}_mean": float(means[i])
       for i in range(self.groups)
     }
@@ -1,5 +1,40 @@
+import numpy as np
 import pandas as pd
 
+from quant_system.analysis._numeric import spearman_no_ties
+
+
+def _rankdata(values: np.ndarray) -> np.ndarray:
+  """
+  平均秩（并列取平均，从 1 开始），与 pd.Series.rank() 默认行为一致
+  """
+  order = np.argsort(values, kind="mergesort")
+  sorted_values = values[order]
+  # 每组并列值的起点
+  starts = np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+  group = starts.cumsum()
+  bounds = np.r_[np.flatnonzero(starts), len(values)]
+  ranks = np.empty(len(values), dtype=np.float64)
+  ranks[order] = 0.5 * (bounds[group] + bounds[group - 1] + 1)
+  return ranks
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+  """
+  Spearman 相关系数（a、b 已去掉缺失值，长度 >= 2）
+
+  两列都没有并列值时用闭式 1 - 6Σd²/(n(n²-1))；否则对平均秩求 Pearson。
+  秩方差为 0（常数列）时为 NaN。
+  """
+  n = len(a)
+  if np.unique(a).size == n and np.unique(b).size == n:
+    return spearman_no_ties(a, b)
+
+  ra = _rankdata(a)
+  rb = _rankdata(b)
+  with np.errstate(invalid="ignore", divide="ignore"):
+    return float(np.corrcoef(ra, rb)[0, 1])
+
 
 class ICEvaluator:
   """
@@ -8,25 +43,28 @@ class ICEvaluator:
 
   @staticmethod
   def calc_ic(
-    factor: pd.Series,
-    future_return: pd.Series,
+    factor,
+    future_return,
   ) -> float:
     """
     factor: t 时刻因子值
     future_return: t+1 或 t+n 收益
+
+    两者都是 pd.Series 时按索引对齐（只保留共同索引）；
+    ndarray 按位置对齐，由调用方保证顺序一致。去掉任一侧为 NaN 的样本。
     """
-    df = pd.concat([factor, future_return], axis=1).dropna()
-    if len(df) < 2:
-      return 0.0
+    if isinstance(factor, pd.Series) and isinstance(future_return, pd.Series):
+      if not factor.index.equals(future_return.index):
+        factor, future_return = factor.align(future_return, join="inner")
 
-    if df.iloc[:, 0].nunique() < 1:
-      return 0.0
-    if df.iloc[:, 1].nunique() < 1:
+    a = np.asarray(factor, dtype=np.float64)
+    b = np.asarray(future_return, dtype=np.float64)
+    mask = ~(np.isnan(a) | np.isnan(b))
+    if np.count_nonzero(mask) < 2:
       return 0.0
 
-    # Spearman = rank 后 Pearson
-    ic = df.iloc[:, 0].rank().corr(df.iloc[:, 1].rank())
-    return float(ic)
+    # Spearman = rank 后 Pearson（直接在 ndarray 上计算）
+    return _spearman(a[mask], b[mask])
 
   def compute_decayed_ic(
     self,
@@ -1,6 +1,43 @@
 # quant_system/sentiment/evaluation/rolling_ic.py
+import numpy as np
 import pandas as pd
-from quant_system.sentiment.evaluation.ic import ICEvaluator
+from numpy.lib.stride_tricks import sliding_window_view
+
+from quant_system.analysis._numeric import cross_sectional_ic_kernel
+
+
+def _cross_sectional_ic(
+  factor: np.ndarray,
+  returns: np.ndarray,
+) -> np.ndarray:
+  """
+  每一行（一个时点）的横截面 Spearman IC，与逐行调用 ICEvaluator.calc_ic 一致
+
+  factor / returns: T×S 矩阵（NaN 表示缺失）
+  有效样本不足 2 个时为 0.0，秩方差为 0 时为 NaN。
+  有 numba 时走编译内核（逐行排名 + Pearson）。
+  """
+  kernel = cross_sectional_ic_kernel()
+  if kernel is not None:
+    return kernel(np.ascontiguousarray(factor), np.ascontiguousarray(returns))
+
+  mask = ~(np.isnan(factor) | np.isnan(returns))
+  # 只在两者都有值的位置上排名（平均秩处理并列）；
+  # 两个矩阵上下拼接后一次 rank 完成，整个面板只排一次
+  stacked = np.where(np.vstack([mask, mask]), np.vstack([factor, returns]), np.nan)
+  rf, rr = np.vsplit(pd.DataFrame(stacked).rank(axis=1).to_numpy(), 2)
+
+  n = mask.sum(axis=1, keepdims=True)
+  with np.errstate(invalid="ignore", divide="ignore"):
+    rf = np.where(mask, rf, 0.0)
+    rr = np.where(mask, rr, 0.0)
+    df = np.where(mask, rf - rf.sum(axis=1, keepdims=True) / n, 0.0)
+    dr = np.where(mask, rr - rr.sum(axis=1, keepdims=True) / n, 0.0)
+    ic = (df * dr).sum(axis=1) / np.sqrt((df * df).sum(axis=1) * (dr * dr).sum(axis=1))
+
+  ic = np.clip(ic, -1.0, 1.0)
+  ic[n[:, 0] < 2] = 0.0
+  return ic
 
 
 class RollingICEvaluator:
@@ -20,28 +57,28 @@ class RollingICEvaluator:
     factor_df / return_df:
     index = date
     columns = symbol
+
+    每个时点的横截面 IC 只算一次，窗口均值（忽略 NaN，全为 NaN 时取 0.0）
+    在 sliding_window_view 上整体求出。
     """
-    ic_list = []
-
-    for end in range(self.window, len(factor_df)):
-      start = end - self.window
-
-      factor_slice = factor_df.iloc[start:end]
-      return_slice = return_df.iloc[start:end]
-
-      ics = []
-      for t in range(len(factor_slice)):
-        ic = ICEvaluator.calc_ic(
-          factor_slice.iloc[t],
-          return_slice.iloc[t],
-        )
-        ics.append(ic)
-
-      # 忽略 NaN
-      valid_ics = [ic for ic in ics if not pd.isna(ic)]
-      if valid_ics:
-        ic_list.append(sum(valid_ics) / len(valid_ics))
-      else:
-        ic_list.append(0.0)
-
-    return pd.Series(ic_list, index=factor_df.index[self.window:])
+    index = factor_df.index[self.window:]
+    n_windows = len(factor_df) - self.window
+    if n_windows <= 0:
+      return pd.Series([], index=index, dtype=np.float64)
+
+    # 单只股票（时间序列）时每个横截面最多 1 个样本，IC 恒为 0.0，不必排名
+    if factor_df.shape[1] < 2:
+      return pd.Series(np.zeros(n_windows), index=index)
+
+    factor = factor_df.to_numpy(dtype=np.float64)
+    returns = return_df.reindex(columns=factor_df.columns).to_numpy(dtype=np.float64)
+    ics = _cross_sectional_ic(factor, returns)
+
+    # 窗口 [end - window, end)，end 取 window .. T-1
+    valid = ~np.isnan(ics)
+    sums = sliding_window_view(np.where(valid, ics, 0.0), self.window)[:n_windows].sum(axis=1)
+    counts = sliding_window_view(valid, self.window)[:n_windows].sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+      ic_mean = np.where(counts > 0, sums / counts, 0.0)
+
+    return pd.Series(ic_mean, index=index)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Dict, List
 
 class BaseFactor(ABC):
     @abstractmethod
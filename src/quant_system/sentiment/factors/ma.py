@@ -1,6 +1,10 @@
 # quant_system/sentiment/factor/ma.py
 
+from collections import deque
+
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from quant_system.sentiment.factors.base import BaseFactor
 
 
@@ -14,12 +18,42 @@ class MASentimentFactor(BaseFactor):
   def __init__(self, window: int):
     self.window = window
     self.name = f"ma_sentiment_{window}"
+    # 流式计算状态：最近 window 个价格 + 滑动累加和
+    self._recent = deque(maxlen=window)
+    self._sum = 0.0
+    self._n_updates = 0
 
   def compute(self, prices: pd.Series) -> pd.Series:
     """
     prices: pd.Series indexed by time
     return: pd.Series (factor values)
+
+    前 window-1 个以及窗口内含 NaN 时为 NaN，与 rolling(window).mean() 一致。
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    ma = np.full(len(values), np.nan)
+    if 0 < self.window <= len(values):
+      ma[self.window - 1:] = sliding_window_view(values, self.window).sum(axis=1) / self.window
+    factor = (values - ma) / ma
+    return pd.Series(factor, index=prices.index)
+
+  def update(self, new_price: float) -> float:
     """
-    ma = prices.rolling(self.window).mean()
-    factor = (prices - ma) / ma
-    return factor
+    逐笔追加一个价格，O(1) 返回最新因子值（不足 window 个价格时为 NaN）
+
+    滑动累加和每满一个窗口按缓冲区重新求和一次，避免长时间运行累积舍入误差。
+    """
+    new_price = float(new_price)
+    if len(self._recent) == self.window:
+      self._sum -= self._recent[0]
+    self._recent.append(new_price)
+    self._sum += new_price
+
+    self._n_updates += 1
+    if self._n_updates % self.window == 0:
+      self._sum = float(sum(self._recent))
+
+    if len(self._recent) < self.window:
+      return float("nan")
+    ma = self._sum / self.window
+    return (new_price - ma) / ma
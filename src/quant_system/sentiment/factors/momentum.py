@@ -1,3 +1,4 @@
+import numpy as np
 from quant_system.sentiment.factor.base import Factor
 
 
@@ -12,3 +13,15 @@ class MomentumFactor(Factor):
                 continue
             values[symbol] = series[t] / series[t - self.window] - 1
         return values
+
+    def compute_matrix(self, price_matrix):
+        """
+        一次算出全部时点的因子值（T×S，t < window 时为 NaN）
+
+        price_matrix: S×T 价格矩阵
+        """
+        n_bars = price_matrix.shape[1]
+        values = np.full((n_bars, price_matrix.shape[0]), np.nan)
+        if n_bars > self.window:
+            values[self.window:] = (price_matrix[:, self.window:] / price_matrix[:, :-self.window] - 1).T
+        return values
@@ -1,6 +1,8 @@
 import numpy as np
 from collections import Counter
+from numpy.lib.stride_tricks import sliding_window_view
 from quant_system.backtest.signal import Signal, SignalType
+from quant_system.enums.signal import sentiments_to_signals
 from typing import List
 
 
@@ -25,17 +27,27 @@ class MarketSentiment:
 
     # 动量
     def _momentum(self, prices: np.ndarray) -> np.ndarray:
-        momentum = np.zeros(len(prices))
-        for i in range(self.momentum_window, len(prices)):
-            momentum[i] = prices[i] / prices[i - self.momentum_window] - 1
+        prices = np.asarray(prices, dtype=np.float64)
+        w = self.momentum_window
+        momentum = np.empty(len(prices))
+        momentum[:w] = 0.0
+        if w < len(prices):
+            # 直接写入结果数组，不产生中间数组
+            tail = momentum[w:]
+            np.divide(prices[w:], prices[:len(prices) - w], out=tail)
+            tail -= 1
         return momentum
 
     # 波动率
     def _volatility(self, prices: np.ndarray) -> np.ndarray:
-        returns = np.diff(prices) / prices[:-1]
+        prices = np.asarray(prices, dtype=np.float64)
+        returns = np.diff(prices)
+        returns /= prices[:-1]
+        w = self.volatility_window
         vol = np.zeros(len(prices))
-        for i in range(self.volatility_window, len(prices)):
-            vol[i] = np.std(returns[i - self.volatility_window : i])
+        # vol[i] = std(returns[i - w : i])，i 取 w .. n-1
+        if 0 < w < len(prices):
+            vol[w:] = sliding_window_view(returns, w).std(axis=1)
         return vol
     
     # 情绪值
@@ -43,30 +55,19 @@ class MarketSentiment:
         """
         使用对数收益率作为情绪值
         """
-        sentiment = [0.0]
-
-        for i in range(1, len(prices)):
-            prev = prices[i - 1]
-            curr = prices[i]
-
-            if prev == 0:
-                sentiment.append(0.0)
-                continue
-
-            ret = (curr - prev) / prev
-            sentiment.append(ret)
-
-        return sentiment
+        prices = np.asarray(prices, dtype=np.float64)
+        prev = prices[:-1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ret = np.where(prev != 0, np.diff(prices) / prev, 0.0)
+        return np.concatenate([[0.0], ret]).tolist()
     
     # 情绪均线
     def moving_average(self, values: list[float], window: int) -> list[float]:
-        ma = []
-        for i in range(len(values)):
-            if i < window - 1:
-                ma.append(0.0)
-            else:
-                ma.append(sum(values[i - window + 1:i + 1]) / window)
-        return ma
+        values = np.asarray(values, dtype=np.float64)
+        ma = np.zeros(len(values))
+        if 0 < window <= len(values):
+            ma[window - 1:] = sliding_window_view(values, window).sum(axis=1) / window
+        return ma.tolist()
 
     # 生成信号
     def generate_signals(self, prices: List[float]) -> List[Signal]:
@@ -74,15 +75,9 @@ class MarketSentiment:
         # 情绪均线
         sentiment_ma = self.moving_average(sentiment, self.ma_window)
 
-        signals: list[Signal] = []
-
-        for score in sentiment_ma:
-            if score > self.long_threshold:
-                signals.append(Signal(SignalType.BUY))
-            elif score < self.short_threshold:
-                signals.append(Signal(SignalType.SELL))
-            else:
-                signals.append(Signal(SignalType.HOLD))
+        # 阈值判断整列一次完成，再逐个包装为 Signal
+        codes = sentiments_to_signals(sentiment_ma, self.long_threshold, self.short_threshold)
+        signals: list[Signal] = [Signal(SignalType(code)) for code in codes.tolist()]
 
         # 🔍 调试用：看信号分布
         print("Signal stats:", Counter(s.type for s in signals))
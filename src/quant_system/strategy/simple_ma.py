@@ -1,24 +1,32 @@
-from typing import List
+from typing import Dict, Iterable, List
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from quant_system.strategy.base import Strategy
-from quant_system.backtest.signal import SignalType
+from quant_system.backtest.signal import SIGNAL_BUY, SignalType
 
 class SimpleMAStrategy(Strategy):
     def __init__(self, window: int = 3):
         self.window = window
 
-    def generate_signals(self, prices: List[float]) -> List[SignalType]:
-        signals = []
-
-        for i, price in enumerate(prices):
-            if i < self.window:
-                signals.append(SignalType.HOLD)
-                continue
+    @staticmethod
+    def batch_signal_codes(prices, windows: Iterable[int]) -> Dict[int, np.ndarray]:
+        """
+        多个窗口共用同一份价格数组，一次算出各自的 int8 信号编码
 
-            ma = sum(prices[i - self.window:i]) / self.window
+        第 i 个 bar 的均线取前 window 个价格（不含当前价），
+        当前价高于均线时 BUY，其余（含前 window 个 bar）HOLD。
+        """
+        p = np.asarray(prices, dtype=np.float64)
+        n = p.shape[0]
+        codes = {}
+        for window in windows:
+            out = np.zeros(n, dtype=np.int8)
+            if window < n:
+                ma = sliding_window_view(p, window)[:n - window].mean(axis=1)
+                out[window:] = np.where(p[window:] > ma, SIGNAL_BUY, 0)
+            codes[window] = out
+        return codes
 
-            if price > ma:
-                signals.append(SignalType.BUY)
-            else:
-                signals.append(SignalType.HOLD)
-
-        return signals
+    def generate_signals(self, prices: List[float]) -> List[SignalType]:
+        codes = self.batch_signal_codes(prices, [self.window])[self.window]
+        return [SignalType(c) for c in codes.tolist()]
@@ -1,6 +1,7 @@
 """
 验证 P0/P1 功能的测试脚本
 """
+from functools import lru_cache
 from quant_system.data.price_feed import load_prices_from_csv
 from quant_system.strategy.simple_ma import SimpleMAStrategy
 from quant_system.backtest.engine import BacktestEngine
@@ -8,18 +9,22 @@ from quant_system.backtest.cost_model import CostModel, NoCostModel
 from quant_system.visualization.backtest_report import plot_backtest_report
 
 
+@lru_cache(maxsize=None)
+def _load_prices_and_signals(filename: str = "AAPL.csv", window: int = 5):
+    """各测试共用同一份价格和信号，只加载、生成一次"""
+    prices = load_prices_from_csv(filename)
+    signals = SimpleMAStrategy(window=window).generate_signals(prices)
+    return prices, signals
+
+
 def test_enhanced_metrics():
     """测试增强指标"""
     print("=" * 60)
     print("测试 1: 增强指标计算")
     print("=" * 60)
     
-    # 加载数据
-    prices = load_prices_from_csv("AAPL.csv")
-    
-    # 生成信号
-    strategy = SimpleMAStrategy(window=5)
-    signals = strategy.generate_signals(prices)
+    # 加载数据、生成信号
+    prices, signals = _load_prices_and_signals()
     
     # 运行回测
     bt = BacktestEngine(
@@ -51,9 +56,7 @@ def test_cost_model():
     print("测试 2: 交易成本影响")
     print("=" * 60)
     
-    prices = load_prices_from_csv("AAPL.csv")
-    strategy = SimpleMAStrategy(window=5)
-    signals = strategy.generate_signals(prices)
+    prices, signals = _load_prices_and_signals()
     
     # 无成本回测
     bt_no_cost = BacktestEngine(
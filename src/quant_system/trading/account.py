@@ -1,3 +1,4 @@
+from array import array
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 from datetime import datetime
@@ -52,7 +53,7 @@ class Account:
         self.positions: Dict[str, Position] = {}
         
         # 历史记录
-        self.equity_curve: List[float] = [initial_cash]
+        self.equity_curve = array('d', [initial_cash])  # 原生 double，逐 bar 追加
         self.trade_history: List = []
         self.daily_pnl: List[float] = []
         
@@ -65,7 +66,8 @@ class Account:
     @property
     def total_position_value(self) -> float:
         """持仓总市值"""
-        return sum(pos.market_value for pos in self.positions.values())
+        # 持仓通常只有几只：直接求和比构造 ndarray 再点积快（每次权益更新都会读取）
+        return sum(pos.quantity * pos.current_price for pos in self.positions.values())
     
     @property
     def total_equity(self) -> float:
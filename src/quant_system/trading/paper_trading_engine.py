@@ -3,7 +3,8 @@ from datetime import datetime
 from .account import Account
 from .order import OrderManager, Order, OrderType, OrderSide
 from .simulator import MatchingEngine
-from ..data.live_feed import LiveDataFeed, BarData
+from ..data.bar import BarData
+from ..data.live_feed import LiveDataFeed
 
 class PaperTradingEngine:
     """
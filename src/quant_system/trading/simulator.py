@@ -1,7 +1,7 @@
 from typing import Optional, List
 import random
 from .order import Order, Fill, OrderType, OrderSide, OrderStatus
-from ..data.live_feed import BarData
+from ..data.bar import BarData
 from datetime import datetime
 
 class MatchingEngine:
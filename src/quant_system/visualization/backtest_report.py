@@ -1,20 +1,20 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import Optional
+from typing import List, Optional, Union
 from quant_system.backtest.result import BacktestResult
 
 
-def calculate_drawdown_series(equity_curve: list[float]) -> np.ndarray:
+def calculate_drawdown_series(equity_curve: Union[np.ndarray, List[float]]) -> np.ndarray:
     """计算回撤序列"""
-    equity_array = np.array(equity_curve)
+    equity_array = np.asarray(equity_curve, dtype=np.float64)
     peak = np.maximum.accumulate(equity_array)
     drawdown = (equity_array - peak) / peak
     return drawdown
 
 
-def calculate_daily_returns(equity_curve: list[float]) -> np.ndarray:
+def calculate_daily_returns(equity_curve: Union[np.ndarray, List[float]]) -> np.ndarray:
     """计算日收益率"""
-    equity_array = np.array(equity_curve)
+    equity_array = np.asarray(equity_curve, dtype=np.float64)
     returns = np.diff(equity_array) / equity_array[:-1]
     return returns
 
@@ -1,10 +1,12 @@
 """
 测试 BacktestEngine 回测引擎
 """
+import numpy as np
 import pytest
 from quant_system.backtest.engine import BacktestEngine
-from quant_system.backtest.signal import SignalType
+from quant_system.backtest.signal import SignalType, encode_signals
 from quant_system.backtest.cost_model import CostModel, NoCostModel
+from quant_system.backtest.risk_control import RiskControl
 from quant_system.enums.signal import SignalType as SignalEnum
 
 
@@ -78,6 +80,9 @@ class TestBacktestEngineBasic:
         
         # 应该有 4 条交易记录（2买2卖）
         assert len(result.trades) == 4
+        
+        # 交易记录对应的 bar 序号
+        assert [t.bar_index for t in result.trades] == [0, 2, 4, 7]
     
     def test_no_trades(self, simple_prices):
         """测试无交易（一直 HOLD）"""
@@ -132,6 +137,107 @@ class TestBacktestEngineWithCosts:
         assert cost_diff < 1000  # 假设成本不超过 1000 元
 
 
+class TestBacktestEngineVectorized:
+    """向量化快速路径测试"""
+    
+    def test_vectorized_matches_loop(self, simple_prices, buy_sell_signals):
+        """测试向量化路径与逐 bar 循环结果一致"""
+        engine_fast = BacktestEngine(
+            prices=simple_prices,
+            signals=buy_sell_signals,
+            symbol="TEST",
+            initial_cash=100_000,
+            cost_model=NoCostModel()
+        )
+        # 零费率的普通 CostModel 不会命中快速路径
+        engine_loop = BacktestEngine(
+            prices=simple_prices,
+            signals=buy_sell_signals,
+            symbol="TEST",
+            initial_cash=100_000,
+            cost_model=CostModel(commission_rate=0.0, min_commission=0.0, stamp_duty_rate=0.0)
+        )
+        assert engine_fast._is_frictionless()
+        assert not engine_loop._is_frictionless()
+        
+        result_fast = engine_fast.run()
+        result_loop = engine_loop.run()
+        
+        assert list(result_fast.equity_curve) == list(result_loop.equity_curve)
+        assert result_fast.final_equity == result_loop.final_equity
+        assert [t.type for t in result_fast.trades] == [t.type for t in result_loop.trades]
+        assert [t.size for t in result_fast.trades] == [t.size for t in result_loop.trades]
+        assert [t.bar_index for t in result_fast.trades] == [t.bar_index for t in result_loop.trades]
+    
+    def test_vectorized_force_exit(self, simple_prices, buy_hold_signals):
+        """测试向量化路径期末强制平仓"""
+        engine = BacktestEngine(
+            prices=simple_prices,
+            signals=buy_hold_signals,
+            symbol="TEST",
+            initial_cash=100_000,
+            cost_model=NoCostModel()
+        )
+        result = engine.run_vectorized()
+        
+        assert result.trades[-1].type == "FORCE_EXIT"
+        assert result.trades[-1].size == -result.trades[0].size
+        assert abs(result.final_equity - 125_000) < 1e-6
+    
+    def test_vectorized_drawdown_exit(self):
+        """测试只有回撤限制时走快速路径，触发强平后拼接的结果与逐 bar 循环一致"""
+        prices = [100.0, 110.0, 90.0, 80.0, 95.0, 100.0]
+        signals = [SignalEnum.BUY] + [SignalEnum.HOLD] * 5
+        engine = BacktestEngine(
+            prices=prices,
+            signals=signals,
+            symbol="TEST",
+            cost_model=NoCostModel(),
+            risk_control=RiskControl(max_drawdown_limit=-0.15)
+        )
+        assert engine._is_frictionless()
+        
+        result = engine.run()
+        
+        # 第 2 个 bar 回撤 -18.2%，第 3 个 bar 强平
+        assert [t.type for t in result.trades] == ["BUY", "RISK_EXIT"]
+        assert result.trades[1].bar_index == 3
+        assert abs(result.final_equity - 80_000) < 1e-6
+        
+        engine_loop = BacktestEngine(
+            prices=prices,
+            signals=signals,
+            symbol="TEST",
+            cost_model=NoCostModel(),
+            risk_control=RiskControl(max_drawdown_limit=-0.15)
+        )
+        result_loop = engine_loop._run_loop()
+        assert list(result.equity_curve) == list(result_loop.equity_curve)
+        assert result.trades == result_loop.trades
+
+
+class TestBacktestEngineCompiled:
+    """numba 编译内核路径测试"""
+    
+    def test_compiled_matches_loop(self, simple_prices, buy_sell_signals):
+        """测试编译内核与逐 bar 循环结果完全一致（含成本和风控）"""
+        pytest.importorskip("numba")
+        risk_control = RiskControl(max_drawdown_limit=-0.05, stop_loss_pct=-0.01, take_profit_pct=0.08)
+        engine_compiled = BacktestEngine(
+            prices=simple_prices, signals=buy_sell_signals, symbol="TEST", risk_control=risk_control
+        )
+        engine_loop = BacktestEngine(
+            prices=simple_prices, signals=buy_sell_signals, symbol="TEST", risk_control=risk_control
+        )
+        assert engine_compiled._kernel_params() is not None
+        
+        result_compiled = engine_compiled.run()
+        result_loop = engine_loop._run_loop()
+        
+        assert list(result_compiled.equity_curve) == list(result_loop.equity_curve)
+        assert result_compiled.trades == result_loop.trades
+
+
 class TestBacktestEngineEdgeCases:
     """边界情况测试"""
     
@@ -150,6 +256,34 @@ class TestBacktestEngineEdgeCases:
     
     def test_empty_signals_handling(self):
         """测试信号数量不匹配（应该有错误处理）"""
-        # 这个测试取决于您的实际实现
-        # 如果需要，可以添加参数验证
-        pass
\ No newline at end of file
+        engine = BacktestEngine(
+            prices=[100.0, 101.0, 102.0],
+            signals=[SignalEnum.BUY],
+            symbol="TEST",
+            initial_cash=100_000,
+        )
+        
+        with pytest.raises(ValueError):
+            engine.run()
+    
+    def test_encoded_signals(self, simple_prices, buy_sell_signals):
+        """已编码的 int8 信号数组与枚举信号结果一致"""
+        codes = encode_signals(buy_sell_signals)
+        assert codes.dtype == np.int8
+        assert list(codes) == [int(s) for s in buy_sell_signals]
+        
+        from_enum = BacktestEngine(simple_prices, buy_sell_signals, "TEST").run()
+        from_codes = BacktestEngine(simple_prices, codes, "TEST").run()
+        assert np.array_equal(from_enum.equity_curve, from_codes.equity_curve)
+    
+    def test_reset_reuses_engine(self, simple_prices, buy_sell_signals, buy_hold_signals):
+        """reset 后的回测结果与新构造的引擎一致"""
+        engine = BacktestEngine(simple_prices, buy_hold_signals, "TEST")
+        engine.run()
+        engine.reset(simple_prices[:6], buy_sell_signals[:6], "RESET")
+        result = engine.run()
+        
+        expected = BacktestEngine(simple_prices[:6], buy_sell_signals[:6], "RESET").run()
+        assert result.symbol == "RESET"
+        assert np.array_equal(result.equity_curve, expected.equity_curve)
+        assert result.trades == expected.trades
@@ -1,10 +1,11 @@
 """
 测试 BacktestResult 类的所有指标计算
 """
+from array import array
 import pytest
 import numpy as np
 from quant_system.backtest.result import BacktestResult
-from quant_system.backtest.trade import Trade
+from quant_system.backtest.trade import Trade, TradeLog
 
 
 class TestBacktestResultBasicMetrics:
@@ -127,6 +128,11 @@ class TestBacktestResultAdvancedMetrics:
             equity_curve=equity_curve
         )
         assert result.annual_volatility > 0
+        
+        # 单次扫描的结果与 np.std 两遍算法一致
+        arr = np.asarray(equity_curve, dtype=np.float64)
+        expected = np.std(np.diff(arr) / arr[:-1], ddof=1) * np.sqrt(252)
+        assert abs(result.annual_volatility - expected) < 1e-12
 
 
 class TestBacktestResultTradeMetrics:
@@ -221,6 +227,85 @@ class TestBacktestResultTradeMetrics:
         assert abs(result.profit_factor - 2.0) < 0.001
 
 
+class TestBacktestResultEquityCurve:
+    """权益曲线存储测试"""
+    
+    def test_equity_curve_read_only(self):
+        """测试 equity_curve 转为只读 float64 数组，且不冻结调用方的数组"""
+        curve = np.array([100_000.0, 105_000.0, 110_000.0])
+        result = BacktestResult(
+            symbol="TEST", initial_cash=100_000, final_equity=110_000, equity_curve=curve
+        )
+        
+        assert result.equity_curve.dtype == np.float64
+        assert not result.equity_curve.flags.writeable
+        assert curve.flags.writeable
+        with pytest.raises(ValueError):
+            result.equity_curve[0] = 0.0
+        
+        from_list = BacktestResult(
+            symbol="TEST", initial_cash=100_000, final_equity=110_000,
+            equity_curve=[100_000, 105_000, 110_000]
+        )
+        assert isinstance(from_list.equity_curve, np.ndarray)
+    
+    def test_equity_curve_from_double_array(self):
+        """测试传入 array('d') 时复制一份，调用方仍可继续 append"""
+        curve = array("d", [100_000.0, 105_000.0])
+        result = BacktestResult(
+            symbol="TEST", initial_cash=100_000, final_equity=105_000, equity_curve=curve
+        )
+        
+        curve.append(110_000.0)
+        assert result.equity_curve.tolist() == [100_000.0, 105_000.0]
+        assert not result.equity_curve.flags.writeable
+
+
+class TestTradeLog:
+    """TradeLog 列式成交记录测试"""
+    
+    def test_roundtrip_and_metrics(self, sample_trades):
+        """测试 TradeLog 与 Trade 列表互转一致，指标结果相同"""
+        log = TradeLog.from_trades(sample_trades)
+        
+        assert len(log) == len(sample_trades)
+        assert log == sample_trades
+        assert log[-1].type == "EXIT"
+        
+        kwargs = dict(symbol="TEST", initial_cash=100_000, final_equity=115_000,
+                      equity_curve=[100_000, 110_000, 105_000, 115_000])
+        from_list = BacktestResult(trades=sample_trades, **kwargs)
+        from_log = BacktestResult(trades=log, **kwargs)
+        
+        assert from_log.num_trades == from_list.num_trades == 2
+        assert from_log.win_rate == from_list.win_rate
+        assert from_log.profit_factor == from_list.profit_factor
+    
+    def test_append_grows(self):
+        """测试容量不足时自动扩容"""
+        log = TradeLog(capacity=1)
+        for i in range(5):
+            log.append(price=100.0 + i, size=1.0, cash_after=0.0,
+                       position_after=1.0, bar_index=i, type="BUY")
+        
+        assert len(log) == 5
+        assert [t.bar_index for t in log] == [0, 1, 2, 3, 4]
+        assert log.column("price").tolist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    
+    def test_trade_types(self):
+        """测试 SELL / SELL_STOP 可以往返，未知类型报错"""
+        log = TradeLog()
+        for type in ("SELL", "SELL_STOP"):
+            log.append(price=100.0, size=-1.0, cash_after=0.0,
+                       position_after=0.0, bar_index=0, type=type)
+        
+        assert [t.type for t in log] == ["SELL", "SELL_STOP"]
+        assert TradeLog.from_trades(list(log)) == log
+        with pytest.raises(ValueError):
+            log.append(price=100.0, size=1.0, cash_after=0.0,
+                       position_after=1.0, bar_index=0, type="UNKNOWN")
+
+
 class TestBacktestResultOutputMethods:
     """输出方法测试"""
     
@@ -241,6 +326,15 @@ class TestBacktestResultOutputMethods:
         assert isinstance(row["total_return"], str)  # 应该是格式化的字符串
         assert "%" in row["total_return"]
     
+    def test_to_tuple(self, sample_backtest_result):
+        """测试 to_tuple() 与 to_row() 列顺序一致"""
+        sample_backtest_result.params = {"window": 5}
+        row = sample_backtest_result.to_row()
+        
+        assert sample_backtest_result.row_fields() == tuple(row)
+        assert sample_backtest_result.to_tuple() == tuple(row.values())
+        assert row["window"] == 5
+    
     def test_to_dict(self, sample_backtest_result):
         """测试 to_dict() 方法"""
         data = sample_backtest_result.to_dict()
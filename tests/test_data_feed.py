@@ -1,8 +1,11 @@
 import pytest
+import threading
 import time
 from datetime import datetime
+from quant_system.data import live_feed
+from quant_system.data._scheduler import SCHEDULER
 from quant_system.data.live_feed import (
-    BarData, CSVReplayFeed, HistoricalSimulator
+    BarData, CSVReplayFeed, HistoricalSimulator, TushareDataFeed, WebSocketDataFeed, _RingBuffer, _make_dispatch
 )
 
 class TestBarData:
@@ -26,6 +29,14 @@ class TestBarData:
         assert bar.low == 98.0
         assert bar.close == 102.0
         assert bar.volume == 1000000
+    
+    def test_bar_data_immutable(self):
+        """BarData 不可变且没有实例 __dict__"""
+        bar = BarData("TEST", datetime.now(), 100.0, 105.0, 98.0, 102.0, 1000000)
+        
+        with pytest.raises(AttributeError):
+            bar.close = 103.0
+        assert not hasattr(bar, "__dict__")
 
 
 class TestHistoricalSimulator:
@@ -91,4 +102,249 @@ class TestCSVReplayFeed:
         
         assert len(received_bars) == 2
         assert received_bars[0].open == 100
-        assert received_bars[1].close == 106
\ No newline at end of file
+        assert received_bars[1].close == 106
+
+    def test_csv_replay_batch(self, tmp_path):
+        """测试列式存储与批量回调"""
+        csv_file = tmp_path / "test.csv"
+        csv_file.write_text(
+            "date,open,high,low,close,volume\n"
+            "2024-01-01,100,105,98,102,1000000\n"
+            "2024-01-02,bad,108,101,106,1200000\n"
+            "2024-01-03,104,109,103,107,1300000\n"
+        )
+        
+        feed = CSVReplayFeed(str(csv_file), symbol="TEST", speed=100.0)
+        
+        # 非法行被剔除
+        assert len(feed) == 2
+        assert list(feed.columns()['close']) == [102, 107]
+        
+        batches = []
+        feed.on_bars_batch(batches.append)
+        feed.start()
+        
+        time.sleep(0.5)
+        feed.stop()
+        
+        assert len(batches) == 1
+        assert list(batches[0]['open']) == [100, 104]
+
+
+class TestWebSocketDataFeed:
+    """测试WebSocket推送数据源"""
+    
+    def test_broadcast_from_queue(self):
+        """推送消息经队列解析后广播"""
+        def parse(message):
+            return [BarData("TEST", datetime.now(), 0, 0, 0, float(message), 0)]
+        
+        feed = WebSocketDataFeed(url="ws://localhost", parse_message=parse)
+        received_bars = []
+        feed.on_bar(received_bars.append)
+        
+        for message in ("100", "bad", "101"):
+            feed._on_message(None, message)
+        
+        # 直接运行广播线程（不连接网络）
+        feed._is_running = True
+        thread = threading.Thread(target=feed._broadcast_loop, daemon=True)
+        thread.start()
+        time.sleep(0.2)
+        feed._is_running = False
+        thread.join(timeout=2)
+        
+        assert [bar.close for bar in received_bars] == [100, 101]
+    
+    def test_stop_from_callback(self):
+        """在广播线程的回调中停止数据源（切换数据源时的调用路径）"""
+        feed = WebSocketDataFeed(
+            url="ws://localhost", parse_message=lambda m: [BarData("TEST", datetime.now(), 0, 0, 0, 1.0, 0)]
+        )
+        errors = []
+        stopped = threading.Event()
+        
+        def callback(bar):
+            try:
+                feed.stop()
+            except Exception as e:
+                errors.append(e)
+            stopped.set()
+        
+        feed.on_bar(callback)
+        feed._is_running = True
+        feed._thread = threading.Thread(target=feed._broadcast_loop, daemon=True)
+        feed._thread.start()
+        feed._on_message(None, "1")
+        
+        assert stopped.wait(timeout=2)
+        feed._thread.join(timeout=2)
+        assert errors == []
+        assert not feed._thread.is_alive()
+    
+    def test_fallback_on_close(self):
+        """连接断开时切换到备用数据源"""
+        fallback = HistoricalSimulator([100, 101], symbol="TEST", speed=100.0)
+        feed = WebSocketDataFeed(
+            url="ws://localhost", parse_message=lambda m: [], fallback_feed=fallback
+        )
+        received_bars = []
+        feed.on_bar(received_bars.append)
+        
+        feed._is_running = True
+        feed._on_close(None, None, None)
+        time.sleep(0.5)
+        fallback.stop()
+        
+        assert [bar.close for bar in received_bars] == [100, 101]
+
+
+class TestRingBuffer:
+    """测试环形缓冲区"""
+    
+    def test_drain_and_overwrite(self):
+        ring = _RingBuffer(4)
+        ring.put(1)
+        ring.put(2)
+        assert ring.drain(0) == [1, 2]
+        assert ring.drain(0.01) == []
+        
+        # 写满后覆盖最旧的数据
+        for i in range(6):
+            ring.put(i)
+        assert ring.drain(0) == [2, 3, 4, 5]
+        
+        with pytest.raises(ValueError):
+            _RingBuffer(1000)
+    
+    def test_overflow_counted(self, capsys):
+        """写满后每覆盖一条未读数据计数一次，只在第一次溢出时警告"""
+        ring = _RingBuffer(4)
+        for i in range(4):
+            ring.put(i)
+        assert ring.dropped == 0
+        
+        for i in range(4, 7):
+            ring.put(i)
+        assert ring.dropped == 3
+        assert capsys.readouterr().out.count("已满") == 1
+        assert ring.drain(0) == [3, 4, 5, 6]
+        
+        ring.put(7)
+        assert ring.dropped == 3
+    
+    def test_dispatcher_exposes_dropped(self):
+        """分发器在未启动（无人消费）时溢出，dropped 反映丢弃数"""
+        dispatcher = live_feed._BarDispatcher([], capacity=2)
+        for i in range(5):
+            dispatcher.publish(i)
+        assert dispatcher.dropped == 3
+
+
+class TestMakeDispatch:
+    """测试回调分发函数"""
+    
+    def test_guarded_dispatch(self):
+        received = []
+        
+        def broken(bar):
+            raise RuntimeError("回调失败")
+        
+        _make_dispatch([])(1)
+        _make_dispatch([received.append])(1)
+        _make_dispatch([broken, received.append])(2)
+        assert received == [1, 2]
+        
+        with pytest.raises(RuntimeError):
+            _make_dispatch([broken], guard=False)(3)
+
+
+class TestCSVReplayCache:
+    """测试CSV解析结果缓存"""
+    
+    def test_second_load_uses_cache(self, tmp_path, monkeypatch):
+        csv_file = tmp_path / "test.csv"
+        csv_file.write_text(
+            "date,open,high,low,close,volume\n"
+            "2024-01-01,100,105,98,102,1000000\n"
+            "2024-01-02,102,108,101,106,1200000\n"
+        )
+        cache_dir = tmp_path / "cache"
+        
+        # 默认不写磁盘缓存
+        assert CSVReplayFeed(str(csv_file), symbol="TEST").cache_dir is None
+        
+        first = CSVReplayFeed(str(csv_file), symbol="TEST", cache_dir=str(cache_dir))
+        assert len(list(cache_dir.glob("*.npz"))) == 1
+        
+        # 第二次加载不再解析 CSV
+        def fail(*args, **kwargs):
+            raise AssertionError("不应重新解析 CSV")
+        monkeypatch.setattr(live_feed.pd, "read_csv", fail)
+        second = CSVReplayFeed(str(csv_file), symbol="TEST", cache_dir=str(cache_dir))
+        
+        for name, column in first.columns().items():
+            assert (second.columns()[name] == column).all()
+        assert second._bar(1) == first._bar(1)
+
+
+class TestTushareFetch:
+    """测试 Tushare 并发请求"""
+    
+    def test_fetch_all_in_pool(self):
+        """请求在共享 FETCH_POOL 中执行，结果按订阅顺序返回，异常原样返回"""
+        feed = TushareDataFeed.__new__(TushareDataFeed)
+        threads = []
+        
+        def fetch_daily(symbol, today):
+            threads.append(threading.current_thread().name)
+            if symbol == "BAD":
+                raise RuntimeError("请求失败")
+            return symbol.lower()
+        
+        feed._fetch_daily = fetch_daily
+        results = feed._fetch_all(["A", "BAD", "C"], "20240101")
+        
+        assert results[0] == "a" and results[2] == "c"
+        assert isinstance(results[1], RuntimeError)
+        assert all(name.startswith("quant-fetch") for name in threads)
+
+
+class TestSnapshotCache:
+    """测试进程级行情缓存"""
+    
+    def test_expired_entries_evicted(self):
+        """写入新结果时清掉过期条目及其锁，未过期的条目保留"""
+        live_feed._cached_fetch(("test", "old"), lambda: "old", ttl=0.01)
+        live_feed._cached_fetch(("test", "live"), lambda: "live", ttl=60)
+        time.sleep(0.02)
+        
+        assert live_feed._cached_fetch(("test", "new"), lambda: "new", ttl=60) == "new"
+        assert ("test", "old") not in live_feed._snapshot_cache
+        assert ("test", "old") not in live_feed._snapshot_locks
+        assert live_feed._cached_fetch(("test", "live"), lambda: "refetched", ttl=60) == "live"
+        
+        for key in [("test", "live"), ("test", "new")]:
+            live_feed._snapshot_cache.pop(key, None)
+            live_feed._snapshot_locks.pop(key, None)
+
+
+class TestScheduler:
+    """测试共享调度器"""
+    
+    def test_periodic_job(self):
+        calls = []
+        
+        def job():
+            calls.append(time.monotonic())
+            if len(calls) == 2:
+                raise RuntimeError("失败后继续调度")
+        
+        handle = SCHEDULER.every(0.05, job, name="测试")
+        time.sleep(0.3)
+        handle.cancel()
+        count = len(calls)
+        time.sleep(0.15)
+        
+        assert count >= 4
+        assert len(calls) == count
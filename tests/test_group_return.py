@@ -0,0 +1,49 @@
+"""
+测试分组收益评估
+"""
+import numpy as np
+import pytest
+from quant_system.sentiment.evaluation.group_return import GroupReturnEvaluator
+
+
+def _group_return_reference(factor_values, forward_returns, groups):
+    """逐期 sorted 分组的参考实现"""
+    group_returns = [[] for _ in range(groups)]
+    for fv, fr in zip(factor_values, forward_returns):
+        ranked = sorted(fv.items(), key=lambda x: x[1])
+        n = len(ranked)
+        if n < groups:
+            continue
+        size = n // groups
+        for i in range(groups):
+            rets = [fr[s] for s, _ in ranked[i * size:(i + 1) * size] if s in fr]
+            if rets:
+                group_returns[i].append(sum(rets) / len(rets))
+    return [np.mean(r) if r else np.nan for r in group_returns]
+
+
+class TestGroupReturnEvaluator:
+    """分组收益测试"""
+    
+    def test_matches_reference(self):
+        """测试股票数变化、缺失收益和并列因子值时与逐期分组一致"""
+        rng = np.random.default_rng(0)
+        symbols = [f"S{i}" for i in range(12)]
+        factor_values, forward_returns = [], []
+        for t in range(20):
+            order = symbols if t % 2 else symbols[::-1]
+            factor_values.append(
+                {s: float(np.round(rng.normal(), 1)) for s in order if rng.random() < 0.8}
+            )
+            forward_returns.append({s: float(rng.normal()) for s in symbols if rng.random() < 0.7})
+        
+        result = GroupReturnEvaluator(groups=3).evaluate(factor_values, forward_returns)
+        
+        expected = _group_return_reference(factor_values, forward_returns, 3)
+        assert [result[f"group_{i}_mean"] for i in range(3)] == pytest.approx(expected, abs=1e-12)
+    
+    def test_too_few_symbols(self):
+        """测试股票数少于组数时结果为 NaN"""
+        result = GroupReturnEvaluator(groups=5).evaluate([{"A": 1.0, "B": 2.0}], [{"A": 0.1, "B": 0.2}])
+        
+        assert all(np.isnan(v) for v in result.values())
@@ -0,0 +1,105 @@
+"""
+测试单期 IC 计算
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from quant_system.analysis._numeric import spearman_no_ties
+from quant_system.sentiment.evaluation.decay import ICDecayEvaluator
+from quant_system.sentiment.evaluation.ic import ICEvaluator, _rankdata
+
+
+def _pandas_ic(factor, future_return):
+    """rank 后 Pearson 的 pandas 参考实现"""
+    df = pd.concat([factor, future_return], axis=1).dropna()
+    return float(df.iloc[:, 0].rank().corr(df.iloc[:, 1].rank()))
+
+
+class TestCalcIC:
+    """calc_ic 测试"""
+    
+    def test_rankdata_ties(self):
+        """测试并列值取平均秩"""
+        values = np.array([3.0, 1.0, 3.0, 2.0, 1.0])
+        assert list(_rankdata(values)) == list(pd.Series(values).rank())
+    
+    @pytest.mark.parametrize("decimals", [0, 1, 6])
+    def test_matches_pandas(self, decimals):
+        """测试有无并列值时都与 pandas 结果一致"""
+        rng = np.random.default_rng(decimals)
+        factor = pd.Series(np.round(rng.normal(size=20), decimals))
+        future_return = pd.Series(rng.normal(size=20))
+        factor[3] = np.nan
+        
+        ic = ICEvaluator.calc_ic(factor, future_return)
+        
+        assert ic == pytest.approx(_pandas_ic(factor, future_return), abs=1e-12)
+    
+    def test_degenerate(self):
+        """测试样本不足与常数因子"""
+        assert ICEvaluator.calc_ic(pd.Series([1.0]), pd.Series([2.0])) == 0.0
+        assert np.isnan(ICEvaluator.calc_ic(pd.Series([1.0, 1.0, 1.0]), pd.Series([1.0, 2.0, 3.0])))
+    
+    def test_spearman_no_ties(self):
+        """测试无并列值内核与 rank 后 Pearson 一致"""
+        rng = np.random.default_rng(7)
+        x = rng.normal(size=50)
+        y = x + rng.normal(size=50)
+        
+        expected = _pandas_ic(pd.Series(x), pd.Series(y))
+        assert spearman_no_ties(x, y) == pytest.approx(expected, abs=1e-12)
+
+
+class TestICDecay:
+    """IC 时间衰减测试"""
+    
+    def test_matches_explicit_weights(self):
+        """测试缓存权重的点积与逐项加权一致"""
+        ic_series = pd.Series(np.linspace(-0.1, 0.2, 15))
+        weights = np.exp(-np.log(2) * np.arange(15)[::-1] / 5)
+        expected = float((ic_series.values * weights).sum() / weights.sum())
+        
+        assert ICDecayEvaluator.apply_exponential_decay(ic_series, half_life=5) == pytest.approx(expected)
+        assert ICDecayEvaluator.apply_exponential_decay(pd.Series([], dtype=float)) == 0.0
+    
+    def test_recursive_matches_weights(self):
+        """测试递推形式与权重点积一致"""
+        from quant_system.analysis._numeric import _decayed_mean_loop
+        from quant_system.sentiment.evaluation.decay import _decay_weights
+        values = np.random.default_rng(3).normal(size=200)
+        
+        for half_life in (1, 10, 500):
+            recursive = _decayed_mean_loop(values, 2.0 ** (-1.0 / half_life))
+            assert recursive == pytest.approx(values @ _decay_weights(200, half_life), abs=1e-12)
+    
+    def test_infinite_half_life(self):
+        """测试半衰期极大或为 inf 时两条路径都退化为普通均值"""
+        from quant_system.analysis._numeric import _decayed_mean_loop
+        from quant_system.sentiment.evaluation.decay import _decay_weights
+        values = np.array([0.1, -0.2, 0.4, 0.3])
+        
+        for half_life in (1e300, float("inf")):
+            alpha = 2.0 ** (-1.0 / half_life)
+            assert alpha == 1.0
+            assert _decayed_mean_loop(values, alpha) == pytest.approx(values.mean())
+            assert values @ _decay_weights(4, half_life) == pytest.approx(values.mean())
+            assert ICDecayEvaluator.apply_exponential_decay(pd.Series(values), half_life) == pytest.approx(values.mean())
+
+
+class TestCalcICAlignment:
+    """calc_ic 输入对齐测试"""
+    
+    def test_series_aligned_by_index(self):
+        """测试索引不同的 Series 只用共同索引，与 concat + dropna 一致"""
+        factor = pd.Series([1.0, 3.0, 2.0, 5.0, np.nan], index=list("abcde"))
+        future_return = pd.Series([0.3, 0.1, 0.2, 0.5], index=list("dbcf"))
+        
+        assert ICEvaluator.calc_ic(factor, future_return) == pytest.approx(_pandas_ic(factor, future_return))
+    
+    def test_ndarray_input(self):
+        """测试 ndarray 按位置对齐"""
+        factor = np.array([1.0, 2.0, np.nan, 4.0])
+        future_return = np.array([0.1, 0.3, 0.2, np.nan])
+        
+        assert ICEvaluator.calc_ic(factor, future_return) == pytest.approx(1.0)
+        assert ICEvaluator.calc_ic(factor[:1], future_return[:1]) == 0.0
@@ -0,0 +1,37 @@
+"""
+测试 MASentimentFactor
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from quant_system.sentiment.factors.ma import MASentimentFactor
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    return pd.Series(100 + rng.normal(size=200).cumsum(), index=pd.RangeIndex(10, 210))
+
+
+class TestMASentimentFactor:
+    """均线情绪因子测试"""
+    
+    def test_compute_matches_rolling(self, prices):
+        """测试批量计算与 pandas rolling 均线一致（含 NaN）"""
+        prices = prices.copy()
+        prices.iloc[50] = np.nan
+        factor = MASentimentFactor(window=5)
+        
+        ma = prices.rolling(5).mean()
+        expected = (prices - ma) / ma
+        
+        pd.testing.assert_series_equal(factor.compute(prices), expected, atol=1e-12)
+    
+    def test_update_matches_compute(self, prices):
+        """测试逐笔更新与批量计算一致"""
+        expected = MASentimentFactor(window=7).compute(prices).to_numpy()
+        factor = MASentimentFactor(window=7)
+        
+        streamed = np.array([factor.update(p) for p in prices])
+        
+        np.testing.assert_allclose(streamed, expected, atol=1e-12)
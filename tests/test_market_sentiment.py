@@ -0,0 +1,42 @@
+"""
+测试 MarketSentiment 的向量化指标
+"""
+import numpy as np
+import pytest
+from quant_system.sentiment.market_sentiment import MarketSentiment
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    return 100 * np.cumprod(1 + rng.normal(0, 0.02, 40))
+
+
+class TestMarketSentiment:
+    """动量 / 波动率 / 情绪均线测试"""
+    
+    def test_momentum_and_volatility(self, prices):
+        """测试与逐点定义一致"""
+        model = MarketSentiment(momentum_window=5, volatility_window=7)
+        returns = np.diff(prices) / prices[:-1]
+        
+        momentum = model._momentum(prices)
+        vol = model._volatility(prices)
+        
+        assert (momentum[:5] == 0).all() and (vol[:7] == 0).all()
+        for i in range(5, len(prices)):
+            assert momentum[i] == pytest.approx(prices[i] / prices[i - 5] - 1)
+        for i in range(7, len(prices)):
+            assert vol[i] == pytest.approx(np.std(returns[i - 7:i]))
+    
+    def test_sentiment_and_moving_average(self):
+        """测试前一价格为 0 时情绪值为 0，均线前 window-1 个为 0"""
+        model = MarketSentiment()
+        
+        sentiment = model.calculate_sentiment([10.0, 0.0, 5.0, 10.0])
+        ma = model.moving_average(sentiment, 3)
+        
+        assert sentiment == [0.0, -1.0, 0.0, 1.0]
+        assert ma == [0.0, 0.0, pytest.approx(-1 / 3), 0.0]
+        assert model.calculate_sentiment([]) == [0.0]
+        assert model.moving_average([1.0], 3) == [0.0]
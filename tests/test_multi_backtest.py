@@ -0,0 +1,53 @@
+"""
+测试 MultiBacktest 多标的回测
+"""
+import pytest
+from quant_system.backtest import multi_backtest
+from quant_system.backtest.multi_backtest import MultiBacktest, ResultCache
+from quant_system.strategy.simple_ma import SimpleMAStrategy
+
+
+@pytest.fixture
+def data_list(trending_prices, volatile_prices):
+    """多标的回测输入"""
+    strategy = SimpleMAStrategy(window=5)
+    return [
+        ("TREND", trending_prices, strategy.generate_signals(trending_prices)),
+        ("VOL", volatile_prices, strategy.generate_signals(volatile_prices)),
+    ]
+
+
+class TestMultiBacktest:
+    """MultiBacktest 测试"""
+
+    def test_parallel_matches_serial(self, data_list):
+        """测试并行与串行结果一致且顺序保持"""
+        serial = MultiBacktest(data_list, parallel=False).run()
+        parallel = MultiBacktest(data_list, parallel=True, max_workers=2).run()
+
+        assert [r.symbol for r in parallel] == ["TREND", "VOL"]
+        assert [r.final_equity for r in parallel] == [r.final_equity for r in serial]
+        assert [list(r.equity_curve) for r in parallel] == [list(r.equity_curve) for r in serial]
+
+    def test_empty_data_list(self):
+        """测试空输入"""
+        assert MultiBacktest([]).run() == []
+
+    def test_result_cache(self, data_list, tmp_path):
+        """测试磁盘缓存：第二次运行直接读取缓存结果"""
+        first = MultiBacktest(data_list, parallel=False, use_cache=True, cache_dir=tmp_path).run()
+        assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+        second = MultiBacktest(data_list, parallel=False, use_cache=True, cache_dir=tmp_path).run()
+        assert [r.symbol for r in second] == [r.symbol for r in first]
+        assert [r.final_equity for r in second] == [r.final_equity for r in first]
+
+    def test_cache_key_versioned(self, data_list, tmp_path, monkeypatch):
+        """测试缓存 key 带版本号，写入后不留临时文件"""
+        _, prices, signals = data_list[0]
+        key = ResultCache.make_key(prices, signals, {"symbol": "TREND"})
+        monkeypatch.setattr(multi_backtest, "CACHE_VERSION", multi_backtest.CACHE_VERSION + 1)
+        assert ResultCache.make_key(prices, signals, {"symbol": "TREND"}) != key
+
+        MultiBacktest(data_list, parallel=False, use_cache=True, cache_dir=tmp_path).run()
+        assert list(tmp_path.glob("*.tmp")) == []
@@ -2,7 +2,7 @@
 测试性能指标计算函数
 """
 import pytest
-from quant_system.metrics.performance import total_return, max_drawdown
+from quant_system.metrics.performance import total_return, max_drawdown, metrics_bundle
 
 
 class TestTotalReturn:
@@ -62,4 +62,21 @@ class TestMaxDrawdown:
         ]
         result = max_drawdown(equity_curve)
         expected = (92_000 - 115_000) / 115_000  # -20%
-        assert abs(result - expected) < 0.001
\ No newline at end of file
+        assert abs(result - expected) < 0.001
+    
+    def test_empty_curve(self):
+        """测试空曲线"""
+        assert max_drawdown([]) == 0.0
+
+
+class TestMetricsBundle:
+    """合并指标测试"""
+    
+    def test_bundle_matches_separate_calls(self):
+        """测试与分别调用的结果一致"""
+        equity_curve = [100_000, 110_000, 88_000, 95_000]
+        
+        assert metrics_bundle(equity_curve) == (
+            total_return(equity_curve), max_drawdown(equity_curve), 95_000.0
+        )
+        assert metrics_bundle([]) == (0.0, 0.0, 0.0)
@@ -0,0 +1,40 @@
+"""
+测试 price_feed CSV 加载
+"""
+import os
+import pytest
+from quant_system.data import price_feed
+from quant_system.data.price_feed import load_prices_from_csv, load_series_from_csv
+
+
+class TestLoadCache:
+    """测试按修改时间失效的解析缓存"""
+    
+    def test_reload_hits_cache_until_modified(self, tmp_path, monkeypatch):
+        csv_file = tmp_path / "prices.csv"
+        csv_file.write_text("date,price\n2024-01-01,100\n2024-01-02,101.5\n")
+        
+        first = load_prices_from_csv(str(csv_file))
+        assert first == [100.0, 101.5]
+        
+        # 返回的是新列表，修改它不影响缓存
+        first.append(0.0)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("不应重新解析 CSV")
+        monkeypatch.setattr(price_feed.pd, "read_csv", fail)
+        assert load_prices_from_csv(str(csv_file)) == [100.0, 101.5]
+        monkeypatch.undo()
+        
+        # 改写文件后重新解析
+        csv_file.write_text("date,price\n2024-01-01,102\n")
+        stat = csv_file.stat()
+        os.utime(csv_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert load_prices_from_csv(str(csv_file)) == [102.0]
+    
+    def test_missing_column(self, tmp_path):
+        csv_file = tmp_path / "prices.csv"
+        csv_file.write_text("date,close\n2024-01-01,100\n")
+        
+        with pytest.raises(ValueError):
+            load_series_from_csv(str(csv_file), "price")
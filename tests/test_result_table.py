@@ -0,0 +1,27 @@
+"""
+测试 ResultTable 输出
+"""
+from quant_system.backtest.result import BacktestResult
+from quant_system.report.result_table import ResultTable
+
+
+class TestPrettyPrint:
+    """pretty_print 格式测试"""
+    
+    def test_column_widths_from_rows(self, capsys):
+        """测试列宽只按数据行计算（表头更长时不截断、也不加宽数据列）"""
+        result = BacktestResult(
+            symbol="A", initial_cash=100_000, final_equity=110_000,
+            equity_curve=[100_000, 110_000],
+        )
+        rows = [result.to_row()]
+        headers = list(rows[0])
+        widths = {h: len(str(rows[0][h])) for h in headers}
+        
+        ResultTable([result]).pretty_print()
+        
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == " | ".join(f"{h:<{widths[h]}}" for h in headers)
+        assert lines[1] == "-+-".join("-" * widths[h] for h in headers)
+        assert lines[2] == " | ".join(f"{str(rows[0][h]):<{widths[h]}}" for h in headers)
+        assert widths["symbol"] < len("symbol")  # 表头比数据宽的列也按数据行对齐
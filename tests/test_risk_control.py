@@ -62,6 +62,35 @@ class TestRiskMonitor:
         assert monitor.check_max_drawdown(equity_curve) is True
         assert monitor.force_exit_triggered is True
     
+    def test_update_drawdown_matches_full_scan(self):
+        """测试增量回撤检查与整条曲线扫描一致"""
+        rc = RiskControl(max_drawdown_limit=-0.2)
+        monitor = RiskMonitor(rc, initial_cash=100_000)
+        
+        equity_curve = [100_000, 110_000, 100_000, 85_000, 90_000]
+        for i, equity in enumerate(equity_curve):
+            expected = RiskMonitor(rc, 100_000).check_max_drawdown(equity_curve[:i + 1])
+            assert monitor.update_drawdown(equity) is expected
+        
+        monitor.reset_drawdown_monitor()
+        assert monitor.update_drawdown(50_000) is False
+    
+    def test_first_drawdown_breach(self):
+        """测试批量回撤检查与逐 bar check_max_drawdown 一致"""
+        rc = RiskControl(max_drawdown_limit=-0.2)
+        monitor = RiskMonitor(rc, initial_cash=100_000)
+        
+        equity_curve = [100_000, 110_000, 100_000, 85_000, 90_000, 80_000]
+        expected = next(
+            i for i in range(len(equity_curve))
+            if monitor.check_max_drawdown(equity_curve[:i])
+        )
+        
+        assert monitor.first_drawdown_breach(equity_curve) == expected == 4
+        assert monitor.first_drawdown_breach(equity_curve[:4]) is None
+        # 只查找 start 之后的 bar
+        assert monitor.first_drawdown_breach(equity_curve, start=4) is None
+    
     def test_check_stop_loss_not_triggered(self):
         """测试止损未触发"""
         rc = RiskControl(stop_loss_pct=-0.05)
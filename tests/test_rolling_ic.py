@@ -0,0 +1,80 @@
+"""
+测试滚动 IC 计算
+"""
+import numpy as np
+import pandas as pd
+from quant_system.sentiment.evaluation.ic import ICEvaluator
+from quant_system.analysis._numeric import _average_ranks, _make_cross_sectional_ic_loop
+from quant_system.sentiment.evaluation import rolling_ic
+from quant_system.sentiment.evaluation.rolling_ic import RollingICEvaluator
+
+
+def _rolling_ic_reference(factor_df, return_df, window):
+    """逐窗口、逐行调用 calc_ic 的参考实现"""
+    ic_list = []
+    for end in range(window, len(factor_df)):
+        ics = [
+            ICEvaluator.calc_ic(factor_df.iloc[t], return_df.iloc[t])
+            for t in range(end - window, end)
+        ]
+        valid_ics = [ic for ic in ics if not pd.isna(ic)]
+        ic_list.append(sum(valid_ics) / len(valid_ics) if valid_ics else 0.0)
+    return ic_list
+
+
+class TestRollingICEvaluator:
+    """滚动 IC 测试"""
+    
+    def test_matches_reference(self):
+        """测试向量化结果与逐行 calc_ic 一致（含缺失值和并列）"""
+        rng = np.random.default_rng(0)
+        factor = np.round(rng.normal(size=(30, 5)), 1)
+        returns = rng.normal(size=(30, 5))
+        factor[rng.random((30, 5)) < 0.2] = np.nan
+        returns[rng.random((30, 5)) < 0.2] = np.nan
+        factor_df = pd.DataFrame(factor, columns=list("abcde"))
+        return_df = pd.DataFrame(returns, columns=list("abcde"))
+        
+        result = RollingICEvaluator(window=5).compute(factor_df, return_df)
+        
+        assert list(result.index) == list(factor_df.index[5:])
+        np.testing.assert_allclose(
+            result.values, _rolling_ic_reference(factor_df, return_df, 5), atol=1e-12
+        )
+    
+    def test_short_series(self):
+        """测试数据不足一个窗口"""
+        factor_df = pd.DataFrame({"stock": [1.0, 2.0]})
+        
+        result = RollingICEvaluator(window=5).compute(factor_df, factor_df)
+        
+        assert len(result) == 0
+    
+    def test_single_symbol(self):
+        """测试单只股票直接返回 0.0，与参考实现一致"""
+        factor_df = pd.DataFrame({"stock": np.arange(10.0)})
+        return_df = pd.DataFrame({"stock": np.arange(10.0)[::-1]})
+        
+        result = RollingICEvaluator(window=3).compute(factor_df, return_df)
+        
+        assert list(result.values) == _rolling_ic_reference(factor_df, return_df, 3)
+    
+    def test_kernel_matches_numpy(self, monkeypatch):
+        """测试横截面 IC 循环（纯 Python 与编译版）与 NumPy 路径一致"""
+        rng = np.random.default_rng(1)
+        factor = np.round(rng.normal(size=(40, 6)), 1)
+        returns = np.round(rng.normal(size=(40, 6)), 1)
+        factor[rng.random((40, 6)) < 0.25] = np.nan
+        returns[rng.random((40, 6)) < 0.25] = np.nan
+        factor[5] = 1.0  # 秩方差为 0 -> NaN
+        
+        monkeypatch.setattr(rolling_ic, "cross_sectional_ic_kernel", lambda: None)
+        expected = rolling_ic._cross_sectional_ic(factor, returns)
+        loops = [_make_cross_sectional_ic_loop(_average_ranks)]
+        monkeypatch.undo()
+        compiled = rolling_ic.cross_sectional_ic_kernel()
+        if compiled is not None:
+            loops.append(compiled)
+        
+        for loop in loops:
+            np.testing.assert_allclose(loop(factor, returns), expected, atol=1e-12)
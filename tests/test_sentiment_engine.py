@@ -0,0 +1,28 @@
+"""
+测试 SentimentEngine
+"""
+import numpy as np
+from quant_system.sentiment.engine.sentiment_engine import SentimentEngine
+
+
+class TestSentimentEngine:
+    """情绪信号测试"""
+    
+    def test_factor_values_reused(self, monkeypatch):
+        """测试情绪序列不变时不重复计算因子"""
+        rng = np.random.default_rng(0)
+        prices = 100 + rng.normal(size=60).cumsum()
+        sentiment = rng.normal(size=60)
+        engine = SentimentEngine(factor_window=5, ic_window=10)
+        
+        first = engine.compute_signal(prices, sentiment)
+        
+        calls = []
+        compute = engine._factor.compute
+        monkeypatch.setattr(engine._factor, "compute", lambda s: calls.append(1) or compute(s))
+        assert engine.compute_signal(prices * 1.01, sentiment) is not None
+        assert engine.compute_signal(prices, sentiment) == first
+        assert calls == []
+        
+        engine.compute_signal(prices, sentiment[::-1])
+        assert calls == [1]
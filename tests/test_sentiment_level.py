@@ -0,0 +1,30 @@
+"""
+测试情绪分数到等级的映射
+"""
+import numpy as np
+from quant_system.sentiment.base import score_to_level, score_to_levels
+
+
+def _level_reference(score):
+    if score <= -0.3:
+        return "fear"
+    elif score >= 0.3:
+        return "greed"
+    else:
+        return "neutral"
+
+
+class TestScoreToLevel:
+    """等级映射测试"""
+    
+    def test_boundaries(self):
+        """测试阈值边界与 NaN，标量和批量结果一致"""
+        scores = [
+            -1.0, -0.3, np.nextafter(-0.3, 1.0), 0.0,
+            np.nextafter(0.3, -1.0), 0.3, 1.0, float("nan"),
+        ]
+        expected = [_level_reference(s) for s in scores]
+        
+        assert [score_to_level(s) for s in scores] == expected
+        assert list(score_to_levels(scores)) == expected
+        assert score_to_levels([]).shape == (0,)
@@ -7,6 +7,8 @@ from quant_system.runner.walk_forward import (
     WalkForwardResult,
     run_walk_forward_analysis
 )
+from quant_system.backtest.engine import BacktestEngine
+from quant_system.runner.param_scan import run_param_scan
 from quant_system.strategy.simple_ma import SimpleMAStrategy
 
 
@@ -125,4 +127,40 @@ class TestWalkForwardAnalysis:
         
         # 数据不足，不应该有结果
         assert len(result.train_results) == 0
-        assert len(result.test_results) == 0
\ No newline at end of file
+        assert len(result.test_results) == 0
+
+    
+    def test_parallel_matches_serial(self, long_price_series):
+        """测试训练窗口并行扫描与串行结果一致"""
+        config = WalkForwardConfig(train_window=100, test_window=20, step_size=20)
+        kwargs = dict(
+            prices=long_price_series,
+            strategy_cls=SimpleMAStrategy,
+            param_grid={"window": [3, 5, 10]},
+            config=config,
+            verbose=False,
+        )
+        
+        serial = run_walk_forward_analysis(**kwargs)
+        parallel = run_walk_forward_analysis(**kwargs, parallel=True, max_workers=2)
+        
+        assert parallel.best_params_history == serial.best_params_history
+        assert list(parallel.combined_equity_curve) == list(serial.combined_equity_curve)
+
+
+class TestParamScanBatch:
+    """参数扫描批量信号测试"""
+    
+    def test_batch_matches_per_strategy(self, long_price_series):
+        """批量计算的信号与逐个构造策略的回测结果一致"""
+        table = run_param_scan(
+            symbol="TEST",
+            prices=long_price_series,
+            strategy_cls=SimpleMAStrategy,
+            param_grid={"window": [3, 5, 10]},
+        )
+        
+        for result in table.results:
+            signals = SimpleMAStrategy(**result.params).generate_signals(long_price_series)
+            expected = BacktestEngine(long_price_series, signals, "TEST").run()
+            assert list(result.equity_curve) == list(expected.equity_curve)